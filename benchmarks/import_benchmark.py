@@ -0,0 +1,63 @@
+"""Import time benchmark.
+
+Description:
+-----------
+
+Measures cold `import comandante` time using `python -X importtime`
+in fresh interpreter processes and checks it against the budget.
+
+The budget is relative to the import time of the `json` module
+measured the same way, so that the check doesn't depend on
+the machine speed. Exits with non-zero status when the budget
+is exceeded.
+
+Usage:
+
+    python benchmarks/import_benchmark.py [runs] [budget]
+"""
+
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Import time budget as a multiple of `import json` time
+DEFAULT_BUDGET = 2.0
+
+
+def import_time(module):
+    """Get cumulative import time of the module in microseconds."""
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-c', 'import {module}'.format(module=module)],
+        cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    _, report = process.communicate()
+    for line in report.splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+    raise RuntimeError("Cannot measure import time of '{module}':\n{report}".format(module=module, report=report))
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main(runs=11, budget=DEFAULT_BUDGET):
+    comandante = median([import_time('comandante') for _ in range(runs)])
+    reference = median([import_time('json') for _ in range(runs)])
+    ratio = float(comandante) / reference
+    print("import comandante: {time:.2f} ms".format(time=comandante / 1000.0))
+    print("import json:       {time:.2f} ms".format(time=reference / 1000.0))
+    print("ratio:             {ratio:.2f} (budget {budget:.2f})".format(ratio=ratio, budget=budget))
+    return 0 if ratio <= budget else 1
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    runs = int(arguments[0]) if len(arguments) > 0 else 11
+    budget = float(arguments[1]) if len(arguments) > 1 else DEFAULT_BUDGET
+    sys.exit(main(runs, budget))
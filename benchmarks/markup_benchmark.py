@@ -0,0 +1,71 @@
+"""Docstring markup throughput benchmark.
+
+Description:
+-----------
+
+Measures how fast man-page-length docstrings are
+formatted. Three paths are compared:
+
+ * process    - format the whole text into a string
+ * paragraphs - format the text paragraph by paragraph
+   (the way help writer consumes it)
+ * write      - stream formatted text into a file-like sink
+
+Usage:
+
+    python benchmarks/markup_benchmark.py [paragraphs] [repeat]
+"""
+
+from __future__ import print_function
+
+import io
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from comandante.inner.output.markup import Markup  # noqa: E402
+
+PARAGRAPH = u"""Clones a repository into a newly created directory, creates
+remote-tracking branches for each branch in the cloned repository
+(visible using git branch *-r*), and creates and checks out an initial
+branch that is forked from the *cloned repository's* currently active
+branch. Escaped \\*asterisks\\* and *bold \\* escapes* are kept.
+|    $ git clone <repository> [<directory>]
+|    $ git clone *--mirror* <repository>   
+"""
+
+
+def build_docstring(paragraphs=200):
+    """Create a man-page-length docstring."""
+    return u'\n\n'.join([PARAGRAPH] * paragraphs)
+
+
+def measure(func, repeat):
+    """Get megabytes per second for the given function (best of three runs)."""
+    best = min(timeit.repeat(func, number=repeat, repeat=3))
+    return repeat / best
+
+
+def main(paragraphs=200, repeat=50):
+    text = build_docstring(paragraphs)
+
+    def process():
+        Markup.process(text)
+
+    def paragraphs_():
+        list(Markup.paragraphs(text))
+
+    def write():
+        Markup.write(text, io.StringIO())
+
+    size = len(text) / float(1024 * 1024)
+    print("docstring: {size:.2f} MiB, {count} paragraphs".format(size=size, count=paragraphs))
+    print("{name:<12}{rate:>12}".format(name='path', rate='MiB/sec'))
+    for name, func in (('process', process), ('paragraphs', paragraphs_), ('write', write)):
+        print("{name:<12}{rate:>12,.2f}".format(name=name, rate=size * measure(func, repeat)))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
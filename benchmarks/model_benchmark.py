@@ -0,0 +1,76 @@
+"""Domain model memory benchmark.
+
+Description:
+-----------
+
+Builds a synthetic handler with many commands sharing
+many global options and reports memory retained by the
+handler class and by a handler instance, as well as the
+time needed to build them.
+
+Usage:
+
+    python benchmarks/model_benchmark.py [commands] [options]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import comandante as cli  # noqa: E402
+
+
+def make_handler_class(command_count):
+    """Create a handler class with the given number of commands."""
+    namespace = {}
+    for index in range(command_count):
+        name = 'command{index}'.format(index=index)
+
+        def func(self, first, second='second', *rest, **options):
+            """Synthetic command
+
+            Synthetic command long description.
+            """
+            return first, second, rest, options
+
+        namespace[name] = cli.option('local', 'l', int, 0)(cli.command(name)(func))
+    return type('Synthetic', (cli.Handler,), namespace)
+
+
+def make_handler(handler_class, option_count):
+    """Create a handler instance declaring the given number of global options."""
+    handler = handler_class()
+    for index in range(option_count):
+        handler.declare_option('global{index}'.format(index=index), 'g{index}'.format(index=index), int, 0)
+    return handler
+
+
+def measure(func, *args):
+    """Get (result, retained bytes, seconds) of the function call."""
+    tracemalloc.start()
+    try:
+        start = time.time()
+        result = func(*args)
+        elapsed = time.time() - start
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, retained, elapsed
+
+
+def main(command_count=10000, option_count=100):
+    handler_class, class_memory, class_time = measure(make_handler_class, command_count)
+    handler, handler_memory, handler_time = measure(make_handler, handler_class, option_count)
+    print("{commands:,} commands, {options} global options".format(commands=command_count, options=option_count))
+    print("{what:<12}{memory:>14}{time:>10}".format(what='', memory='retained MiB', time='seconds'))
+    for what, memory, elapsed in (('class', class_memory, class_time), ('instance', handler_memory, handler_time)):
+        print("{what:<12}{memory:>14.1f}{time:>10.2f}".format(what=what, memory=memory / 2.0 ** 20, time=elapsed))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,66 @@
+"""Option values benchmark.
+
+Description:
+-----------
+
+Measures construction of option values of a command with many
+(global) options and the attribute access to them. The generated
+option records are compared with the attribute dict proxy over a
+dict of values (the way option values used to be represented).
+
+Usage:
+
+    python benchmarks/options_benchmark.py [options] [repeat]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import comandante as cli  # noqa: E402
+from comandante.inner.bind import AttributeDict  # noqa: E402
+
+
+def build_command(option_count):
+    """Create a command with the given number of options."""
+    command = cli.command()(lambda **options: options)
+    for index in range(option_count):
+        command.declare_option('option{index}'.format(index=index), 'o{index}'.format(index=index), int, 0)
+    return command
+
+
+def attribute_dict(specified, declared):
+    """Build option values the way they used to be built."""
+    values = dict((option.name, option.default) for option in declared)
+    values.update(specified)
+    return AttributeDict(values), set(specified)
+
+
+def measure(func, repeat):
+    """Get microseconds per call (best of three runs)."""
+    return min(timeit.repeat(func, number=repeat, repeat=3)) / repeat * 1e6
+
+
+def main(option_count=150, repeat=20000):
+    command = build_command(option_count)
+    declared = list(command.declared_options.values())
+    specified = {'option1': 42, 'option7': 17}
+    name = 'option{index}'.format(index=option_count - 1)
+    record = command.options(specified)
+    proxy, _ = attribute_dict(specified, declared)
+    print("{count} options".format(count=option_count))
+    print("{what:<16}{construct:>14}{read:>14}".format(what='', construct='construct us', read='read us'))
+    for what, construct, value in (
+            ('record', lambda: command.options(specified), record),
+            ('attribute dict', lambda: attribute_dict(specified, declared), proxy)):
+        print("{what:<16}{construct:>14.2f}{read:>14.3f}".format(
+            what=what, construct=measure(construct, repeat),
+            read=measure(lambda: getattr(value, name), repeat * 10)))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
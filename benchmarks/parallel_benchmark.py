@@ -0,0 +1,90 @@
+"""Process pool fan-out benchmark.
+
+Description:
+-----------
+
+Measures how a CPU-bound command fanned out with `@cli.parallel`
+scales with the number of worker processes (up to the number of
+CPUs), and how long it takes to pass large results back with and
+without shared memory.
+
+Usage:
+
+    python benchmarks/parallel_benchmark.py [items] [rounds]
+"""
+
+from __future__ import print_function
+
+import hashlib
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import comandante as cli  # noqa: E402
+
+# Size of results of the transfer benchmark
+RESULT_SIZE = 32 << 20
+
+
+class Bench(cli.Handler):
+    """Parallel fan-out benchmark."""
+
+    @cli.parallel(over='names', workers='jobs')
+    @cli.option('jobs', 'j', int, 1, descr='Number of processes.')
+    @cli.signature(rounds=int)
+    @cli.command()
+    def hash(self, rounds, *names, **options):
+        """Hash the name many times"""
+        digest = names[0].encode('utf-8')
+        for _ in range(rounds):
+            digest = hashlib.sha256(digest).digest()
+        return digest
+
+    @cli.parallel(over='names', workers=2)
+    @cli.command()
+    def shared(self, *names):
+        """Produce large results passed through shared memory"""
+        return bytes(RESULT_SIZE)
+
+    @cli.parallel(over='names', workers=2, shared_memory=None)
+    @cli.command()
+    def pickled(self, *names):
+        """Produce large results passed through the result pipe"""
+        return bytes(RESULT_SIZE)
+
+
+def measure(argv):
+    """Get the best of three invocation times in seconds."""
+    bench = Bench()
+    return min(timeit.repeat(lambda: bench.invoke(argv), number=1, repeat=3))
+
+
+def worker_counts():
+    cpus = os.cpu_count() or 1
+    counts, count = [], 1
+    while count < cpus:
+        counts.append(count)
+        count *= 2
+    return counts + [cpus]
+
+
+def main(items=64, rounds=20000):
+    names = ['item{index}'.format(index=index) for index in range(items)]
+    serial = None
+    print("hash: {items} items x {rounds} rounds".format(items=items, rounds=rounds))
+    for workers in worker_counts():
+        elapsed = measure(['hash', '--jobs={workers}'.format(workers=workers), str(rounds)] + names)
+        serial = serial or elapsed
+        print("  {workers:3} workers: {time:7.3f} s (speedup {speedup:.2f}x)".format(
+            workers=workers, time=elapsed, speedup=serial / elapsed))
+    names = names[:8]
+    print("transfer: {items} results x {size} MiB".format(items=len(names), size=RESULT_SIZE >> 20))
+    print("  shared memory: {time:7.3f} s".format(time=measure(['shared'] + names)))
+    print("  pickle:        {time:7.3f} s".format(time=measure(['pickled'] + names)))
+
+
+if __name__ == '__main__':
+    arguments = [int(argument) for argument in sys.argv[1:]]
+    main(*arguments)
@@ -0,0 +1,70 @@
+"""Command-line parsing throughput benchmark.
+
+Description:
+-----------
+
+Measures how many command lines per second a single
+command can parse. Two paths are compared:
+
+ * rebuilt - a fresh `Parser` is constructed for every
+   command line (the way commands used to parse argv)
+ * invoke  - `Command.invoke` with whatever parsing
+   strategy the command currently uses
+
+Usage:
+
+    python benchmarks/parse_benchmark.py [repeat]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import comandante as cli  # noqa: E402
+from comandante.inner.model import Command  # noqa: E402
+from comandante.inner.parser import Parser  # noqa: E402
+
+
+def build_command(option_count=20):
+    """Create a command with a few arguments, a vararg and many options."""
+
+    def target(source, destination, mode='copy', *files, **options):
+        return source, destination, mode, files, options
+
+    command = Command.from_function(target, name='target', is_method=False)
+    command = cli.signature(files=int)(command)
+    for index in range(option_count):
+        command.declare_option('option{index}'.format(index=index), 'o{index}'.format(index=index), int, 0)
+    command.declare_option('verbose', 'v', bool, False)
+    return command
+
+
+ARGV = ['-v', '--option1=42', '-o2', '17', 'src', 'dst', 'move', '1', '2', '3', '4', '5']
+
+
+def measure(func, repeat):
+    """Get calls per second of the given function (best of three runs)."""
+    best = min(timeit.repeat(func, number=repeat, repeat=3))
+    return repeat / best
+
+
+def main(repeat=20000):
+    command = build_command()
+
+    def rebuilt():
+        Parser(command.signature, command.declared_options.values()).parse(ARGV)
+
+    def invoke():
+        command.invoke(None, ARGV)
+
+    print("{name:<10}{rate:>14}".format(name='path', rate='parses/sec'))
+    for name, func in (('rebuilt', rebuilt), ('invoke', invoke)):
+        print("{name:<10}{rate:>14,.0f}".format(name=name, rate=measure(func, repeat)))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
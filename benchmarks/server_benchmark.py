@@ -0,0 +1,123 @@
+"""Server mode latency benchmark.
+
+Description:
+-----------
+
+Compares end-to-end latency of a single invocation of a large
+generated handler (many nested handlers and commands):
+
+ * cold        - fresh interpreter imports and builds the handler
+ * client      - `python -m comandante.client` forwards invocation to a warm server
+ * bare client - client module copied out of the package, run with `python -S -E`
+
+Bare interpreter startup (`python -S -E -c pass`) is reported as
+the lower bound of any client latency.
+
+Usage:
+
+    python benchmarks/server_benchmark.py [groups] [commands] [runs]
+"""
+
+from __future__ import print_function
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+GROUP = '''
+class Group{index}(cli.Handler):
+    """Group of commands number {index}."""
+{commands}
+'''
+
+COMMAND = '''
+    @cli.option('verbose', 'v', bool, False, descr='Verbose output.')
+    @cli.option('count', 'c', int, 1, descr='Repeat count.')
+    @cli.command()
+    def command{index}(self, first, second=None, *rest, **options):
+        """Command number {index}
+
+        Long description of the command number {index}.
+        """
+        options = self.command{index}.options(options)
+        return first
+'''
+
+APP = '''
+class App(cli.Handler):
+    """Generated application."""
+
+    def __init__(self):
+        super(App, self).__init__()
+{declarations}
+'''
+
+
+def generate(directory, groups, commands):
+    """Generate application module with the given number of groups and commands."""
+    parts = ['import comandante as cli\n']
+    for group in range(groups):
+        body = ''.join(COMMAND.format(index=index) for index in range(commands))
+        parts.append(GROUP.format(index=group, commands=body))
+    declarations = ''.join("        self.declare_command('group{index}', Group{index}())\n".format(index=index)
+                           for index in range(groups))
+    parts.append(APP.format(declarations=declarations))
+    with open(os.path.join(directory, 'bench_app.py'), 'w') as file:
+        file.write(''.join(parts))
+
+
+def latency(command, environment, runs):
+    """Get median wall-clock latency of the command in milliseconds."""
+    timings = []
+    with open(os.devnull, 'w') as devnull:
+        for _ in range(runs):
+            start = time.time()
+            subprocess.check_call(command, env=environment, stdout=devnull)
+            timings.append((time.time() - start) * 1000.0)
+    return sorted(timings)[len(timings) // 2]
+
+
+def wait_for(path, timeout=30.0):
+    deadline = time.time() + timeout
+    while not os.path.exists(path):
+        if time.time() > deadline:
+            raise RuntimeError("Server didn't start")
+        time.sleep(0.05)
+
+
+def main(groups=50, commands=20, runs=21):
+    directory = tempfile.mkdtemp()
+    socket_path = os.path.join(directory, 'app.sock')
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, directory]))
+    generate(directory, groups, commands)
+    shutil.copy(os.path.join(ROOT, 'comandante', 'client.py'), os.path.join(directory, 'app_client.py'))
+    argv = ['group7', 'command3', '--count=2', 'a', 'b']
+    server = subprocess.Popen([sys.executable, '-m', 'comandante', 'serve', socket_path, 'bench_app:App'],
+                              env=environment)
+    try:
+        wait_for(socket_path)
+        cold = latency([sys.executable, '-c', 'import sys, bench_app; bench_app.App().invoke(sys.argv[1:])'] + argv,
+                       environment, runs)
+        client = latency([sys.executable, '-m', 'comandante.client', socket_path] + argv, environment, runs)
+        startup = latency([sys.executable, '-S', '-E', '-c', 'pass'], environment, runs)
+        bare = latency([sys.executable, '-S', '-E', os.path.join(directory, 'app_client.py'), socket_path] + argv,
+                       environment, runs)
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(directory)
+    print("handler: {groups} groups x {commands} commands".format(groups=groups, commands=commands))
+    print("cold:        {time:7.2f} ms".format(time=cold))
+    print("client:      {time:7.2f} ms ({ratio:.1f}x)".format(time=client, ratio=cold / client))
+    print("bare client: {time:7.2f} ms ({ratio:.1f}x)".format(time=bare, ratio=cold / bare))
+    print("startup:     {time:7.2f} ms".format(time=startup))
+
+
+if __name__ == '__main__':
+    arguments = [int(argument) for argument in sys.argv[1:]]
+    main(*arguments)
@@ -0,0 +1,257 @@
+"""Benchmark suite.
+
+Description:
+-----------
+
+Generates synthetic handlers at several scales (number of commands
+per handler, number of global options, nesting depth and the number
+of var-arg values) and measures:
+
+ * define    - creating the handler classes (decorators)
+ * construct - `Handler.__init__` of the root handler
+ * dispatch  - `Handler.invoke` of the most nested command
+ * parse     - `Parser.parse` of the most nested command line
+   with the var-arg values of the scale
+ * help      - `HelpWriter` rendering of the root handler and
+   of the most nested command at several widths
+ * import    - cold `import comandante` (once per run)
+
+Each measurement is repeated for an argparse parser of the same
+shape (subparsers for nested handlers, parent parser for global
+options) as the baseline.
+
+Results are written as JSON (see `main`), all timings are seconds
+per operation (the best of several runs). A human-readable summary
+is printed to stderr.
+
+Usage:
+
+    python benchmarks/suite_benchmark.py [output.json|-] [scale ...]
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import comandante as cli  # noqa: E402
+from comandante.inner.output.help_writer import HelpWriter  # noqa: E402
+from comandante.inner.output.terminal import Terminal  # noqa: E402
+from import_benchmark import import_time, median  # noqa: E402
+
+# Synthetic handler shapes
+SCALES = {
+    'small': {'commands': 10, 'options': 5, 'depth': 1, 'varargs': 10},
+    'medium': {'commands': 100, 'options': 20, 'depth': 3, 'varargs': 1000},
+    'large': {'commands': 1000, 'options': 100, 'depth': 5, 'varargs': 100000},
+}
+
+# Help rendering widths
+WIDTHS = (40, 80, 120)
+
+# Minimal duration of a timed run in seconds
+MIN_TIME = 0.1
+
+DESCRIPTION = """Synthetic command
+
+Long description of the synthetic command which spans
+a few lines, so that the help writer has to wrap it.
+"""
+
+
+def make_command(name):
+    def func(self, first, second='second', *rest, **options):
+        return first, second, rest, options
+
+    func.__doc__ = DESCRIPTION
+    command = cli.command(name)(func)
+    command = cli.option('count', 'c', int, 1, descr='Repeat count.')(command)
+    return cli.signature(rest=int)(command)
+
+
+def make_handler_class(shape, level=0):
+    """Create handler class of the given shape (nested handlers are created by the constructor)."""
+    namespace = {'__doc__': 'Synthetic handler at level {level}.'.format(level=level)}
+    for index in range(shape['commands']):
+        name = 'command{index}'.format(index=index)
+        namespace[name] = make_command(name)
+    child = make_handler_class(shape, level + 1) if level + 1 < shape['depth'] else None
+    options = shape['options'] if level == 0 else 0
+
+    def __init__(self):
+        cli.Handler.__init__(self)
+        if child is not None:
+            self.declare_command('group', child())
+        for index in range(options):
+            self.declare_option('option{index}'.format(index=index), 'o{index}'.format(index=index), int, 0)
+
+    namespace['__init__'] = __init__
+    return type('Synthetic{level}'.format(level=level), (cli.Handler,), namespace)
+
+
+def make_argparse(shape):
+    """Create argparse parser of the given shape.
+
+    :return: (root parser, the most nested command parser) tuple
+    """
+    common = argparse.ArgumentParser(add_help=False)
+    for index in range(shape['options']):
+        common.add_argument('--option{index}'.format(index=index), '-o{index}'.format(index=index), type=int, default=0)
+    root = parser = argparse.ArgumentParser(prog='synthetic', description='Synthetic handler at level 0.')
+    for level in range(shape['depth']):
+        subparsers = parser.add_subparsers(dest='level{level}'.format(level=level))
+        for index in range(shape['commands']):
+            command = subparsers.add_parser('command{index}'.format(index=index), parents=[common],
+                                            help='Synthetic command', description=DESCRIPTION)
+            command.add_argument('--count', '-c', type=int, default=1, help='Repeat count.')
+            command.add_argument('first')
+            command.add_argument('second', nargs='?', default='second')
+            command.add_argument('rest', nargs='*', type=int)
+            command.set_defaults(func=lambda first, second, rest, **options: (first, second, rest, options))
+        if level + 1 < shape['depth']:
+            parser = subparsers.add_parser('group', description='Synthetic handler at level {level}.'.format(
+                level=level + 1))
+    return root, command
+
+
+def measure(func):
+    """Get the best time of a single call in seconds."""
+    number = 1
+    elapsed = timeit.timeit(func, number=number)
+    while elapsed < MIN_TIME:
+        number = max(number * 2, int(number * MIN_TIME / max(elapsed, 1e-9)))
+        elapsed = timeit.timeit(func, number=number)
+    return min([elapsed] + timeit.repeat(func, number=number, repeat=2)) / number
+
+
+def command_line(shape, varargs):
+    """Get arguments of the most nested command (without command names)."""
+    values = [str(index) for index in range(varargs)]
+    return ['-c', '2', '--option1=3', 'first', 'second'] + values
+
+
+def bench_comandante(shape):
+    handler_class = make_handler_class(shape)
+    handler = handler_class()
+    path = ['group'] * (shape['depth'] - 1) + ['command0']
+    command = handler
+    for name in path:
+        command = command.declared_commands[name]
+    dispatch_argv = path + command_line(shape, 3)
+    parse_argv = command_line(shape, shape['varargs'])
+    results = {
+        'define': measure(lambda: make_handler_class(shape)),
+        'construct': measure(handler_class),
+        'dispatch': measure(lambda: handler.invoke(dispatch_argv)),
+        'parse': measure(lambda: command.parser.parse(parse_argv)),
+        'help': {},
+    }
+    for width in WIDTHS:
+        writer = HelpWriter(terminal=Terminal(cols=width))
+        results['help'][str(width)] = {
+            'handler': measure(lambda: writer.document_handler(handler)),
+            'command': measure(lambda: writer.document_command(command, path)),
+        }
+    return results
+
+
+def bench_argparse(shape):
+    root, command = make_argparse(shape)
+    dispatch_argv = ['group'] * (shape['depth'] - 1) + ['command0'] + command_line(shape, 3)
+    parse_argv = command_line(shape, shape['varargs'])
+
+    def dispatch():
+        arguments = vars(root.parse_args(dispatch_argv))
+        return arguments.pop('func')(**arguments)
+
+    results = {
+        'construct': measure(lambda: make_argparse(shape)),
+        'dispatch': measure(dispatch),
+        'parse': measure(lambda: command.parse_args(parse_argv)),
+        'help': {},
+    }
+    for width in WIDTHS:
+        formatter = lambda prog, width=width: argparse.HelpFormatter(prog, width=width)  # noqa: E731
+        root.formatter_class = command.formatter_class = formatter
+        results['help'][str(width)] = {
+            'handler': measure(root.format_help),
+            'command': measure(command.format_help),
+        }
+    return results
+
+
+def bench_import(runs=11):
+    """Get median cold import times in seconds."""
+    return dict((module, median([import_time(module) for _ in range(runs)]) / 1e6)
+                for module in ('comandante', 'argparse', 'json'))
+
+
+def summarize(name, shape, results):
+    """Print human-readable comparison of the scale results to stderr."""
+    print("{name}: {shape}".format(name=name, shape=', '.join(
+        '{key}={value}'.format(key=key, value=shape[key]) for key in sorted(shape))), file=sys.stderr)
+    print("  {metric:<16}{comandante:>14}{argparse:>14}".format(
+        metric='ms per call', comandante='comandante', argparse='argparse'), file=sys.stderr)
+    own, baseline = results['comandante'], results['argparse']
+    rows = [('define', own['define'], None), ('construct', own['construct'], baseline['construct']),
+            ('dispatch', own['dispatch'], baseline['dispatch']), ('parse', own['parse'], baseline['parse'])]
+    for width in WIDTHS:
+        for what in ('handler', 'command'):
+            rows.append(('help {what} {width}'.format(what=what, width=width),
+                         own['help'][str(width)][what], baseline['help'][str(width)][what]))
+    for metric, mine, theirs in rows:
+        print("  {metric:<16}{mine:>14.4f}{theirs:>14}".format(
+            metric=metric, mine=mine * 1000.0, theirs='' if theirs is None else '{0:.4f}'.format(theirs * 1000.0)),
+            file=sys.stderr)
+
+
+def main(output='-', scales=None):
+    """Run the suite and write JSON results.
+
+    The results have the following structure::
+
+        {"environment": {"python": ..., "implementation": ..., "platform": ..., "time": ...},
+         "import": {"comandante": seconds, "argparse": seconds, "json": seconds},
+         "scales": {<scale>: {"shape": {...},
+                              "comandante": {"define", "construct", "dispatch", "parse",
+                                             "help": {<width>: {"handler", "command"}}},
+                              "argparse": {"construct", "dispatch", "parse", "help": {...}}}}}
+
+    :param output: output file path ('-' for stdout)
+    :param scales: names of the scales to run (all by default)
+    """
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'import': bench_import(),
+        'scales': {},
+    }
+    print("import: " + ', '.join('{module} {time:.2f} ms'.format(module=module, time=seconds * 1000.0)
+                                 for module, seconds in sorted(report['import'].items())), file=sys.stderr)
+    for name in scales or sorted(SCALES, key=lambda scale: SCALES[scale]['commands']):
+        shape = SCALES[name]
+        results = {'shape': shape, 'comandante': bench_comandante(shape), 'argparse': bench_argparse(shape)}
+        report['scales'][name] = results
+        summarize(name, shape, results)
+    if output == '-':
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+    else:
+        with open(output, 'w') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    main(arguments[0] if arguments else '-', arguments[1:])
@@ -0,0 +1,70 @@
+"""Numeric list types benchmark.
+
+Description:
+-----------
+
+Compares `listof(int)` with the array-backed numeric
+types on a large comma-separated value: conversion
+throughput and the memory retained by the result
+(as well as the peak memory during conversion).
+
+Usage:
+
+    python benchmarks/types_benchmark.py [size]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import comandante as cli  # noqa: E402
+
+
+def memory(convert, value):
+    """Get (retained, peak) memory in bytes allocated by conversion."""
+    tracemalloc.start()
+    try:
+        result = convert(value)
+        retained, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return retained, peak
+
+
+def throughput(convert, value, size):
+    """Get converted values per second (best of three runs)."""
+    best = min(timeit.repeat(lambda: convert(value), number=3, repeat=3)) / 3
+    return size / best
+
+
+def main(size=1000000):
+    value = ','.join(map(str, range(size)))
+    types = [
+        ('listof(int)', cli.listof(int)),
+        ('intarray(64)', cli.intarray(ndarray=False)),
+        ('intarray(32)', cli.intarray(width=32, ndarray=False)),
+    ]
+    try:
+        import numpy  # noqa: F401
+        types.append(('ndarray(64)', cli.intarray(ndarray=True)))
+    except ImportError:
+        pass
+
+    print("{size:,} comma-separated integers".format(size=size))
+    print("{name:<14}{rate:>16}{retained:>14}{peak:>14}".format(
+        name='type', rate='values/sec', retained='retained MiB', peak='peak MiB'))
+    for name, convert in types:
+        retained, peak = memory(convert, value)
+        rate = throughput(convert, value, size)
+        print("{name:<14}{rate:>16,.0f}{retained:>14.1f}{peak:>14.1f}".format(
+            name=name, rate=rate, retained=retained / 2.0 ** 20, peak=peak / 2.0 ** 20))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
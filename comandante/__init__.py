@@ -9,15 +9,21 @@ Please refer to comandante documentation for more details:
 https://github.com/stepan-anokhin/comandante/blob/master/README.md
 """
 
-from .decorators import option, command, signature
+from .decorators import option, command, signature, concurrent, parallel
 from .handler import Handler
-from .types import choice, listof
+from .types import choice, listof, stream, intarray, floatarray, completed
 
 __all__ = [
     'option',
     'command',
     'signature',
+    'concurrent',
+    'parallel',
     'choice',
-    'listof'
+    'listof',
+    'stream',
+    'intarray',
+    'floatarray',
+    'completed',
     'Handler',
 ]
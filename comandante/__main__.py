@@ -0,0 +1,160 @@
+"""Comandante command-line tools.
+
+Usage:
+
+    python -m comandante build-help --output=help package.module:App 1.0
+    python -m comandante completion --shell=bash package.module:App
+    python -m comandante refresh-completion package.module:App 'app command' parameter
+    python -m comandante serve /tmp/app.sock package.module:App
+    python -m comandante profile --report=json package.module:App command arguments
+    python -m comandante replay --repeat=10 package.module:App invocations.log
+"""
+
+import sys
+
+import comandante as cli
+from comandante.inner.completion_cache import CompletionCache, DEFAULT_MAX_SIZE, cache_directory, entry_key
+from comandante.inner.lazy import import_object
+from comandante.inner.output.completion import SHELLS, completion_script, parameter_type
+from comandante.inner.output.help_files import build_help_files
+from comandante.inner.output.terminal import Terminal
+from comandante.types import Stream
+
+
+def load_handler(path):
+    """Get handler by import path (of a handler class or instance)."""
+    handler = import_object(path)
+    if isinstance(handler, type):
+        handler = handler()
+    return handler
+
+
+class Comandante(cli.Handler):
+    """Comandante command-line tools."""
+
+    @cli.option('output', 'o', str, 'help', descr='Output directory.')
+    @cli.option('width', 'w', int, Terminal.DEFAULT_MAX_COLS, descr='Width of the rendered help.')
+    @cli.command(name='build-help')
+    def build_help(self, handler, version, **options):
+        """Pre-render help files
+
+        Render roff man pages, plain text and terminal help
+        for each command path of the handler given by import
+        path of the form *package.module:attribute*. The
+        attribute may be a handler class or a handler instance.
+
+        Serve the files at runtime with *Handler.use_help_files*.
+        """
+        options = self.build_help.options(options)
+        written = build_help_files(load_handler(handler), options.output, version, width=options.width)
+        print("{count} files written to {output}".format(count=len(written), output=options.output))
+        return written
+
+    @cli.option('shell', 's', cli.choice(*SHELLS), 'bash', descr='Target shell.')
+    @cli.option('name', 'n', str, '', descr='Program name (handler name by default).')
+    @cli.command()
+    def completion(self, handler, **options):
+        """Generate shell completion script
+
+        Print completion script for the handler given by import path
+        of the form *package.module:attribute*. The script completes
+        commands, options and choice values without running python.
+
+        Dynamic values (see *comandante.completed*) are read from the
+        completion cache, stale entries are refreshed in the background
+        by the *refresh-completion* command run by the same interpreter.
+        """
+        options = self.completion.options(options)
+        refresh = [sys.executable, '-m', 'comandante', 'refresh-completion', handler]
+        script = completion_script(load_handler(handler), options.shell, name=options.name or None, refresh=refresh)
+        sys.stdout.write(script)
+        return script
+
+    @cli.option('max_size', 's', int, DEFAULT_MAX_SIZE, descr='Completion cache size limit in bytes.')
+    @cli.command(name='refresh-completion')
+    def refresh_completion(self, handler, path, parameter, **options):
+        """Refresh cached completion values
+
+        Run completion provider of the argument or option *parameter*
+        of the command given by space-separated *path* (starting with
+        the program name) and store the values in the completion cache.
+        """
+        options = self.refresh_completion.options(options)
+        path = path.split(' ')
+        key = entry_key(path, parameter)
+        cache = CompletionCache(cache_directory(path[0]), max_size=options.max_size)
+        try:
+            command = load_handler(handler)
+            for name in path[1:]:
+                command = command.declared_commands[name]
+            value_type = parameter_type(command, parameter)
+            if isinstance(value_type, Stream):
+                value_type = value_type.value_type
+        except Exception:
+            # the completion script has locked the entry before running this command
+            cache.unlock(key)
+            raise
+        return cache.refresh(key, value_type.provider, value_type.ttl)
+
+    @cli.option('report', 'r', str, 'text', descr='Report: text, json, memory, <path>.json, <path>.pstats, <path>.snapshot (comma-separated).')
+    @cli.command()
+    def profile(self, handler, *argv, **options):
+        """Profile handler invocation
+
+        Import the handler given by import path, construct it and
+        invoke it with the given arguments, reporting the time spent
+        in each phase of the invocation (including import and
+        construction of the handler) to stderr.
+        """
+        from comandante.inner.profiling import Profile, Settings, profiled
+        options = self.profile.options(options)
+        settings = Settings(options.report)
+        profile = Profile(settings.probes())
+        profile.start()
+        with profile.phase('import'):
+            target = import_object(handler)
+        with profile.phase('construct'):
+            target = target() if isinstance(target, type) else target
+        return profiled(target, list(argv), settings, profile=profile)
+
+    @cli.option('repeat', 'r', int, 1, descr='Number of times to replay the log.')
+    @cli.option('json', 'j', bool, False, descr='Print JSON report.')
+    @cli.command()
+    def replay(self, handler, log, **options):
+        """Replay recorded invocations
+
+        Push the command lines recorded by *Handler.enable_recording*
+        through command lookup and parsing of the handler given by
+        import path (without running commands) and report throughput
+        and latency percentiles along with the recorded latencies.
+        """
+        import json
+        from comandante.inner.recording import format_replay, read_log, replay
+        options = self.replay.options(options)
+        report = replay(load_handler(handler), read_log(log), options.repeat)
+        print(json.dumps(report, sort_keys=True) if options.json else format_replay(report))
+        return report
+
+    @cli.option('interval', 'i', float, 1.0, descr='Source files polling interval in seconds.')
+    @cli.command()
+    def serve(self, socket, handler, **options):
+        """Serve handler invocations on a Unix socket
+
+        Keep the handler given by import path warm in a long-running
+        process and invoke it in forked workers. Invocations are
+        forwarded by the thin client:
+
+        |    $ python -m comandante.client <socket> [arguments...]
+
+        The server restarts itself when any of its python source
+        files changes.
+        """
+        from comandante.server import serve
+        options = self.serve.options(options)
+        restart = [sys.executable, '-m', 'comandante', 'serve', '--interval={interval}'.format(interval=options.interval),
+                   socket, handler]
+        serve(lambda: load_handler(handler), socket, restart_argv=restart, interval=options.interval)
+
+
+if __name__ == '__main__':
+    Comandante().invoke(sys.argv[1:])
@@ -0,0 +1,119 @@
+"""Command-line argument sources.
+
+Description:
+-----------
+
+This module provides lazy sources of raw command-line
+arguments that may be passed to `Handler.invoke` instead
+of an in-memory list. They make it possible to process
+more arguments than the operating system allows to pass
+to a single process (e.g. instead of chunking them with
+`xargs`):
+
+    CliTool().invoke(argv.expand(sys.argv[1:]))
+
+    CliTool().invoke(itertools.chain(sys.argv[1:], argv.null_delimited()))
+
+Options and leading positional arguments are parsed up front,
+the remaining arguments are consumed incrementally. To avoid
+materializing them use `comandante.types.stream` argument.
+"""
+
+import mmap
+import os
+import sys
+
+# Decode raw bytes the same way as the interpreter decodes sys.argv
+_decode = getattr(os, 'fsdecode', str)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def expand(argv, prefix='@'):
+    """Expand response files.
+
+    Each argument of the form `@path` is replaced with the
+    arguments read from the file (see `response_file`).
+
+    :param argv: raw command-line arguments
+    :param prefix: response file prefix
+    :return: iterator over expanded command-line arguments
+    """
+    for token in argv:
+        if token.startswith(prefix) and len(token) > len(prefix):
+            for value in response_file(token[len(prefix):]):
+                yield value
+        else:
+            yield token
+
+
+def response_file(path):
+    """Read command-line arguments from the response file.
+
+    Arguments are separated either by NUL characters (if the
+    file contains any, e.g. produced by `find -print0`) or by
+    new lines. The file is memory-mapped and read lazily.
+
+    :param path: response file path
+    :return: iterator over arguments contained in the file
+    """
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            delimiter = b'\0' if data.find(b'\0') >= 0 else b'\n'
+            start = 0
+            while start < size:
+                end = data.find(delimiter, start)
+                if end < 0:
+                    end = size
+                token = data[start:end]
+                if delimiter == b'\n' and token.endswith(b'\r'):
+                    token = token[:-1]
+                yield _decode(token)
+                start = end + 1
+        finally:
+            data.close()
+
+
+def null_delimited(stream=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Read NUL-delimited command-line arguments from the stream.
+
+    This is the same input format as accepted by `xargs -0`.
+    Binary data is decoded the same way as `sys.argv`, text
+    streams without the underlying binary buffer are read as is.
+
+    :param stream: binary or text stream (stdin by default)
+    :param chunk_size: size of chunks read from the stream
+    :return: iterator over arguments read from the stream
+    """
+    stream = stream or sys.stdin
+    stream = getattr(stream, 'buffer', stream)
+    delimiter, decode, parts = None, None, []
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        if delimiter is None:
+            binary = isinstance(chunk, bytes)
+            delimiter, decode = (b'\0', _decode) if binary else (u'\0', _identity)
+        tokens = chunk.split(delimiter)
+        if len(tokens) == 1:
+            # long argument spanning several chunks, joined once it is complete
+            parts.append(chunk)
+            continue
+        parts.append(tokens[0])
+        yield decode(delimiter[:0].join(parts))
+        for index in range(1, len(tokens) - 1):
+            yield decode(tokens[index])
+        parts = [tokens[-1]]
+    if delimiter is not None:
+        pending = delimiter[:0].join(parts)
+        if pending:
+            yield decode(pending)
+
+
+def _identity(token):
+    return token
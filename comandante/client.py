@@ -0,0 +1,117 @@
+"""Thin client of the persistent server mode.
+
+Description:
+-----------
+
+This module forwards command-line arguments, environment, working
+directory and standard streams to a `comandante.server` and exits
+with the status of the invoked command:
+
+    python -m comandante.client <socket> [arguments...]
+
+The module doesn't depend on the rest of comandante, so it may be
+copied (e.g. as a launcher script of the application) and run with
+the fastest interpreter startup:
+
+    python -S -E app-client.py <socket> [arguments...]
+
+Signals (Ctrl-C, termination) received by the client are forwarded
+to the worker running the command.
+"""
+
+import array
+import os
+import struct
+import sys
+
+try:
+    # Low-level modules don't import enum and friends, which take
+    # most of the client startup time
+    import _signal as signal
+    import _socket as socket
+except ImportError:
+    import signal
+    import socket
+
+# Size of integers of the wire protocol
+HEADER = struct.Struct('!I')
+STATUS = struct.Struct('!i')
+
+# Standard file descriptors forwarded to the server
+STDIO_FDS = (0, 1, 2)
+
+# Signals forwarded to the worker
+FORWARDED_SIGNALS = ('SIGINT', 'SIGTERM', 'SIGHUP', 'SIGQUIT')
+
+# Exit status when the worker is gone without reporting its status
+LOST_STATUS = 255
+
+
+def encode_request(argv, cwd, environ):
+    """Encode invocation request.
+
+    :param argv: command-line arguments (strings)
+    :param cwd: working directory
+    :param environ: environment variables mapping
+    :return: request bytes (without the header)
+    """
+    fields = [cwd, str(len(argv))] + list(argv)
+    fields += ['{name}={value}'.format(name=name, value=value) for name, value in environ.items()]
+    return b'\0'.join(os.fsencode(field) for field in fields)
+
+
+def _receive(connection, size):
+    """Receive exactly `size` bytes (None if the connection is closed)."""
+    data = b''
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def invoke(path, argv):
+    """Invoke command by the server listening on the socket path, get exit status."""
+    request = encode_request(argv, os.getcwd(), os.environ)
+    message = HEADER.pack(len(request)) + request
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(path)
+        fds = array.array('i', STDIO_FDS)
+        sent = connection.sendmsg([message], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds.tobytes())])
+        connection.sendall(message[sent:])
+        pid = _receive(connection, STATUS.size)
+        if pid is None:
+            return LOST_STATUS
+        _forward_signals(STATUS.unpack(pid)[0])
+        status = _receive(connection, STATUS.size)
+        return LOST_STATUS if status is None else STATUS.unpack(status)[0]
+    finally:
+        connection.close()
+
+
+def _forward_signals(pid):
+    """Forward signals received by the client to the worker."""
+
+    def forward(signum, frame):
+        os.kill(pid, signum)
+
+    for name in FORWARDED_SIGNALS:
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), forward)
+
+
+def main(argv):
+    if len(argv) < 1:
+        sys.stderr.write("Usage: python -m comandante.client <socket> [arguments...]\n")
+        return 2
+    try:
+        return invoke(argv[0], argv[1:])
+    except OSError as error:
+        sys.stderr.write("Cannot connect to {path}: {error}\n".format(path=argv[0], error=error))
+        return LOST_STATUS
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -44,6 +44,54 @@ def option(name, short, type, default, descr=''):
     return decorator
 
 
+def concurrent(over, limit=10):
+    """Run coroutine command concurrently for each var-arg item.
+
+    The command is invoked once per item of the var-arg `over`
+    (with the same other arguments and options), at most `limit`
+    invocations are awaited at once. Results are returned as
+    a list in the input order.
+
+    :param over: var-arg name
+    :param limit: concurrency limit or name of the option holding it
+    :return: a new decorator fanning out the command
+    """
+
+    def decorator(element):
+        """Decorator setting fan-out strategy."""
+        from comandante.inner.fanout import ConcurrentFanOut
+        element.set_fan_out(ConcurrentFanOut(over, limit))
+        return element
+
+    return decorator
+
+
+def parallel(over, workers=None, chunksize=1, fail_fast=False, shared_memory=1 << 20):
+    """Run command in a pool of processes for each var-arg item.
+
+    The command is invoked once per item of the var-arg `over` (with
+    the same other arguments and options) by worker processes. Results
+    are returned as a list in the input order, standard output of each
+    invocation is printed in the input order as well.
+
+    :param over: var-arg name
+    :param workers: number of processes (None for the number of CPUs) or name of the option holding it
+    :param chunksize: number of items sent to a worker process at once
+    :param fail_fast: stop on the first error (otherwise all items are processed before the error is raised)
+    :param shared_memory: results larger than this number of bytes (bytes, bytearray or arrays)
+        are passed back through shared memory instead of pickling (None to always pickle)
+    :return: a new decorator fanning out the command
+    """
+
+    def decorator(element):
+        """Decorator setting fan-out strategy."""
+        from comandante.inner.fanout import ParallelFanOut
+        element.set_fan_out(ParallelFanOut(over, workers, chunksize, fail_fast, shared_memory))
+        return element
+
+    return decorator
+
+
 def signature(**types):
     """Set command argument types.
 
@@ -53,7 +101,7 @@ def signature(**types):
 
     def decorator(element):
         """Decorator setting argument types."""
-        element.signature.set_types(types)
+        element.set_types(types)
         return element
 
     return decorator
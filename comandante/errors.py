@@ -36,12 +36,15 @@ class TooManyArguments(CliSyntaxException):
 class InvalidArgumentValue(CliSyntaxException):
     """Raised when argument or option value has invalid syntax."""
 
-    def __init__(self, argument, value):
+    def __init__(self, argument, value, position=None):
         pattern = "Invalid value for argument '{name}' of type '{type}': '{value}'"
         error_message = pattern.format(name=argument.name, type=getname(argument.type), value=value)
+        if position is not None:
+            error_message += " (at position {position})".format(position=position)
         super(InvalidArgumentValue, self).__init__(error_message)
         self.argument = argument
         self.value = value
+        self.position = position
 
 
 class InvalidOptionValue(CliSyntaxException):
@@ -85,3 +88,51 @@ class UnknownCommand(CliSyntaxException):
     def __init__(self, command):
         super(UnknownCommand, self).__init__("Unknown command: '{name}'".format(name=command))
         self.command = command
+
+
+class Diagnostic(object):
+    """Structured description of a command-line syntax error.
+
+    Unlike printing the error along with help, diagnostics point at
+    the offending command-line argument so that they may be logged
+    or reported by the embedding application.
+    """
+
+    __slots__ = ('error', 'position', 'token', 'expected')
+
+    def __init__(self, error, position=None, token=None, expected=None):
+        """Initialize instance.
+
+        :param error: syntax error (`CliSyntaxException`)
+        :param position: position of the offending argument in the command line (None if unknown)
+        :param token: offending argument (None if the argument is missing)
+        :param expected: description of the expected argument (None if not applicable)
+        """
+        self.error = error
+        self.position = position
+        self.token = token
+        self.expected = expected
+
+    @property
+    def kind(self):
+        """Get error kind (the exception class name)."""
+        return type(self.error).__name__
+
+    @property
+    def message(self):
+        """Get error message."""
+        return str(self.error)
+
+    def as_dict(self):
+        """Get JSON-serializable representation."""
+        return {
+            'kind': self.kind,
+            'message': self.message,
+            'position': self.position,
+            'token': self.token,
+            'expected': self.expected,
+        }
+
+    def __repr__(self):
+        return 'Diagnostic({kind}, position={position!r}, token={token!r}, expected={expected!r})'.format(
+            kind=self.kind, position=self.position, token=self.token, expected=self.expected)
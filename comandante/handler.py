@@ -11,13 +11,58 @@ from __future__ import print_function
 
 import comandante.decorators as decor
 from comandante.errors import UnknownCommand
-from comandante.inner.bind import BoundCommand, ImmutableDict
-from comandante.inner.helpers import describe, getname
+from comandante.inner.bind import BoundCommand, mapping_view
+from comandante.inner.helpers import describe, document_handler, getname, has_help_files
 from comandante.inner.model import Option, Command
-from comandante.inner.output.help_writer import HelpWriter
 
 
-class Handler(object):
+class HandlerMeta(type):
+    """Handler metaclass.
+
+    Collects commands declared as class attributes (including
+    inherited ones) once, when the handler class is created,
+    so that handler instantiation doesn't need reflection.
+    """
+
+    def __init__(cls, name, bases, namespace):
+        super(HandlerMeta, cls).__init__(name, bases, namespace)
+        type.__setattr__(cls, '_class_commands', cls._collect_commands())
+
+    def _collect_commands(cls):
+        """Collect (attribute name, command) pairs visible from the class."""
+        commands = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if type(value) is Command:
+                    commands[name] = value
+                else:
+                    commands.pop(name, None)
+        return tuple(sorted(commands.items(), key=lambda item: item[0]))
+
+    def _refresh_commands(cls):
+        """Recollect commands of the class and all its subclasses."""
+        type.__setattr__(cls, '_class_commands', cls._collect_commands())
+        for subclass in cls.__subclasses__():
+            subclass._refresh_commands()
+
+    def __setattr__(cls, name, value):
+        refresh = type(value) is Command or type(cls.__dict__.get(name)) is Command
+        super(HandlerMeta, cls).__setattr__(name, value)
+        if refresh:
+            cls._refresh_commands()
+
+    def __delattr__(cls, name):
+        refresh = type(cls.__dict__.get(name)) is Command
+        super(HandlerMeta, cls).__delattr__(name)
+        if refresh:
+            cls._refresh_commands()
+
+
+# Python 2 and 3 compatible way to use metaclass
+_HandlerBase = HandlerMeta('_HandlerBase', (object,), {})
+
+
+class Handler(_HandlerBase):
     """Command-line interface handler.
 
     Handler represents a collection of cli-commands invoked by their names.
@@ -38,19 +83,19 @@ class Handler(object):
         """
         self._name = name or getname(type(self)).lower()
         self._declared_commands = {}
+        self._declared_commands_view = mapping_view(self._declared_commands)
         self._declared_options = {}
+        self._declared_options_view = mapping_view(self._declared_options)
         self._short_options = set()
         self._brief, self._descr = self._describe()
         self._discover_commands()
 
     def _discover_commands(self):
-        """Discover commands declared as class-methods."""
-        for name in dir(self):
-            value = getattr(self, name)
-            if type(value) is Command:
-                bound_command = BoundCommand(command=value.copy(), handler=self)
-                setattr(self, name, bound_command)
-                self.declare_command(bound_command.name, bound_command)
+        """Declare commands collected from the handler class."""
+        for name, command in type(self)._class_commands:
+            bound_command = BoundCommand(command=command, handler=self)
+            setattr(self, name, bound_command)
+            self.declare_command(bound_command.name, bound_command)
 
     def _describe(self):
         """Derive description from the docstring."""
@@ -60,19 +105,156 @@ class Handler(object):
         return describe(self)
 
     def invoke(self, argv, context=()):
-        """Invoke cli-handler with the given raw command-line arguments."""
-        if len(argv) == 0:
-            self.help()
-            return
-        command_name, argv = argv[0], argv[1:]
-        if command_name not in self._declared_commands:
-            error = UnknownCommand(command=' '.join(context + (command_name,)))
+        """Invoke cli-handler with the given raw command-line arguments.
+
+        Arguments may be given as a list or as any other iterable
+        (see `comandante.argv`), which will be consumed lazily.
+        """
+        is_root = not context
+        element, argv, context, error = resolve(self, argv, context)
+        if error is not None:
             print(error)
-            self.help()
+            element.help()
             raise error
+        if argv is None:
+            element.help()
+            return
+        if is_root and isinstance(element, BoundCommand) and has_help_files(self.name):
+            # help files are looked up by the full name (the one `help` documents commands by)
+            context = (self.name,) + context
+        return element.invoke(argv, context)
+
+    def invoke_async(self, argv, context=()):
+        """Invoke cli-handler from a running event loop.
+
+        Same as `invoke`, but coroutine commands are awaited in the
+        running loop. Ordinary commands are called directly (and thus
+        block the loop while running).
+
+        :return: awaitable command result
+        """
+        from comandante.inner.asynchronous import invoke_async
+        return invoke_async(self.invoke, argv, context)
+
+    def invoke_many(self, argv_list, workers=None, all_errors=False):
+        """Invoke many independent command lines concurrently.
+
+        All command lines are parsed up front, then the commands run
+        on a thread pool. Errors don't print help and don't stop the
+        batch, they are recorded in the outcome of the corresponding
+        line instead. Syntax errors are described by diagnostics
+        (see `comandante.errors.Diagnostic`).
+
+        :param argv_list: iterable of raw command-line argument sequences
+        :param workers: number of threads (None for the thread pool default, 1 to run sequentially)
+        :param all_errors: describe all syntax errors of a line (not just the first one)
+        :return: list of `Invocation` (result, error, diagnostics and timings) in the input order
+        """
+        from comandante.inner.batch import invoke_many
+        return invoke_many(self, argv_list, workers, all_errors)
+
+    def try_invoke(self, argv, all_errors=False):
+        """Invoke cli-handler without printing errors and help.
+
+        Same as `invoke`, but errors are not raised, they are recorded
+        in the outcome instead (see `invoke_many`).
+
+        :param argv: raw command-line arguments
+        :param all_errors: describe all syntax errors (not just the first one)
+        :return: `Invocation` (result, error, diagnostics and timings)
+        """
+        from comandante.inner.batch import invoke_many
+        return invoke_many(self, [argv], 1, all_errors)[0]
+
+    def validate(self, argv):
+        """Find all syntax errors of the command line without running the command.
+
+        :param argv: raw command-line arguments
+        :return: list of `comandante.errors.Diagnostic` (empty if the command line is valid)
+        """
+        from comandante.inner.batch import diagnose
+        return diagnose(self, list(argv))
+
+    def enable_profiling(self, option='profile'):
+        """Accept the profile option before the command name.
+
+        Invocations like `tool --profile <command> [arguments...]` are
+        profiled: time spent on command lookup, parsing, type conversion,
+        help rendering and the command body is reported to stderr. The
+        option value (`--profile=<value>`) is a comma-separated list of
+        `text` (the default), `json` (JSON report to stderr), `<path>.json`
+        (JSON report file), `<path>.pstats` (cProfile statistics of
+        the command body), `memory` (peak memory and top allocation sites
+        of each phase traced with tracemalloc) and `<path>.snapshot`
+        (tracemalloc snapshots taken at the end of each phase, written
+        to `<path>.<phase>.snapshot`).
+
+        Handlers without profiling enabled are not affected at all.
+
+        :param option: name of the profile option
+        """
+        from comandante.inner.profiling import ProfilingInvoke
+        ProfilingInvoke.of(self).enable_option(option)
+
+    def enable_recording(self, path, anonymize=True):
+        """Record invocations of the handler.
+
+        Each invocation appends a JSON line to the log file: the
+        command-line arguments and the time spent in each phase of
+        the invocation (see `enable_profiling`). Unless disabled,
+        values are anonymized: letters and digits are masked, while
+        command names, option names and choice values are kept, so
+        that the recorded lines are parsed the same way.
+
+        Replay the log with `python -m comandante replay` to measure
+        parsing throughput and latency on the recorded workload.
+
+        :param path: log file path
+        :param anonymize: mask argument and option values
+        """
+        from comandante.inner.profiling import ProfilingInvoke
+        from comandante.inner.recording import Recorder
+        ProfilingInvoke.of(self).recorder = Recorder(path, anonymize)
+
+    def freeze(self):
+        """Compile the whole handler tree into an immutable dispatch table.
 
-        command = self._declared_commands.get(command_name, self.help)
-        return command.invoke(argv, context + (command_name,))
+        The resulting table invokes commands the same way as the handler
+        does, but resolves nested command paths in a single pass. Command
+        paths, options and parsers are fixed: commands, options and types
+        declared later are not reflected.
+
+        :return: a new `DispatchTable`
+        """
+        from comandante.inner.dispatch import DispatchTable
+        return DispatchTable(self)
+
+    def use_help_files(self, directory, version):
+        """Serve help from pre-rendered files.
+
+        Help files are built by `python -m comandante build-help`.
+        They are used only if they were built for this handler (by its
+        name), for the given version (e.g. the installed version of the
+        application) and for the current terminal width, otherwise help
+        is rendered as usual. Files serve the command paths of this
+        handler only.
+
+        :param directory: help files directory
+        :param version: application version
+        """
+        from comandante.inner.output.help_cache import help_cache
+        from comandante.inner.output.help_files import HelpFiles
+        help_cache.add_help_files(HelpFiles(directory, version, self.name))
+
+    @staticmethod
+    def _split_command(argv):
+        """Split raw command-line arguments into command name and the rest."""
+        if isinstance(argv, (list, tuple)):
+            if len(argv) == 0:
+                return None, argv
+            return argv[0], argv[1:]
+        argv = iter(argv)
+        return next(argv, None), argv
 
     @decor.command()
     def help(self, command=None, *subcommands):
@@ -114,15 +296,44 @@ class Handler(object):
 
     def full_doc(self, full_name=None):
         """Get full documentation"""
-        help_writer = HelpWriter()
-        return help_writer.document_handler(self, full_name)
+        return document_handler(self, full_name)
 
     def declare_command(self, name, handler):
         """Declare subcommand."""
         if name in self._declared_commands:
             raise RuntimeError("Duplicate command name: {name}".format(name=name))
         self._declared_commands[name] = handler
-        handler.use_options(self.declared_options.values())
+        handler.use_options(self._declared_options.values())
+
+    def declare_lazy_command(self, name, path, brief='', descr=''):
+        """Declare subcommand imported on the first use.
+
+        The target is imported only when the command is invoked or
+        its full documentation is requested. Handler's help uses the
+        given description, so it doesn't import anything.
+
+        The target may be a handler class or instance, a command or
+        a plain function (which will be converted to a command).
+
+        :param name: command name
+        :param path: import path of the form 'package.module:attribute'
+        :param brief: command brief description
+        :param descr: command long description
+        """
+        from comandante.inner.lazy import LazyElement
+        self.declare_command(name, LazyElement(name, path, brief, descr, self._lazy_element))
+
+    def _lazy_element(self, target, name):
+        """Convert object imported by lazy command into handler element."""
+        if isinstance(target, type) and issubclass(target, Handler):
+            return target()
+        if isinstance(target, Handler):
+            return target
+        if type(target) is Command:
+            return BoundCommand(command=target, handler=self)
+        if callable(target):
+            return BoundCommand(command=Command.from_function(target, name, is_method=False), handler=self)
+        raise TypeError("Cannot use {target} as a command: '{name}'".format(target=repr(target), name=name))
 
     def declare_option(self, name, short, type, default, descr=""):
         """Declare a new option.
@@ -136,24 +347,21 @@ class Handler(object):
         :param default: option default value
         :param descr: option description
         """
-        if name in self.declared_options:
-            raise RuntimeError("Duplicate option name: '--{name}'".format(name=name))
-        if short in self._short_options:
-            raise RuntimeError("Duplicate option name: '-{name}'".format(name=short))
-        option = Option(name=name, short=short, type=type, default=default, descr=descr)
-        self._declared_options[option.name] = option
-        self._short_options.add(short)
-        for command in self.declared_commands.values():
-            command.use_option(option)
+        self.use_option(Option(name=name, short=short, type=type, default=default, descr=descr))
 
     def use_option(self, option):
-        """Declare identical option."""
-        self.declare_option(
-            name=option.name,
-            short=option.short,
-            type=option.type,
-            default=option.default,
-            descr=option.descr)
+        """Declare identical option.
+
+        Options are immutable, so the option instance is shared.
+        """
+        if option.name in self._declared_options:
+            raise RuntimeError("Duplicate option name: '--{name}'".format(name=option.name))
+        if option.short in self._short_options:
+            raise RuntimeError("Duplicate option name: '-{name}'".format(name=option.short))
+        self._declared_options[option.name] = option
+        self._short_options.add(option.short)
+        for command in self._declared_commands.values():
+            command.use_option(option)
 
     def use_options(self, options):
         """Declare options identical to provided."""
@@ -163,14 +371,55 @@ class Handler(object):
     @property
     def declared_options(self):
         """Get declared options."""
-        return ImmutableDict(self._declared_options)
+        return self._declared_options_view
 
     @property
     def declared_commands(self):
         """Get declared commands."""
-        return ImmutableDict(self._declared_commands)
+        return self._declared_commands_view
 
     def __getattr__(self, item):
         if item not in self._declared_commands:
             raise AttributeError("{type} object has no attribute {name}".format(type=type(self).__name__, name=item))
         return self._declared_commands[item]
+
+
+# Handler.invoke function (to recognize handlers replacing it)
+_HANDLER_INVOKE = Handler.__dict__['invoke']
+
+
+def overrides_invoke(handler_class):
+    """Check if the handler class overrides `Handler.invoke`."""
+    invoke = handler_class.invoke
+    return getattr(invoke, '__func__', invoke) is not _HANDLER_INVOKE
+
+
+def resolve(handler, argv, context=()):
+    """Find the element invoked by the raw command-line arguments.
+
+    Walks down nested handlers the same way `Handler.invoke` does
+    (importing lazy elements on the way). The walk stops at commands
+    and at nested handlers with their own `invoke` (either overridden
+    by the class or replaced on the instance), which must be invoked
+    with the remaining arguments.
+
+    :param handler: cli-handler to start from (its own `invoke` is not checked)
+    :param argv: raw command-line arguments
+    :param context: command context
+    :return: (element, remaining arguments, context, error) tuple,
+        remaining arguments are None if no command name is given
+        (help of the element is due)
+    """
+    element = handler
+    while True:
+        name, rest = Handler._split_command(argv)
+        if name is None:
+            return element, None, context, None
+        commands = element.declared_commands
+        if name not in commands:
+            return element, rest, context, UnknownCommand(command=' '.join(context + (name,)))
+        element, argv, context = commands[name], rest, context + (name,)
+        if not isinstance(element, (Handler, BoundCommand)):
+            element = getattr(element, 'target', element)  # lazy element
+        if not isinstance(element, Handler) or overrides_invoke(type(element)) or 'invoke' in vars(element):
+            return element, argv, context, None
@@ -0,0 +1,72 @@
+"""Coroutine commands support.
+
+Description:
+-----------
+
+This module runs coroutine commands and fans them out over
+their var-args. It is imported only when a coroutine command
+is invoked (requires Python 3.7+).
+"""
+
+import asyncio
+
+
+def run(awaitable):
+    """Run awaitable command result.
+
+    The awaitable is run on a new event loop. If there is already
+    a running loop, the awaitable is returned to the caller instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_wait(awaitable))
+    return awaitable
+
+
+async def _wait(awaitable):
+    return await awaitable
+
+
+async def invoke_async(invoke, *args):
+    """Invoke element from the running event loop, await coroutine results."""
+    result = invoke(*args)
+    if asyncio.iscoroutine(result) or asyncio.isfuture(result) or hasattr(result, '__await__'):
+        result = await result
+    return result
+
+
+async def fan_out(call, items, limit):
+    """Await call for each item, at most `limit` at once.
+
+    Items are consumed lazily, calls are started only when
+    the bounded semaphore allows. Results are returned in
+    the input order. The first error stops starting new calls,
+    cancels calls in flight and is re-raised.
+
+    :param call: function returning awaitable result for the item
+    :param items: iterable of items
+    :param limit: maximal number of calls in flight
+    :return: list of results
+    """
+    semaphore = asyncio.BoundedSemaphore(limit)
+    tasks, failures = [], []
+
+    def done(task):
+        semaphore.release()
+        if not task.cancelled() and task.exception() is not None:
+            failures.append(task)
+
+    try:
+        for item in items:
+            await semaphore.acquire()
+            if failures:
+                semaphore.release()
+                break
+            task = asyncio.ensure_future(call(item))
+            task.add_done_callback(done)
+            tasks.append(task)
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,160 @@
+"""Batch invocation.
+
+Description:
+-----------
+
+This module invokes many independent command lines against
+the same handler concurrently (see `Handler.invoke_many`).
+"""
+
+import time
+
+from comandante.errors import CliSyntaxException, Diagnostic
+from comandante.handler import overrides_invoke, resolve
+from comandante.inner.bind import BoundCommand
+
+# The most precise clock available
+_clock = getattr(time, 'perf_counter', time.time)
+
+
+class Invocation(object):
+    """Outcome of a single command line of a batch.
+
+    Holds either the command result or the exception raised
+    by parsing or running the command, as well as the time spent
+    on both (in seconds). Syntax errors are also described by
+    diagnostics (see `comandante.errors.Diagnostic`).
+    """
+
+    __slots__ = ('argv', 'result', 'error', 'diagnostics', 'parse_time', 'run_time')
+
+    def __init__(self, argv):
+        self.argv = argv
+        self.result = None
+        self.error = None
+        self.diagnostics = []
+        self.parse_time = 0.0
+        self.run_time = 0.0
+
+    @property
+    def succeeded(self):
+        """Check if the command line was invoked without errors."""
+        return self.error is None
+
+    def __repr__(self):
+        if self.error is not None:
+            return 'Invocation({argv!r}, error={error!r})'.format(argv=self.argv, error=self.error)
+        return 'Invocation({argv!r}, result={result!r})'.format(argv=self.argv, result=self.result)
+
+
+def prepare(handler, argv):
+    """Resolve command and parse its arguments without printing anything.
+
+    Commands are looked up the same way as `Handler.invoke` does (see
+    `comandante.handler.resolve`). Handlers with their own `invoke` are
+    invoked as a whole when the command is executed.
+
+    :param handler: root cli-handler
+    :param argv: raw command-line arguments (a list)
+    :return: a function executing the command
+    """
+    if overrides_invoke(type(handler)):
+        return lambda: type(handler).invoke(handler, argv)
+    element, argv, context, error = resolve(handler, argv)
+    if error is not None:
+        raise error
+    if argv is None:
+        return element.help
+    if isinstance(element, BoundCommand):
+        return element.prepare(argv)
+    # nested handler with its own invoke (or unknown kind of element): parse when invoked
+    return lambda: element.invoke(argv, context)
+
+
+def diagnose(handler, argv):
+    """Find all syntax errors of the command line without printing anything.
+
+    Commands are looked up the same way as `Handler.invoke` does.
+    Command lines which resolve to a handler (help) are valid, as well
+    as arguments of handlers with their own `invoke` (not known here).
+
+    :param handler: root cli-handler
+    :param argv: raw command-line arguments (a list)
+    :return: list of `Diagnostic`
+    """
+    if overrides_invoke(type(handler)):
+        return []
+    element, rest, context, error = resolve(handler, argv)
+    position = len(context)
+    if error is not None:
+        commands = '|'.join(sorted(element.declared_commands))
+        return [Diagnostic(error, position, argv[position], commands)]
+    if rest is None or not isinstance(element, BoundCommand):
+        return []
+    return element.parser.diagnose(rest, position)
+
+
+def _describe(handler, invocation, all_errors):
+    """Record diagnostics of the syntax error of the invocation."""
+    diagnostics = diagnose(handler, invocation.argv) or [Diagnostic(invocation.error)]
+    invocation.diagnostics = diagnostics if all_errors else diagnostics[:1]
+
+
+def _run(invocation, execute):
+    """Run prepared command recording the outcome."""
+    if execute is None:
+        return invocation
+    start = _clock()
+    try:
+        invocation.result = execute()
+    except (Exception, SystemExit) as error:
+        invocation.error = error
+    invocation.run_time = _clock() - start
+    return invocation
+
+
+def _run_threads(invocations, prepared, workers):
+    """Run prepared commands in a thread pool, get invocations in the input order."""
+    try:
+        from concurrent.futures import ThreadPoolExecutor
+    except ImportError:  # python 2 (without the futures backport)
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(workers)
+        try:
+            return pool.map(lambda pair: _run(*pair), list(zip(invocations, prepared)))
+        finally:
+            pool.close()
+            pool.join()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_run, invocations, prepared))
+
+
+def invoke_many(handler, argv_list, workers=None, all_errors=False):
+    """Invoke many command lines on a thread pool.
+
+    :param handler: root cli-handler
+    :param argv_list: iterable of raw command-line argument sequences
+    :param workers: number of threads (None for the thread pool default, 1 to run sequentially)
+    :param all_errors: describe all syntax errors of a line (not just the first one)
+    :return: list of `Invocation` in the input order
+    """
+    invocations, prepared = [], []
+    for argv in argv_list:
+        invocation = Invocation(list(argv))
+        execute = None
+        start = _clock()
+        try:
+            execute = prepare(handler, invocation.argv)
+        except Exception as error:
+            invocation.error = error
+        invocation.parse_time = _clock() - start
+        invocations.append(invocation)
+        prepared.append(execute)
+    if workers == 1:
+        invocations = list(map(_run, invocations, prepared))
+    else:
+        invocations = _run_threads(invocations, prepared, workers)
+    for invocation in invocations:
+        if isinstance(invocation.error, CliSyntaxException):
+            _describe(handler, invocation, all_errors)
+    return invocations
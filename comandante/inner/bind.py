@@ -6,7 +6,8 @@ Description:
 This module defines logic that binds different parts of
 comandante API together to make it more convenient.
 """
-from comandante.inner.helpers import getname
+from comandante.inner.helpers import document_command, getname
+from comandante.inner.parser import Parser
 from comandante.inner.proxy import Proxy
 
 
@@ -18,6 +19,11 @@ class BoundCommand(Proxy):
     around ordinary python function (or method) and thus it is not
     being automatically bound to the corresponding handler (like
     python's BoundMethods do). This class closes this gap.
+
+    The underlying command is shared by all instances of the handler
+    class and is copied only when modified through the binding. Options
+    declared by the bound handler are not copied to the command, they
+    are merged with the command's own options on demand instead.
     """
 
     def __init__(self, command, handler):
@@ -28,6 +34,11 @@ class BoundCommand(Proxy):
         """
         super(BoundCommand, self).__init__(command)
         self._set('_handler', handler)
+        self._set('_copied', False)
+        self._set('_state', None)
+        self._set('_options', None)
+        self._set('_parser', None)
+        self._set('_options_class', None)
 
     def __getattr__(self, item):
         """Redirect attribute access to the underlying command."""
@@ -37,20 +48,174 @@ class BoundCommand(Proxy):
         """Redirect function-like calls to the underlying command."""
         return self.command(self._handler, *args, **kwargs)
 
-    def invoke(self, *args, **kwargs):
+    def invoke(self, argv, context=None):
         """Invoke command using bound handler as a context and passing the given arguments and options."""
-        return self.command.invoke(self._handler, *args, **kwargs)
+        return self.command._invoke(self, self._handler, argv, context)
+
+    def prepare(self, argv):
+        """Parse raw command-line arguments up front (see `Command.prepare`)."""
+        return self.command._prepare(self, self._handler, argv)
+
+    def invoke_async(self, argv, context=None):
+        """Invoke command from a running event loop (returns awaitable result)."""
+        from comandante.inner.asynchronous import invoke_async
+        return invoke_async(self.invoke, argv, context)
 
     @property
     def command(self):
         """Get underlying bound command."""
         return self._target
 
+    @property
+    def handler(self):
+        """Get handler the command is bound to."""
+        return self._handler
+
+    @property
+    def declared_options(self):
+        """Get command options merged with options declared by the bound handler."""
+        self._refresh()
+        return self._options
+
+    @property
+    def parser(self):
+        """Get command-line parser compiled for the merged options."""
+        self._refresh()
+        if self._parser is None:
+            self._set('_parser', Parser(self._target.signature, self._options.values()))
+        return self._parser
+
+    @property
+    def options_class(self):
+        """Get option values record class generated for the merged options."""
+        self._refresh()
+        if self._options_class is None:
+            self._set('_options_class', options_class(self._options.values()))
+        return self._options_class
+
+    def _refresh(self):
+        """Rebuild merged options if either the command or the handler has changed."""
+        command, inherited = self._target, self._handler.declared_options
+        state = (command, command.revision, len(inherited))
+        if state != self._state:
+            options = dict(inherited)
+            options.update(command.declared_options)
+            self._set('_options', mapping_view(options))
+            self._set('_parser', None)
+            self._set('_options_class', None)
+            self._set('_state', state)
+
+    def declare_option(self, name, short, type, default, descr=""):
+        """Declare a new option for the bound command only."""
+        self._check_inherited(name, short)
+        self._own().declare_option(name=name, short=short, type=type, default=default, descr=descr)
+
+    def use_option(self, option):
+        """Declare identical option."""
+        if self._handler.declared_options.get(option.name) is option:
+            # declared by the bound handler, so it is merged already
+            self._target.check_option(option.name, option.short)
+            return
+        self._check_inherited(option.name, option.short)
+        self._own().use_option(option)
+
+    def use_options(self, options):
+        """Declare identical options."""
+        for option in options:
+            self.use_option(option)
+
+    def set_types(self, types):
+        """Set argument types of the bound command only."""
+        self._own().set_types(types)
+
+    def set_fan_out(self, fan_out):
+        """Set fan-out strategy of the bound command only."""
+        self._own().set_fan_out(fan_out)
+
+    def _check_inherited(self, name, short):
+        """Make sure option names don't clash with options declared by the bound handler."""
+        inherited = self._handler.declared_options
+        if name in inherited:
+            pattern = "Duplicate option '--{option}' for command '{name}'"
+            raise RuntimeError(pattern.format(option=name, name=self._target.name))
+        if any(option.short == short for option in inherited.values()):
+            pattern = "Duplicate option '-{option}' for command '{name}'"
+            raise RuntimeError(pattern.format(option=short, name=self._target.name))
+
+    def _own(self):
+        """Get the underlying command copying it on the first modification."""
+        if not self._copied:
+            self._set('_target', self._target.copy())
+            self._set('_copied', True)
+        return self._target
+
+    def default_options(self):
+        """Get default option values."""
+        return self.options_class({})
+
+    def options(self, specified_options):
+        """Get merged options values."""
+        return self.options_class(specified_options)
+
+    def full_doc(self, full_name=None):
+        """Get command full formatted documentation."""
+        return document_command(self, full_name)
+
+    def copy(self):
+        """Create a fresh copy of the command with all merged options."""
+        copy = self._target.copy()
+        copy.use_options(self._handler.declared_options.values())
+        return copy
+
+
+def _unsupported(name):
+    """Create a method stub rejecting the call."""
+
+    def stub(self, *_args, **_kwargs):
+        pattern = "'{type}' does not support method '{name}'"
+        raise TypeError(pattern.format(type=getname(type(self)), name=name))
+
+    stub.__name__ = name
+    return stub
+
+
+class FrozenCommand(BoundCommand):
+    """Snapshot of a bound command (see `DispatchTable`).
+
+    Merged options, the parser and the option values class are built
+    when the snapshot is taken, later changes of the command or of its
+    handler are not reflected. The snapshot is never modified and thus
+    may be shared between threads.
+    """
+
+    def __init__(self, bound_command):
+        """Initialize instance.
+
+        :param bound_command: bound command to take the snapshot of
+        """
+        super(FrozenCommand, self).__init__(bound_command.command, bound_command.handler)
+        self._set('_options', bound_command.declared_options)
+        self._set('_parser', bound_command.parser)
+        self._set('_options_class', bound_command.options_class)
+
+    def _refresh(self):
+        """Snapshot is never rebuilt."""
+
+    declare_option = _unsupported('declare_option')
+    use_option = _unsupported('use_option')
+    use_options = _unsupported('use_options')
+    set_types = _unsupported('set_types')
+    set_fan_out = _unsupported('set_fan_out')
+
 
 class ImmutableDict(Proxy):
-    def __init__(self, target):
-        super(ImmutableDict, self).__init__(target)
-        self._unsupport('clear', 'pop', 'popitem', 'update', 'setdefault')
+    """Read-only dict proxy."""
+
+    clear = _unsupported('clear')
+    pop = _unsupported('pop')
+    popitem = _unsupported('popitem')
+    update = _unsupported('update')
+    setdefault = _unsupported('setdefault')
 
     def __setitem__(self, key, value):
         raise TypeError('ImmutableDict does not support item assignment')
@@ -71,3 +236,113 @@ class AttributeDict(ImmutableDict):
         error_pattern = "'{type}' object has no attribute '{name}'"
         error_message = error_pattern.format(type=getname(type(self._target)), name=item)
         raise AttributeError(error_message)
+
+
+# Read-only live view of a dict (doesn't copy the dict)
+try:
+    from types import MappingProxyType as mapping_view
+except ImportError:  # python 2
+    mapping_view = ImmutableDict
+
+
+class Options(object):
+    """Command option values.
+
+    Base class of the option records generated for each set of
+    declared options (see `options_class`). Values are stored in
+    slots, so they are read as fast as regular attributes. Records
+    also support read-only dict-like access (`options['name']`).
+    """
+
+    __slots__ = ('_specified',)
+
+    # Option names in the slot order
+    _names = ()
+
+    # Slot descriptors by option name
+    _members = {}
+
+    # (slot setter, default value) pairs
+    _defaults = ()
+
+    def __init__(self, specified):
+        """Initialize instance.
+
+        :param specified: values of the options specified on the command line
+        """
+        for setter, value in self._defaults:
+            setter(self, value)
+        members = self._members
+        for name, value in specified.items():
+            members[name].__set__(self, value)
+        self._specified = frozenset(specified)
+
+    def is_specified(self, name):
+        """Check if option is specified."""
+        return name in self._specified
+
+    def __getitem__(self, name):
+        return self._members[name].__get__(self)
+
+    def get(self, name, default=None):
+        member = self._members.get(name)
+        return default if member is None else member.__get__(self)
+
+    def __contains__(self, name):
+        return name in self._members
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def keys(self):
+        return list(self._names)
+
+    def values(self):
+        return [self[name] for name in self._names]
+
+    def items(self):
+        return [(name, self[name]) for name in self._names]
+
+    def copy(self):
+        """Get a (mutable) dict of the option values, as the dict-based option values did."""
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, Options):
+            other = dict(other.items())
+        return dict(self.items()) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    __str__ = __repr__
+
+
+def options_class(declared):
+    """Generate option values record class for the declared options.
+
+    Each option gets a slot which is also accessible by the option
+    name (unless the name clashes with `Options` attributes, then the
+    value is accessible as an item only).
+
+    :param declared: declared options
+    """
+    declared = list(declared)
+    names = tuple(option.name for option in declared)
+    slots = tuple('_{index}'.format(index=index) for index in range(len(declared)))
+    record = type('Options', (Options,), {'__slots__': slots, '_names': names})
+    members = dict((name, getattr(record, slot)) for name, slot in zip(names, slots))
+    for name, member in members.items():
+        if not hasattr(Options, name):
+            setattr(record, name, member)
+    record._members = members
+    record._defaults = tuple((members[option.name].__set__, option.default) for option in declared)
+    return record
@@ -0,0 +1,167 @@
+"""Dynamic completion values cache.
+
+Description:
+-----------
+
+This module provides on-disk cache of values produced by
+dynamic completion providers (see `types.completed`).
+
+Each entry is a text file: the first line holds the entry
+expiration time (unix time in seconds), each of the other
+lines holds a single value. This format is simple enough to
+be read by shell completion scripts directly. A directory
+named after the entry with the '.lock' suffix marks an entry
+which is being refreshed. A lock older than `LOCK_TIMEOUT` is
+considered stale (its refresh has died) and may be taken over.
+"""
+
+import os
+import time
+
+# Environment variable overriding the cache root directory
+CACHE_DIR_VARIABLE = 'COMANDANTE_COMPLETION_CACHE'
+
+# Default cache size limit in bytes
+DEFAULT_MAX_SIZE = 1024 * 1024
+
+LOCK_SUFFIX = '.lock'
+
+# Age of a refresh lock (in seconds) after which it is considered stale
+LOCK_TIMEOUT = 5 * 60
+
+# Characters percent-encoded in the entry key names
+_ESCAPED = '%-./\\'
+
+# Atomic file replacement (python 2 has only os.rename)
+_replace = getattr(os, 'replace', os.rename)
+
+
+def cache_directory(name):
+    """Get completion cache directory of the program.
+
+    Completion scripts compute the same location.
+    """
+    root = os.environ.get(CACHE_DIR_VARIABLE)
+    if not root:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        root = os.path.join(base, 'comandante')
+    return os.path.join(root, name)
+
+
+def _escape(name):
+    """Escape separators of the entry key and path delimiters in the name."""
+    return ''.join('%{code:02X}'.format(code=ord(char)) if char in _ESCAPED else char for char in name)
+
+
+def entry_key(path, parameter):
+    """Get cache key of the argument or option values.
+
+    Names of the command path are joined by '-' and followed by
+    the parameter name after '.', the separators occurring in
+    the names themselves are percent-encoded, so that distinct
+    paths never share an entry.
+
+    :param path: command path
+    :param parameter: argument or option name
+    """
+    return "{path}.{parameter}".format(path='-'.join(map(_escape, path)), parameter=_escape(parameter))
+
+
+class CompletionCache(object):
+    """On-disk cache of completion values."""
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        """Initialize instance.
+
+        :param directory: cache directory
+        :param max_size: cache size limit in bytes (least recently refreshed entries are evicted)
+        """
+        self.directory = directory
+        self.max_size = max_size
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def read(self, key):
+        """Get (expiration time, values) of the entry (None if missing)."""
+        try:
+            with open(self._path(key), 'rb') as file:
+                lines = file.read().decode('utf-8').split('\n')
+            return float(lines[0]), [line for line in lines[1:] if line]
+        except (IOError, OSError, ValueError):
+            return None
+
+    def store(self, key, values, ttl):
+        """Store values (replacing entry atomically)."""
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        lines = [str(int(time.time() + ttl))]
+        lines.extend(value.replace('\n', ' ') for value in values)
+        path = self._path(key)
+        temporary = "{path}.{pid}.tmp".format(path=path, pid=os.getpid())
+        with open(temporary, 'wb') as file:
+            file.write(('\n'.join(lines) + '\n').encode('utf-8'))
+        _replace(temporary, path)
+        self.evict(keep=key)
+
+    def evict(self, keep=None):
+        """Remove least recently refreshed entries until the cache fits the size limit."""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = self._path(name)
+            if name == keep or name.endswith(LOCK_SUFFIX) or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+        size = sum(entry[1] for entry in entries)
+        if keep is not None and os.path.isfile(self._path(keep)):
+            size += os.path.getsize(self._path(keep))
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+                size -= entry_size
+            except OSError:
+                pass
+
+    def lock(self, key):
+        """Mark entry as being refreshed (False if it is marked already).
+
+        A stale mark is taken over: it is renamed first, so that only
+        one of the processes noticing it gets the lock.
+        """
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        path = self._path(key) + LOCK_SUFFIX
+        try:
+            os.mkdir(path)
+            return True
+        except OSError:
+            pass
+        try:
+            if os.path.getmtime(path) > time.time() - LOCK_TIMEOUT:
+                return False
+            stale = "{path}.{pid}".format(path=path, pid=os.getpid())
+            os.rename(path, stale)
+            os.rmdir(stale)
+            os.mkdir(path)
+            return True
+        except OSError:  # released or taken over by another process
+            return False
+
+    def unlock(self, key):
+        """Remove the refresh mark."""
+        try:
+            os.rmdir(self._path(key) + LOCK_SUFFIX)
+        except OSError:
+            pass
+
+    def refresh(self, key, provider, ttl):
+        """Run provider and store its values (the entry lock is released)."""
+        try:
+            values = [value if isinstance(value, type(u'')) else str(value) for value in provider()]
+            self.store(key, values, ttl)
+            return values
+        finally:
+            self.unlock(key)
@@ -0,0 +1,100 @@
+"""Frozen command dispatch.
+
+Description:
+-----------
+
+This module defines a `DispatchTable` - an immutable map of the
+command paths of the whole handler tree directly to snapshots of
+the commands with precompiled parsers.
+"""
+
+from __future__ import print_function
+
+from comandante.errors import UnknownCommand
+from comandante.handler import Handler, overrides_invoke
+from comandante.inner.bind import BoundCommand, FrozenCommand, mapping_view
+from comandante.inner.helpers import has_help_files
+from comandante.inner.lazy import LazyElement
+
+
+class DispatchTable(object):
+    """Immutable flat dispatch table of a handler tree.
+
+    Dispatch table resolves a command path (like `cli a b c`) in a
+    single pass over command-line arguments, without walking the
+    handler hierarchy. The table is built from snapshots of the
+    commands (see `FrozenCommand`): command paths, merged options and
+    parsers are fixed when the table is built, commands, options and
+    types declared later are not reflected. Lazy elements are resolved
+    and nested handlers with their own `invoke` are invoked as a whole
+    at invocation time. The table is never modified and thus may be
+    shared between threads.
+    """
+
+    __slots__ = ('_root', '_handlers', '_commands')
+
+    def __init__(self, handler):
+        """Initialize instance.
+
+        :param handler: root cli-handler
+        """
+        handlers, commands = {(): handler}, {}
+        self._collect(handler, (), handlers, commands)
+        self._root = handler
+        self._handlers = mapping_view(handlers)
+        self._commands = mapping_view(commands)
+
+    @staticmethod
+    def _collect(handler, path, handlers, commands):
+        """Collect commands and nested handlers reachable from the handler."""
+        for name, element in handler.declared_commands.items():
+            element_path = path + (name,)
+            if isinstance(element, LazyElement):
+                # keep lazy elements unresolved until they are invoked
+                commands[element_path] = element
+                continue
+            if isinstance(element, Handler) and (overrides_invoke(type(element)) or 'invoke' in vars(element)):
+                commands[element_path] = element
+                continue
+            if element.declared_commands:
+                handlers[element_path] = element
+                DispatchTable._collect(element, element_path, handlers, commands)
+                continue
+            commands[element_path] = FrozenCommand(element)
+
+    @property
+    def handlers(self):
+        """Get read-only mapping from command paths to handlers."""
+        return self._handlers
+
+    @property
+    def commands(self):
+        """Get read-only mapping from command paths to command snapshots (lazy elements and handlers with own invoke)."""
+        return self._commands
+
+    def invoke(self, argv):
+        """Invoke command with the given raw command-line arguments."""
+        is_sequence = isinstance(argv, (list, tuple))
+        tokens = iter(argv)
+        path, handler = (), self._root
+        for token in tokens:
+            path += (token,)
+            command = self._commands.get(path)
+            if command is not None:
+                rest = argv[len(path):] if is_sequence else tokens
+                if isinstance(command, BoundCommand) and has_help_files(self._root.name):
+                    # help files are looked up by the full name (the one `help` documents commands by)
+                    return command.invoke(rest, (self._root.name,) + path)
+                return command.invoke(rest, path)
+            if path not in self._handlers:
+                error = UnknownCommand(command=' '.join(path))
+                print(error)
+                handler.help()
+                raise error
+            handler = self._handlers[path]
+        handler.help()
+
+    def invoke_async(self, argv):
+        """Invoke command from a running event loop (returns awaitable result)."""
+        from comandante.inner.asynchronous import invoke_async
+        return invoke_async(self.invoke, argv)
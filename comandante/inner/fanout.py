@@ -0,0 +1,122 @@
+"""Command fan-out strategies.
+
+Description:
+-----------
+
+This module defines strategies invoking a command once per
+item of its var-arg (see `comandante.decorators.concurrent`
+and `comandante.decorators.parallel`).
+"""
+
+import abc
+
+from comandante.inner.helpers import Abstract
+
+
+class FanOut(Abstract):
+    """Strategy invoking a command once per item of its var-arg.
+
+    Each invocation receives the same positional arguments and
+    options, while the var-arg is replaced by a single item.
+    """
+
+    def __init__(self, over):
+        """Initialize instance.
+
+        :param over: name of the var-arg parameter
+        """
+        self.over = over
+
+    def check(self, command):
+        """Make sure the command has the expected var-arg."""
+        vararg = command.signature.vararg
+        if vararg is None or vararg.name != self.over:
+            pattern = "Cannot fan out command '{name}' over '{over}': there is no such var-arg"
+            raise RuntimeError(pattern.format(name=command.name, over=self.over))
+
+    @staticmethod
+    def split(command, arguments):
+        """Split parsed arguments into (fixed arguments, var-arg items)."""
+        signature = command.signature
+        count = len(signature.required) + len(signature.optional)
+        items = arguments[count:]
+        if items and getattr(signature.vararg.type, 'bulk', None) is not None:
+            items = items[0]  # bulk-converted var-arg is a single array
+        return tuple(arguments[:count]), items
+
+    @abc.abstractmethod
+    def invoke(self, command, element, handler, arguments, options):
+        """Invoke command with parsed arguments and option values.
+
+        :param command: fanned out command
+        :param element: command or its binding the command is invoked through
+        :param handler: handler the command is invoked with
+        :param arguments: parsed arguments
+        :param options: specified option values
+        """
+
+
+class ConcurrentFanOut(FanOut):
+    """Run coroutine command concurrently for each var-arg item.
+
+    At most `limit` invocations are awaited at once. Results are
+    collected into a list in the input order. The first error
+    cancels invocations in flight and is re-raised.
+    """
+
+    def __init__(self, over, limit):
+        """Initialize instance.
+
+        :param over: name of the var-arg parameter
+        :param limit: maximal number of concurrent invocations or name of the option holding it
+        """
+        super(ConcurrentFanOut, self).__init__(over)
+        self.limit = limit
+
+    def invoke(self, command, element, handler, arguments, options):
+        from comandante.inner.asynchronous import fan_out
+        fixed, items = self.split(command, arguments)
+        limit = self.limit
+        if not isinstance(limit, int):
+            limit = element.options(options)[limit]
+        if limit < 1:
+            raise ValueError("Invalid concurrency limit: {limit}".format(limit=limit))
+
+        def call(item):
+            return command._do_invoke(handler, fixed + (item,), options)
+
+        return fan_out(call, items, limit)
+
+
+class ParallelFanOut(FanOut):
+    """Run command in a pool of processes for each var-arg item.
+
+    Results are collected into a list and the output captured
+    from each invocation is printed in the input order. Binary
+    results larger than `shared_memory` bytes are passed back
+    through shared memory.
+    """
+
+    def __init__(self, over, workers, chunksize, fail_fast, shared_memory):
+        """Initialize instance.
+
+        :param over: name of the var-arg parameter
+        :param workers: number of processes (None for the number of CPUs) or name of the option holding it
+        :param chunksize: number of items sent to a worker process at once
+        :param fail_fast: stop on the first error instead of running all the items
+        :param shared_memory: size threshold of results passed through shared memory (None to always pickle)
+        """
+        super(ParallelFanOut, self).__init__(over)
+        self.workers = workers
+        self.chunksize = chunksize
+        self.fail_fast = fail_fast
+        self.shared_memory = shared_memory
+
+    def invoke(self, command, element, handler, arguments, options):
+        from comandante.inner import parallel
+        fixed, items = self.split(command, arguments)
+        workers = self.workers
+        if workers is not None and not isinstance(workers, int):
+            workers = element.options(options)[workers]
+        job = parallel.Job(command, handler, fixed, options, self.shared_memory)
+        return parallel.run(job, items, workers, self.chunksize, self.fail_fast)
@@ -5,11 +5,25 @@ Description:
 
 This module contains comandante helpers intended
 for internal use only.
+
+Note that helpers are used whenever a command is
+declared, so they avoid expensive imports (like
+`inspect` or `re`).
 """
 
-import inspect
+import abc
+import itertools
+import sys
+
+# Docstring types
+_string_types = (str, type(u''))
+
+# Lazy map and zip (the same on python 2 and 3)
+_map = getattr(itertools, 'imap', map)
+_zip = getattr(itertools, 'izip', zip)
 
-from comandante.inner.output.markup import Markup
+# Base of abstract classes (the same on python 2 and 3)
+Abstract = abc.ABCMeta('Abstract', (object,), {'__slots__': ()})
 
 
 def describe(o):
@@ -18,13 +32,55 @@ def describe(o):
     :param o: object to be described.
     :return: (brief, long) description pair
     """
-    if inspect.getdoc(o) is None:
+    text = getdoc(o)
+    if text is None:
         return '', ''
-    text = inspect.getdoc(o)
-    parts = Markup.paragraph_break.split(text, maxsplit=1)
-    brief = parts[0]
-    descr = parts[1] if len(parts) == 2 else ''
-    return brief, descr
+    lines = text.split('\n')
+    for index in range(1, len(lines)):
+        # the first blank line separates brief description
+        if not lines[index].strip():
+            brief = '\n'.join(lines[:index])
+            descr = '\n'.join(lines[index + 1:]).lstrip()
+            return brief, descr
+    return text, ''
+
+
+def getdoc(o):
+    """Get documentation string of the object with indentation cleaned up.
+
+    Works the same as `inspect.getdoc` for functions, classes and instances.
+
+    :param o: object to get documentation for
+    :return: cleaned up docstring or None
+    """
+    doc = getattr(o, '__doc__', None)
+    if not isinstance(doc, _string_types) and isinstance(o, type):
+        for base in o.__mro__:
+            if isinstance(base.__doc__, _string_types):
+                doc = base.__doc__
+                break
+    if not isinstance(doc, _string_types):
+        return None
+    return cleandoc(doc)
+
+
+def cleandoc(doc):
+    """Clean up indentation from docstring (same as `inspect.cleandoc`)."""
+    lines = doc.expandtabs().split('\n')
+    margin = sys.maxsize
+    for line in lines[1:]:
+        content = len(line.lstrip())
+        if content:
+            margin = min(margin, len(line) - content)
+    lines[0] = lines[0].lstrip()
+    if margin < sys.maxsize:
+        for index in range(1, len(lines)):
+            lines[index] = lines[index][margin:]
+    while lines and not lines[-1]:
+        lines.pop()
+    while lines and not lines[0]:
+        lines.pop(0)
+    return '\n'.join(lines)
 
 
 def getname(o):
@@ -32,3 +88,33 @@ def getname(o):
     if hasattr(o, '__name__') and o.__name__ is not None:
         return o.__name__
     raise ValueError("{object} doesn't have a name".format(object=str(o)))
+
+
+def document_handler(handler, full_name=None):
+    """Get handler documentation.
+
+    Rendered documentation is cached, help machinery
+    is imported only when something must be rendered.
+    """
+    from comandante.inner.output.help_cache import help_cache
+    return help_cache.document_handler(handler, full_name)
+
+
+def has_help_files(name):
+    """Check if pre-rendered help files are used by the program.
+
+    Doesn't import help machinery (help files are registered
+    through it, so it's imported if there are any).
+    """
+    module = sys.modules.get('comandante.inner.output.help_cache')
+    return module is not None and bool(module.help_cache.help_files.get(name))
+
+
+def document_command(command, full_name=None):
+    """Get command documentation.
+
+    Rendered documentation is cached, help machinery
+    is imported only when something must be rendered.
+    """
+    from comandante.inner.output.help_cache import help_cache
+    return help_cache.document_command(command, full_name)
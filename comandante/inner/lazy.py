@@ -0,0 +1,125 @@
+"""Lazily imported handler elements.
+
+Description:
+-----------
+
+This module defines a placeholder for commands and
+sub-handlers declared by import path. The target
+is imported only when it is actually needed.
+"""
+
+
+def import_object(path):
+    """Import object by path of the form 'package.module:attribute'.
+
+    :param path: import path
+    :return: imported object
+    """
+    import importlib
+    module_name, _, attribute = path.partition(':')
+    result = importlib.import_module(module_name)
+    for name in filter(None, attribute.split('.')):
+        if not hasattr(result, name):
+            raise ImportError("cannot import name '{name}' from '{path}'".format(name=name, path=path))
+        result = getattr(result, name)
+    return result
+
+
+class LazyElement(object):
+    """Command or sub-handler imported on the first use.
+
+    Lazy element provides name and description without importing
+    anything, so that handler's help could be rendered. Any other
+    access resolves the element and delegates to the imported one.
+    """
+
+    def __init__(self, name, path, brief, descr, resolve):
+        """Initialize instance.
+
+        :param name: command name
+        :param path: import path of the form 'package.module:attribute'
+        :param brief: brief description
+        :param descr: long description
+        :param resolve: callable converting (imported object, name) into handler element
+        """
+        self._name = name
+        self._path = path
+        self._brief = brief
+        self._descr = descr
+        self._resolve = resolve
+        self._target = None
+        self._options = []
+
+    @property
+    def name(self):
+        """Get command name."""
+        return self._name
+
+    @property
+    def path(self):
+        """Get import path."""
+        return self._path
+
+    @property
+    def brief(self):
+        """Get brief description."""
+        return self._brief
+
+    @property
+    def descr(self):
+        """Get long description."""
+        return self._descr
+
+    @property
+    def is_resolved(self):
+        """Check if the target is imported already."""
+        return self._target is not None
+
+    @property
+    def target(self):
+        """Get the imported element (import it if needed)."""
+        if self._target is None:
+            target = self._resolve(import_object(self._path), self._name)
+            target.use_options(self._options)
+            self._target, self._options = target, None
+        return self._target
+
+    def use_option(self, option):
+        """Declare identical option (postponed until the target is imported)."""
+        if self._target is None:
+            self._options.append(option)
+        else:
+            self._target.use_option(option)
+
+    def use_options(self, options):
+        """Declare identical options."""
+        for option in options:
+            self.use_option(option)
+
+    def invoke(self, argv, context=()):
+        """Invoke imported element with the raw command-line arguments."""
+        return self.target.invoke(argv, context)
+
+    def invoke_async(self, argv, context=()):
+        """Invoke imported element from a running event loop (returns awaitable result)."""
+        return self.target.invoke_async(argv, context)
+
+    @property
+    def declared_commands(self):
+        """Get commands declared by the imported element."""
+        return self.target.declared_commands
+
+    @property
+    def declared_options(self):
+        """Get options declared by the imported element."""
+        return self.target.declared_options
+
+    def full_doc(self, full_name=None):
+        """Get full documentation of the imported element."""
+        return self.target.full_doc(full_name=full_name)
+
+    def __getattr__(self, item):
+        """Delegate attribute access to the imported element."""
+        if item.startswith('__'):
+            raise AttributeError(item)
+        return getattr(self.target, item)
@@ -13,22 +13,35 @@ arguments and execute the corresponding logic.
 
 from __future__ import print_function
 
-import inspect
 import itertools
-import re
 import sys
 
 from comandante.errors import CliSyntaxException
-from comandante.inner.bind import ImmutableDict, AttributeDict
-from comandante.inner.helpers import describe
-from comandante.inner.output.help_writer import HelpWriter
+from comandante.inner.bind import Options, mapping_view, options_class  # noqa: F401 (Options is re-exported)
+from comandante.inner.helpers import describe, document_command
 from comandante.inner.parser import Parser
+from comandante.types import Stream
 
 
 class _Empty:
     """Marker object for Argument.empty"""
 
 
+# Type of plain python functions
+_FunctionType = type(lambda: None)
+
+# Code object flags indicating *args and **kwargs
+_CO_VARARGS = 0x04
+_CO_VARKEYWORDS = 0x08
+
+_ASCII_LETTERS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def _is_awaitable(value):
+    """Check if the value is a coroutine (or any other awaitable)."""
+    return getattr(type(value), '__await__', None) is not None
+
+
 class Option(object):
     """Command option descriptor.
 
@@ -57,19 +70,21 @@ class Option(object):
     not an option.
     """
 
-    # Regex-pattern of valid option name.
-    # Valid option name starts with alphabetic character and
-    # its tail contain any number of alpha-numeric characters.
-    _name_pattern = re.compile(r'^[a-zA-Z]\w+$')
+    __slots__ = ('_name', '_short', '_type', '_default', '_descr')
 
     @staticmethod
     def is_valid_name(name):
         """Validate otion name.
 
+        Valid option name starts with alphabetic character and
+        its tail contain any number of alpha-numeric characters
+        (or underscores).
+
         :param name: option name to be validated
         :return: True iff name is a valid option name
         """
-        return isinstance(name, str) and bool(Option._name_pattern.match(name))
+        return (isinstance(name, str) and len(name) > 1 and name[0] in _ASCII_LETTERS and
+                name[1:].replace('_', 'a').isalnum())
 
     def __init__(self, name, short, type, default, descr=""):
         """Initialize an instance.
@@ -131,6 +146,8 @@ class Argument(object):
     values are interpreted as not relevant to the argument).
     """
 
+    __slots__ = ('type', '_name', '_default')
+
     @staticmethod
     def from_param(param):
         """Create a new Argument from the given inspect.Parameter.
@@ -147,6 +164,7 @@ class Argument(object):
     @staticmethod
     def _param_default(param):
         """Derive argument default value from the inspect.Parameter default value."""
+        import inspect
         if param.default is inspect.Parameter.empty:
             return Argument.empty
         return param.default
@@ -154,6 +172,7 @@ class Argument(object):
     @staticmethod
     def _param_type(param):
         """Derive argument type from the parameter annotation"""
+        import inspect
         if param.annotation is inspect.Parameter.empty:
             return str
         return param.annotation
@@ -194,6 +213,8 @@ class Signature(object):
     and optional command arguments.
     """
 
+    __slots__ = ('_required', '_optional', '_vararg', '_accepts_options', '_is_method')
+
     @staticmethod
     def from_function(func, is_method=False):
         """Derive a new `Signature` from the given callable object.
@@ -202,6 +223,11 @@ class Signature(object):
         :param is_method: indicates whether the first argument is `self`
         :return: a new `Signature` derived from the `func`
         """
+        if Signature._is_plain_function(func, is_method):
+            return Signature._from_code(func, is_method)
+
+        # inspect is expensive to import, so it is imported only when needed
+        import inspect
         if sys.version_info > (3, 0):
             sig = inspect.signature(func)
             return Signature._from_signature(sig, is_method)
@@ -209,6 +235,46 @@ class Signature(object):
             spec = inspect.getargspec(func)
             return Signature._from_argspec(spec, is_method)
 
+    @staticmethod
+    def _is_plain_function(func, is_method):
+        """Check if signature may be derived directly from the function code object."""
+        if type(func) is not _FunctionType:
+            return False
+        if hasattr(func, '__wrapped__') or hasattr(func, '__signature__'):
+            return False
+        return not is_method or func.__code__.co_argcount > 0
+
+    @staticmethod
+    def _from_code(func, is_method):
+        """Derive signature from the plain python function code object."""
+        code = func.__code__
+        count = code.co_argcount
+        skip = max(getattr(code, 'co_posonlyargcount', 0), 1 if is_method else 0)
+        defaults = func.__defaults__ or ()
+        annotations = getattr(func, '__annotations__', {})
+        first_default = count - len(defaults)
+
+        required = []
+        optional = []
+        for index in range(skip, count):
+            name = code.co_varnames[index]
+            default = defaults[index - first_default] if index >= first_default else Argument.empty
+            argument = Argument(name=name, type=annotations.get(name, str), default=default)
+            category = Signature._determine_category(argument, required, optional)
+            category.append(argument)
+
+        vararg = None
+        if code.co_flags & _CO_VARARGS:
+            name = code.co_varnames[count + getattr(code, 'co_kwonlyargcount', 0)]
+            vararg = Argument(name=name, type=annotations.get(name, str))
+        return Signature(
+            required=required,
+            optional=optional,
+            vararg=vararg,
+            accepts_options=bool(code.co_flags & _CO_VARKEYWORDS),
+            is_method=is_method
+        )
+
     @staticmethod
     def _from_argspec(spec, is_method):
         vararg = None
@@ -239,6 +305,7 @@ class Signature(object):
 
     @staticmethod
     def _from_signature(sig, is_method):
+        import inspect
         required = []
         optional = []
         vararg = None
@@ -286,6 +353,7 @@ class Signature(object):
         self._vararg = vararg
         self._accepts_options = accepts_options
         self._is_method = is_method
+        self._check_streams(self._required + self._optional, vararg)
 
     @property
     def required(self):
@@ -327,11 +395,38 @@ class Signature(object):
             is_method=self.is_method)
 
     def set_types(self, types):
-        for argument in self.arguments:
-            if argument.name in types:
-                argument.type = types[argument.name]
-        if self.vararg is not None and self.vararg.name in types:
-            self.vararg.type = types[self.vararg.name]
+        """Set argument types.
+
+        Arguments are replaced rather than modified in place,
+        so that signature copies remain independent.
+
+        :param types: mapping from arg name to arg type
+        """
+        required = tuple(self._retype(argument, types) for argument in self._required)
+        optional = tuple(self._retype(argument, types) for argument in self._optional)
+        vararg = self._vararg
+        if vararg is not None:
+            vararg = self._retype(vararg, types)
+        self._check_streams(required + optional, vararg)
+        self._required, self._optional, self._vararg = required, optional, vararg
+
+    @staticmethod
+    def _check_streams(arguments, vararg):
+        """Make sure only the last positional argument of a signature without var-arg is a stream."""
+        last = arguments[-1] if arguments and vararg is None else None
+        if vararg is not None:
+            arguments += (vararg,)
+        for argument in arguments:
+            if isinstance(argument.type, Stream) and argument is not last:
+                pattern = "Only the last positional argument of a command without var-arg may be a stream: '{name}'"
+                raise ValueError(pattern.format(name=argument.name))
+
+    @staticmethod
+    def _retype(argument, types):
+        """Get argument with type overridden by the types mapping (if present)."""
+        if argument.name not in types:
+            return argument
+        return Argument(name=argument.name, type=types[argument.name], default=argument.default)
 
 
 class Command(object):
@@ -349,6 +444,9 @@ class Command(object):
     affect it's operation in some way.
     """
 
+    __slots__ = ('_func', '_name', '_signature', '_brief', '_descr', '_declared_options', '_declared_options_view',
+                 '_declared_options_short', '_parser', '_options_class', '_revision', '_fan_out')
+
     @staticmethod
     def from_function(func, name, is_method):
         """Create a new command from the given callable object.
@@ -383,7 +481,12 @@ class Command(object):
         self._brief = brief
         self._descr = descr
         self._declared_options = {}
+        self._declared_options_view = mapping_view(self._declared_options)
         self._declared_options_short = set()
+        self._parser = None
+        self._options_class = None
+        self._revision = 0
+        self._fan_out = None
 
     def declare_option(self, name, short, type, default, descr=""):
         """Declare a new option for the given command.
@@ -395,22 +498,48 @@ class Command(object):
         :param default: option default value
         :param descr: option description
         """
+        self.use_option(Option(name=name, short=short, type=type, default=default, descr=descr))
+
+    def set_types(self, types):
+        """Set command argument types.
+
+        :param types: mapping from arg name to arg type
+        """
+        self.signature.set_types(types)
+        self._changed()
+
+    def use_option(self, option):
+        """Declare identical option.
+
+        Options are immutable, so the option instance is shared.
+        """
+        self.check_option(option.name, option.short)
+        self._declared_options[option.name] = option
+        self._declared_options_short.add(option.short)
+        self._changed()
+
+    def check_option(self, name, short):
+        """Make sure option names don't clash with already declared options."""
         if name in self._declared_options:
-            raise RuntimeError("Duplicate option '--{option}' for command '{name}'".format(option=name, name=self.name))
+            pattern = "Duplicate option '--{option}' for command '{name}'"
+            raise RuntimeError(pattern.format(option=name, name=self.name))
         if short in self._declared_options_short:
-            raise RuntimeError("Duplicate option '-{option}' for command '{name}'".format(option=short, name=self.name))
-        option = Option(name=name, short=short, type=type, default=default, descr=descr)
-        self._declared_options[option.name] = option
-        self._declared_options_short.add(short)
+            pattern = "Duplicate option '-{option}' for command '{name}'"
+            raise RuntimeError(pattern.format(option=short, name=self.name))
 
-    def use_option(self, option):
-        """Declare identical option."""
-        self.declare_option(
-            name=option.name,
-            short=option.short,
-            type=option.type,
-            default=option.default,
-            descr=option.descr)
+    def set_fan_out(self, fan_out):
+        """Invoke command once per item of its var-arg.
+
+        :param fan_out: fan-out strategy (see `comandante.inner.fanout`)
+        """
+        fan_out.check(self)
+        self._fan_out = fan_out
+
+    def _changed(self):
+        """Drop everything derived from the command model."""
+        self._parser = None
+        self._options_class = None
+        self._revision += 1
 
     def use_options(self, options):
         """Declare identical options."""
@@ -419,7 +548,7 @@ class Command(object):
 
     def default_options(self):
         """Get default option values."""
-        return Options({}, self.declared_options.values())
+        return self.options_class({})
 
     @property
     def func(self):
@@ -431,6 +560,11 @@ class Command(object):
         """Get command name."""
         return self._name
 
+    @property
+    def fan_out(self):
+        """Get fan-out strategy (None if the command is invoked once)."""
+        return self._fan_out
+
     @property
     def signature(self):
         """Get command signature."""
@@ -449,32 +583,91 @@ class Command(object):
     @property
     def declared_options(self):
         """Get command options."""
-        return ImmutableDict(self._declared_options)
+        return self._declared_options_view
 
     @property
     def declared_commands(self):
         """Always return empty dict"""
-        return dict()
+        return _NO_COMMANDS
+
+    @property
+    def revision(self):
+        """Get command model revision (changes whenever options or argument types change)."""
+        return self._revision
+
+    @property
+    def parser(self):
+        """Get command-line parser compiled for the current command model."""
+        if self._parser is None:
+            self._parser = Parser(self.signature, self._declared_options.values())
+        return self._parser
+
+    @property
+    def options_class(self):
+        """Get option values record class generated for the current command options."""
+        if self._options_class is None:
+            self._options_class = options_class(self._declared_options.values())
+        return self._options_class
 
     def options(self, specified_options):
         """Get merged options values."""
-        return Options(specified_options, self.declared_options.values())
+        return self.options_class(specified_options)
 
     def __call__(self, *args, **kwargs):
         """Redirect function-like calls to the underlying function/method."""
         return self.func(*args, **kwargs)
 
     def invoke(self, handler, argv, context=None):
-        """Invoke command with the raw command-line arguments."""
+        """Invoke command with the raw command-line arguments.
+
+        Coroutine commands are run on a new event loop (unless invoked
+        from a running loop, then the coroutine is returned).
+        """
+        return self._invoke(self, handler, argv, context)
+
+    def invoke_async(self, handler, argv, context=None):
+        """Invoke command from a running event loop.
+
+        :return: awaitable command result
+        """
+        from comandante.inner.asynchronous import invoke_async
+        return invoke_async(self.invoke, handler, argv, context)
+
+    def _invoke(self, element, handler, argv, context):
+        """Invoke command using parser and documentation of the given element (command or its binding)."""
         context = context or (self.name,)
         try:
-            parser = Parser(self.signature, self.declared_options.values())
-            options, arguments = parser.parse(argv)
+            options, arguments = element.parser.parse(argv)
         except CliSyntaxException as e:
             print(e)
-            print(self.full_doc(full_name=context))
+            print(element.full_doc(full_name=context))
             raise
-        return self._do_invoke(handler, arguments, options)
+        return self._execute(element, handler, arguments, options)
+
+    def prepare(self, handler, argv):
+        """Parse raw command-line arguments up front.
+
+        Unlike `invoke`, syntax errors are raised without printing help.
+
+        :return: a function executing the command with the parsed arguments
+        """
+        return self._prepare(self, handler, argv)
+
+    def _prepare(self, element, handler, argv, parser=None):
+        """Parse arguments using parser of the given element (command or its binding)."""
+        options, arguments = (parser or element.parser).parse(argv)
+        return lambda: self._execute(element, handler, arguments, options)
+
+    def _execute(self, element, handler, arguments, options):
+        """Execute command with parsed arguments and option values (running coroutines)."""
+        if self._fan_out is not None:
+            result = self._fan_out.invoke(self, element, handler, arguments, options)
+        else:
+            result = self._do_invoke(handler, arguments, options)
+        if _is_awaitable(result):
+            from comandante.inner.asynchronous import run
+            return run(result)
+        return result
 
     def _do_invoke(self, handler, arguments, options):
         """Do invoke command with parsed arguments and option values."""
@@ -486,8 +679,7 @@ class Command(object):
 
     def full_doc(self, full_name=None):
         """Get command full formatted documentation."""
-        help_writer = HelpWriter()
-        return help_writer.document_command(self, full_name)
+        return document_command(self, full_name)
 
     def copy(self):
         """Create a fresh copy of the command instance."""
@@ -498,17 +690,9 @@ class Command(object):
             brief=self.brief,
             descr=self.descr)
         copy.use_options(self.declared_options.values())
+        copy._fan_out = self._fan_out
         return copy
 
 
-class Options(AttributeDict):
-    def __init__(self, specified, declared):
-        super(Options, self).__init__(dict())
-        self._set('_specified', set(specified.keys()))
-        for option in declared:
-            self._target[option.name] = option.default
-        self._target.update(specified)
-
-    def is_specified(self, name):
-        """Check if option is specified."""
-        return name in self._specified
+# Commands of a command (which never has any)
+_NO_COMMANDS = mapping_view({})
@@ -0,0 +1,612 @@
+"""Shell completion scripts generation.
+
+Description:
+-----------
+
+This module generates self-contained bash, zsh and fish
+completion scripts from the handler tree. Generated scripts
+complete command names, options and `choice` values without
+running any python code.
+
+All scripts follow the same algorithm: walk the words
+preceding the cursor to find the command path and the
+position of the current positional argument, then offer
+subcommands, options or values depending on the word
+being completed. The model is encoded as shell `case`
+statements keyed by the command path.
+
+Values of `completed` types are read by scripts from the
+completion cache (see `completion_cache`). Stale entries
+are refreshed by a detached refresh command.
+"""
+
+import abc
+import re
+
+from comandante.inner.completion_cache import LOCK_TIMEOUT, entry_key
+from comandante.inner.helpers import Abstract
+from comandante.inner.output.help_files import walk
+from comandante.types import Completed, Stream
+
+SHELLS = ('bash', 'zsh', 'fish')
+
+# Age of a stale refresh lock in minutes (as tested by find -mmin)
+_LOCK_MINUTES = max(LOCK_TIMEOUT // 60, 1)
+
+# Cache root directory as computed by POSIX shells
+_CACHE_ROOT = '${COMANDANTE_COMPLETION_CACHE:-${XDG_CACHE_HOME:-$HOME/.cache}/comandante}'
+
+
+def completion_values(value_type):
+    """Get possible values of the type.
+
+    :return: tuple of choices, `Completed` type for dynamic values
+             or None if values are not enumerable
+    """
+    if isinstance(value_type, Stream):
+        value_type = value_type.value_type
+    if isinstance(value_type, Completed):
+        return value_type
+    return getattr(value_type, 'choices', None)
+
+
+class Node(object):
+    """Completion model of a single command path."""
+
+    def __init__(self, path, element, is_handler):
+        self.words = list(path)
+        self.path = ' '.join(path)
+        self.commands = []
+        self.options = []
+        self.arguments = []
+        self.rest = None
+        if is_handler:
+            for name in sorted(element.declared_commands.keys()):
+                self.commands.append((name, element.declared_commands[name].brief))
+            return
+        for name in sorted(element.declared_options.keys()):
+            option = element.declared_options[name]
+            takes_value = option.type is not bool
+            self.options.append((option.name, '--' + option.name, '-' + option.short, takes_value,
+                                 completion_values(option.type)))
+        for argument in element.signature.arguments:
+            if isinstance(argument.type, Stream):
+                self.rest = (argument.name, completion_values(argument.type))
+            else:
+                self.arguments.append((argument.name, completion_values(argument.type)))
+        vararg = element.signature.vararg
+        if vararg is not None:
+            self.rest = (vararg.name, completion_values(vararg.type))
+
+    def dynamic(self):
+        """Check if any values are completed dynamically."""
+        specs = [values for _, _, _, _, values in self.options]
+        specs.extend(values for _, values in self.arguments)
+        if self.rest is not None:
+            specs.append(self.rest[1])
+        return any(isinstance(values, Completed) for values in specs)
+
+
+def parameter_type(command, name):
+    """Get type of the command option or argument by name."""
+    if name in command.declared_options:
+        return command.declared_options[name].type
+    signature = command.signature
+    for argument in list(signature.arguments) + [signature.vararg]:
+        if argument is not None and argument.name == name:
+            return argument.type
+    raise KeyError(name)
+
+
+def model(handler, name=None):
+    """Get completion model of the handler tree.
+
+    :param handler: root cli-handler
+    :param name: program name (handler name by default)
+    :return: list of nodes
+    """
+    name = name or handler.name
+    return [Node([name] + full_name[1:], element, is_handler)
+            for full_name, element, is_handler in walk(handler, [handler.name])]
+
+
+def quote(text):
+    """Quote text for POSIX-like shells (bash and zsh)."""
+    return "'" + text.replace("'", "'\\''") + "'"
+
+
+def ansi_quote(text):
+    """Quote text for bash keeping it on a single line (ANSI-C quoting)."""
+    return "$'" + text.replace('\\', '\\\\').replace("'", "\\'").replace('\n', '\\n') + "'"
+
+
+def fish_quote(text):
+    """Quote text for fish shell."""
+    return "'" + text.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+def identifier(name):
+    """Get shell function name suffix for the program name."""
+    return re.sub(r'[^0-9a-zA-Z_]', '_', name)
+
+
+def completion_script(handler, shell, name=None, refresh=None):
+    """Generate shell completion script.
+
+    :param handler: root cli-handler
+    :param shell: shell name (see `SHELLS`)
+    :param name: program name (handler name by default)
+    :param refresh: command refreshing dynamic values, which will be
+                    called with command path and parameter name (None
+                    to serve dynamic values from the cache only)
+    :return: script text
+    """
+    if shell not in SHELLS:
+        raise ValueError("Unsupported shell: {shell}".format(shell=shell))
+    name = name or handler.name
+    writer = {'bash': BashScript, 'zsh': ZshScript, 'fish': FishScript}[shell]
+    return writer(name, model(handler, name), refresh).render()
+
+
+class PosixScript(Abstract):
+    """Common parts of bash and zsh scripts.
+
+    Helper functions store their results in the `reply`
+    variable declared local by the completion function.
+    """
+
+    def __init__(self, name, nodes, refresh=None):
+        self.name = name
+        self.prefix = '_comandante_' + identifier(name)
+        self.nodes = nodes
+        self.refresh = refresh
+
+    @abc.abstractmethod
+    def words(self, words):
+        """Get assignment of the word list to reply."""
+
+    def values(self, node, parameter, values):
+        """Get code assigning parameter values to reply."""
+        if isinstance(values, Completed):
+            return '{prefix}_dynamic {path} {parameter} {key}'.format(
+                prefix=self.prefix, path=quote(node.path), parameter=quote(parameter),
+                key=quote(entry_key(node.words, parameter)))
+        return self.words(values)
+
+    @abc.abstractmethod
+    def dynamic(self):
+        """Get lines of the function reading dynamic values from the cache."""
+
+    def lock(self):
+        """Get lines of the function taking the refresh lock of a cache entry.
+
+        A stale lock (see `completion_cache.LOCK_TIMEOUT`) is renamed
+        and removed, so that only one shell takes it over.
+        """
+        return [
+            '# take the refresh lock (taking over a stale one): <lock directory>',
+            '{prefix}_lock() {{'.format(prefix=self.prefix),
+            '    mkdir "$1" 2>/dev/null && return 0',
+            '    [ -n "$(find "$1" -maxdepth 0 -mmin +{minutes} 2>/dev/null)" ] || return 1'.format(
+                minutes=_LOCK_MINUTES),
+            '    mv "$1" "$1.$$" 2>/dev/null && rmdir "$1.$$" && mkdir "$1" 2>/dev/null',
+            '}',
+            '',
+        ]
+
+    def refresh_command(self):
+        """Get detached refresh command (or no-op if refresh is disabled)."""
+        if not self.refresh:
+            return ':'
+        return '( {command} "$1" "$2" </dev/null >/dev/null 2>&1 & )'.format(
+            command=' '.join(map(quote, self.refresh)))
+
+    def case(self, subject, branches):
+        """Get case statement lines for (pattern, body) pairs."""
+        lines = ['    case {subject} in'.format(subject=subject)]
+        for patterns, body in branches:
+            lines.append('        {patterns}) {body} ;;'.format(patterns='|'.join(map(quote, patterns)), body=body))
+        lines.append('    esac')
+        return lines
+
+    def function(self, suffix, comment, lines):
+        """Get helper function lines."""
+        result = ['# ' + comment, '{prefix}_{suffix}() {{'.format(prefix=self.prefix, suffix=suffix)]
+        result.extend(lines)
+        result.append('    return 1')
+        result.append('}')
+        result.append('')
+        return result
+
+    def helpers(self):
+        """Get lines of helper functions encoding the model."""
+        commands, options, valued, values, arguments, rest = [], [], [], [], [], []
+        for node in self.nodes:
+            if node.commands:
+                commands.append(([node.path], self.words(name for name, _ in node.commands) + '; return 0'))
+            if node.options:
+                names = []
+                for name, long, short, takes_value, option_values in node.options:
+                    names.extend((long, short))
+                    keys = [node.path + ' ' + long, node.path + ' ' + short]
+                    if takes_value:
+                        valued.append((keys, 'return 0'))
+                    if option_values:
+                        values.append((keys, self.values(node, name, option_values) + '; return 0'))
+                options.append(([node.path], self.words(names) + '; return 0'))
+            for position, (name, argument_values) in enumerate(node.arguments):
+                if argument_values:
+                    key = "{path} {position}".format(path=node.path, position=position)
+                    arguments.append(([key], self.values(node, name, argument_values) + '; return 0'))
+            if node.rest is not None and node.rest[1]:
+                body = '[ "$2" -ge {count} ] && {values} && return 0'.format(
+                    count=len(node.arguments), values=self.values(node, *node.rest))
+                rest.append(([node.path], body))
+
+        lines = []
+        if any(node.dynamic() for node in self.nodes):
+            lines += self.dynamic()
+        lines += self.function('commands', 'commands of the handler: <path>', self.case('"$1"', commands))
+        lines += self.function('options', 'options of the command: <path>', self.case('"$1"', options))
+        lines += self.function('valued', 'check if option takes a value: <path> <option>', self.case('"$1"', valued))
+        lines += self.function('values', 'option values: <path> <option>', self.case('"$1"', values))
+        lines += self.function('arguments', 'argument values: <path> <position>',
+                               self.case('"$1 $2"', arguments) + self.case('"$1"', rest))
+        return lines
+
+    @abc.abstractmethod
+    def render(self):
+        """Get script text."""
+
+
+class BashScript(PosixScript):
+    """Bash completion script (compatible with bash 3).
+
+    The reply holds one word per line, so that words may contain
+    spaces (cached dynamic values are stored the same way).
+    """
+
+    def words(self, words):
+        return 'reply={words}'.format(words=ansi_quote('\n'.join(words)))
+
+    def complete(self):
+        """Get lines of the function adding reply words to COMPREPLY."""
+        return [
+            '# add reply words starting with the word to COMPREPLY: <prepended text> <word>',
+            '{prefix}_complete() {{'.format(prefix=self.prefix),
+            '    local value',
+            '    while IFS= read -r value; do',
+            '        case "$value" in',
+            '            "") ;;',
+            '            "$2"*)',
+            '                case "$value" in',
+            "                    *[!A-Za-z0-9_./:=@,+%^-]*) value=\"$(printf '%q' \"$value\")\" ;;",
+            '                esac',
+            '                COMPREPLY[${#COMPREPLY[@]}]="$1$value"',
+            '                ;;',
+            '        esac',
+            '    done <<< "$reply"',
+            '    return 0',
+            '}',
+            '',
+        ]
+
+    def dynamic(self):
+        return self.lock() + [
+            '# cached values of a dynamic completion provider: <path> <parameter> <key>',
+            '{prefix}_dynamic() {{'.format(prefix=self.prefix),
+            '    local file="{root}/{name}/$3" expires=0'.format(root=_CACHE_ROOT, name=self.name),
+            '    if [ -r "$file" ]; then',
+            '        { read -r expires; reply="$(cat)"; } < "$file"',
+            '    fi',
+            '    if [ "${EPOCHSECONDS:-$(date +%s)}" -ge "$expires" ] && mkdir -p "${file%/*}" &&',
+            '        {prefix}_lock "$file.lock"; then'.format(prefix=self.prefix),
+            '        ' + self.refresh_command(),
+            '    fi',
+            '    return 0',
+            '}',
+            '',
+        ]
+
+    def render(self):
+        prefix = self.prefix
+        lines = [
+            '# bash completion for {name} (generated by comandante)'.format(name=self.name),
+            '',
+        ]
+        lines += self.helpers()
+        lines += self.complete()
+        lines += [
+            '{prefix}() {{'.format(prefix=prefix),
+            '    local cur="${COMP_WORDS[COMP_CWORD]}" word reply option="" nl=$\'\\n\'',
+            '    local command_path={name} position=0 i=1'.format(name=quote(self.name)),
+            '    COMPREPLY=()',
+            '    while [ "$i" -lt "$COMP_CWORD" ]; do',
+            '        word="${COMP_WORDS[i]}"',
+            '        i=$((i + 1))',
+            '        if [ -n "$option" ]; then',
+            '            # "=" is a separate word when it is in COMP_WORDBREAKS',
+            '            [ "$word" = "=" ] || option=""',
+            '            continue',
+            '        fi',
+            '        case "$word" in',
+            '            --*=*) ;;',
+            '            -*) {prefix}_valued "$command_path $word" && option="$word" ;;'.format(prefix=prefix),
+            '            *)',
+            '                reply=""',
+            '                {prefix}_commands "$command_path"'.format(prefix=prefix),
+            '                case "$nl$reply$nl" in',
+            '                    *"$nl$word$nl"*) command_path="$command_path $word" ;;',
+            '                    *) position=$((position + 1)) ;;',
+            '                esac',
+            '                ;;',
+            '        esac',
+            '    done',
+            '    [ "$cur" = "=" ] && cur=""',
+            '    reply=""',
+            '    if [ -n "$option" ]; then',
+            '        {prefix}_values "$command_path $option" || return 0'.format(prefix=prefix),
+            '        {prefix}_complete "" "$cur"'.format(prefix=prefix),
+            '        return 0',
+            '    fi',
+            '    case "$cur" in',
+            '        --*=*)',
+            '            {prefix}_values "$command_path ${{cur%%=*}}" || return 0'.format(prefix=prefix),
+            '            {prefix}_complete "${{cur%%=*}}=" "${{cur#*=}}"'.format(prefix=prefix),
+            '            return 0',
+            '            ;;',
+            '        -*)',
+            '            [ "$position" -eq 0 ] && {prefix}_options "$command_path"'.format(prefix=prefix),
+            '            {prefix}_complete "" "$cur"'.format(prefix=prefix),
+            '            return 0',
+            '            ;;',
+            '    esac',
+            '    {prefix}_commands "$command_path" || {prefix}_arguments "$command_path" "$position" || return 0'.format(prefix=prefix),
+            '    {prefix}_complete "" "$cur"'.format(prefix=prefix),
+            '}',
+            '',
+            'complete -o default -F {prefix} {name}'.format(prefix=prefix, name=quote(self.name)),
+            '',
+        ]
+        return '\n'.join(lines)
+
+
+class ZshScript(PosixScript):
+    """Zsh completion script."""
+
+    def words(self, words):
+        return 'reply=({words})'.format(words=' '.join(map(quote, words)))
+
+    def dynamic(self):
+        return self.lock() + [
+            '# cached values of a dynamic completion provider: <path> <parameter> <key>',
+            '{prefix}_dynamic() {{'.format(prefix=self.prefix),
+            '    local file="{root}/{name}/$3" expires=0'.format(root=_CACHE_ROOT, name=self.name),
+            '    if [[ -r "$file" ]]; then',
+            '        read -r expires < "$file"',
+            '        reply=(${(f)"$(tail -n +2 "$file")"})',
+            '    fi',
+            '    if (( $(date +%s) >= expires )) && mkdir -p "${{file:h}}" && {prefix}_lock "$file.lock"; then'.format(
+                prefix=self.prefix),
+            '        ' + self.refresh_command(),
+            '    fi',
+            '    return 0',
+            '}',
+            '',
+        ]
+
+    def render(self):
+        prefix = self.prefix
+        lines = [
+            '#compdef {name}'.format(name=self.name),
+            '# zsh completion for {name} (generated by comandante)'.format(name=self.name),
+            '',
+        ]
+        lines += self.helpers()
+        lines += [
+            '{prefix}() {{'.format(prefix=prefix),
+            '    local cur="${words[CURRENT]}" word option=""',
+            '    local command_path={name} position=0 i=2'.format(name=quote(self.name)),
+            '    local -a reply',
+            '    while (( i < CURRENT )); do',
+            '        word="${words[i]}"',
+            '        (( i++ ))',
+            '        if [[ -n "$option" ]]; then',
+            '            option=""',
+            '            continue',
+            '        fi',
+            '        case "$word" in',
+            '            --*=*) ;;',
+            '            -*) {prefix}_valued "$command_path $word" && option="$word" ;;'.format(prefix=prefix),
+            '            *)',
+            '                reply=()',
+            '                {prefix}_commands "$command_path"'.format(prefix=prefix),
+            '                if (( ${reply[(Ie)$word]} )); then',
+            '                    command_path="$command_path $word"',
+            '                else',
+            '                    (( position++ ))',
+            '                fi',
+            '                ;;',
+            '        esac',
+            '    done',
+            '    reply=()',
+            '    if [[ -n "$option" ]]; then',
+            '        {prefix}_values "$command_path $option" && compadd -- "${{reply[@]}}" || _files'.format(prefix=prefix),
+            '        return',
+            '    fi',
+            '    case "$cur" in',
+            '        --*=*)',
+            '            {prefix}_values "$command_path ${{cur%%=*}}" || {{ _files; return }}'.format(prefix=prefix),
+            '            compset -P "*="',
+            '            compadd -- "${reply[@]}"',
+            '            return',
+            '            ;;',
+            '        -*)',
+            '            (( position == 0 )) && {prefix}_options "$command_path"'.format(prefix=prefix),
+            '            compadd -- "${reply[@]}"',
+            '            return',
+            '            ;;',
+            '    esac',
+            '    if {prefix}_commands "$command_path" || {prefix}_arguments "$command_path" "$position"; then'.format(prefix=prefix),
+            '        compadd -- "${reply[@]}"',
+            '    else',
+            '        _files',
+            '    fi',
+            '}',
+            '',
+            'compdef {prefix} {name}'.format(prefix=prefix, name=quote(self.name)),
+            '',
+        ]
+        return '\n'.join(lines)
+
+
+class FishScript(object):
+    """Fish completion script."""
+
+    def __init__(self, name, nodes, refresh=None):
+        self.name = name
+        self.prefix = '__comandante_' + identifier(name)
+        self.nodes = nodes
+        self.refresh = refresh
+
+    def words(self, node, parameter, values):
+        """Get completion candidates argument (a command substitution for dynamic values)."""
+        if isinstance(values, Completed):
+            return fish_quote('({prefix}_dynamic {path} {parameter} {key})'.format(
+                prefix=self.prefix, path=fish_quote(node.path), parameter=fish_quote(parameter),
+                key=fish_quote(entry_key(node.words, parameter))))
+        return fish_quote(' '.join(values))
+
+    def dynamic(self):
+        """Get lines of the function printing dynamic values from the cache."""
+        refresh = ':'
+        if self.refresh:
+            refresh = '{command} $argv[1] $argv[2] </dev/null >/dev/null 2>&1 &; disown'.format(
+                command=' '.join(map(fish_quote, self.refresh)))
+        return [
+            '# take the refresh lock (taking over a stale one): <lock directory>',
+            'function {prefix}_lock'.format(prefix=self.prefix),
+            '    mkdir $argv[1] 2>/dev/null; and return 0',
+            '    set -l stale (find $argv[1] -maxdepth 0 -mmin +{minutes} 2>/dev/null)'.format(minutes=_LOCK_MINUTES),
+            '    test -n "$stale"; or return 1',
+            '    mv $argv[1] $argv[1].$fish_pid 2>/dev/null; and rmdir $argv[1].$fish_pid; and mkdir $argv[1] 2>/dev/null',
+            'end',
+            '',
+            '# print cached values of a dynamic completion provider: <path> <parameter> <key>',
+            'function {prefix}_dynamic'.format(prefix=self.prefix),
+            '    set -l root $COMANDANTE_COMPLETION_CACHE',
+            '    if test -z "$root"',
+            '        set root $HOME/.cache/comandante',
+            '        set -q XDG_CACHE_HOME; and set root $XDG_CACHE_HOME/comandante',
+            '    end',
+            '    set -l file $root/{name}/$argv[3]'.format(name=fish_quote(self.name)),
+            '    set -l expires 0',
+            '    if test -r $file',
+            '        read expires < $file',
+            '        tail -n +2 $file',
+            '    end',
+            '    if test (date +%s) -ge $expires; and mkdir -p (dirname $file); and {prefix}_lock $file.lock'.format(
+                prefix=self.prefix),
+            '        ' + refresh,
+            '    end',
+            'end',
+            '',
+        ]
+
+    def switch(self, function, comment, branches):
+        """Get function lines with a switch statement for (patterns, body) pairs."""
+        lines = ['# ' + comment, 'function {prefix}_{function}'.format(prefix=self.prefix, function=function),
+                 '    switch "$argv"']
+        for patterns, body in branches:
+            lines.append('        case {patterns}'.format(patterns=' '.join(map(fish_quote, patterns))))
+            lines.append('            ' + body)
+        lines.extend(['    end', '    return 1', 'end', ''])
+        return lines
+
+    def render(self):
+        prefix, name = self.prefix, fish_quote(self.name)
+        commands, valued = [], []
+        for node in self.nodes:
+            if node.commands:
+                commands.append(([node.path], 'printf "%s\\n" {words}; return 0'.format(
+                    words=' '.join(fish_quote(command) for command, _ in node.commands))))
+            keys = []
+            for _, long, short, takes_value, _ in node.options:
+                if takes_value:
+                    keys.extend((node.path + ' ' + long, node.path + ' ' + short))
+            if keys:
+                valued.append((keys, 'return 0'))
+
+        lines = ['# fish completion for {name} (generated by comandante)'.format(name=self.name), '']
+        lines += self.switch('commands', 'commands of the handler: <path>', commands)
+        lines += self.switch('valued', 'check if option takes a value: <path> <option>', valued)
+        if any(node.dynamic() for node in self.nodes):
+            lines += self.dynamic()
+        lines += [
+            '# print command path and position of the current positional argument',
+            'function {prefix}_state'.format(prefix=prefix),
+            '    set -l tokens (commandline -opc)',
+            '    set -l path {name}'.format(name=name),
+            '    set -l position 0',
+            '    set -l option ""',
+            '    for token in $tokens[2..-1]',
+            '        if test -n "$option"',
+            '            set option ""',
+            '        else if string match -q -- "--*=*" $token',
+            '        else if string match -q -- "-*" $token',
+            '            {prefix}_valued "$path $token"; and set option $token'.format(prefix=prefix),
+            '        else if contains -- $token ({prefix}_commands "$path")'.format(prefix=prefix),
+            '            set path "$path $token"',
+            '        else',
+            '            set position (math $position + 1)',
+            '        end',
+            '    end',
+            '    if test -n "$option"',
+            '        set position -1',
+            '    end',
+            '    echo $path',
+            '    echo $position',
+            'end',
+            '',
+            '# check command path and bounds of the current positional argument: <path> [min [max]]',
+            'function {prefix}_at'.format(prefix=prefix),
+            '    set -l state ({prefix}_state)'.format(prefix=prefix),
+            '    test "$state[1]" = "$argv[1]"; or return 1',
+            '    set -q argv[2]; and not test "$state[2]" -ge "$argv[2]"; and return 1',
+            '    set -q argv[3]; and not test "$state[2]" -le "$argv[3]"; and return 1',
+            '    return 0',
+            'end',
+            '',
+            'complete -c {name}'.format(name=name),
+        ]
+        for node in self.nodes:
+            for command, brief in node.commands:
+                lines.append("complete -c {name} -f -n {condition} -a {command} -d {brief}".format(
+                    name=name, condition=fish_quote("{prefix}_at {path}".format(
+                        prefix=prefix, path=fish_quote(node.path))),
+                    command=fish_quote(command), brief=fish_quote(brief or '')))
+            for option_name, long, short, takes_value, option_values in node.options:
+                line = "complete -c {name} -n {condition} -l {long} -{kind} {short}".format(
+                    name=name, condition=fish_quote("{prefix}_at {path} 0 0".format(
+                        prefix=prefix, path=fish_quote(node.path))),
+                    long=fish_quote(long[2:]), kind='s' if len(short) == 2 else 'o', short=fish_quote(short[1:]))
+                if option_values:
+                    line += " -x -a {values}".format(values=self.words(node, option_name, option_values))
+                elif takes_value:
+                    line += " -r"
+                lines.append(line)
+            for position, (argument_name, argument_values) in enumerate(node.arguments):
+                if argument_values:
+                    lines.append(self.values(node, (position, position), argument_name, argument_values))
+            if node.rest is not None and node.rest[1]:
+                lines.append(self.values(node, (len(node.arguments),), *node.rest))
+        lines.append('')
+        return '\n'.join(lines)
+
+    def values(self, node, bounds, parameter, values):
+        """Get completion of positional argument values."""
+        condition = "{prefix}_at {path} {bounds}".format(
+            prefix=self.prefix, path=fish_quote(node.path), bounds=' '.join(map(str, bounds)))
+        return "complete -c {name} -f -n {condition} -a {values}".format(
+            name=fish_quote(self.name), condition=fish_quote(condition),
+            values=self.words(node, parameter, values))
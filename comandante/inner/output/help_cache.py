@@ -0,0 +1,172 @@
+"""Rendered help cache.
+
+Description:
+-----------
+
+This module provides a cache of rendered documentation
+of handlers and commands. Rendered help is memoized in
+process and may be also stored on disk, so that help and
+error output in the subsequent runs doesn't need to import
+and run the help machinery at all.
+
+Cache entries are keyed by the command path, terminal width
+and a fingerprint of everything the documentation depends on
+(names, descriptions, arguments and options), so they are
+invalidated automatically whenever the model changes.
+
+On-disk cache is enabled by the COMANDANTE_HELP_CACHE
+environment variable pointing to the cache directory.
+
+Help pre-rendered at build time (see `help_files`) takes
+precedence over the cache once registered. Help files are
+registered per program: they serve only the command paths
+starting with the name of the root handler they were built for.
+"""
+
+import os
+
+from comandante.inner.output.terminal import Terminal
+from comandante.types import Stream
+
+# Version of the rendered help format (change it to invalidate on-disk cache)
+FORMAT_VERSION = 1
+
+# Environment variable specifying on-disk cache directory
+CACHE_DIR_VARIABLE = 'COMANDANTE_HELP_CACHE'
+
+# Atomic file replacement (python 2 has only os.rename)
+_replace = getattr(os, 'replace', os.rename)
+
+
+def _type_name(value_type):
+    """Get type name as displayed in help."""
+    return getattr(value_type, '__name__', repr(value_type))
+
+
+def _options_fingerprint(element):
+    """Get fingerprint of the declared options."""
+    options = element.declared_options
+    return tuple((option.name, option.short, _type_name(option.type), option.type is bool, option.descr)
+                 for option in (options[name] for name in sorted(options.keys())))
+
+
+def handler_fingerprint(handler):
+    """Get fingerprint of everything the handler documentation depends on."""
+    commands = handler.declared_commands
+    return (
+        'handler',
+        handler.name,
+        handler.brief,
+        handler.descr,
+        tuple((name, commands[name].name, commands[name].brief) for name in sorted(commands.keys())),
+        _options_fingerprint(handler),
+    )
+
+
+def command_fingerprint(command):
+    """Get fingerprint of everything the command documentation depends on."""
+    signature = command.signature
+    vararg = signature.vararg
+    return (
+        'command',
+        command.name,
+        command.brief,
+        command.descr,
+        tuple((argument.name, argument.is_required(), isinstance(argument.type, Stream))
+              for argument in signature.arguments),
+        vararg.name if vararg is not None else None,
+        _options_fingerprint(command),
+    )
+
+
+class HelpCache(object):
+    """Rendered help cache."""
+
+    # Maximal number of documents memoized in process
+    MAX_ENTRIES = 256
+
+    def __init__(self, directory=None):
+        """Initialize instance.
+
+        :param directory: on-disk cache directory (None to disable on-disk cache)
+        """
+        self.directory = directory
+        self.help_files = {}
+        self._memo = {}
+
+    def add_help_files(self, help_files):
+        """Serve help of the program from pre-rendered files (see `help_files.HelpFiles`)."""
+        self.help_files.setdefault(help_files.name, []).append(help_files)
+
+    def document_handler(self, handler, full_name=None):
+        """Get handler documentation."""
+        full_name = tuple(full_name or [handler.name])
+        return self._get(full_name, handler_fingerprint, handler,
+                         lambda writer: writer.document_handler(handler, list(full_name)))
+
+    def document_command(self, command, full_name=None):
+        """Get command documentation."""
+        full_name = tuple(full_name or [command.name])
+        return self._get(full_name, command_fingerprint, command,
+                         lambda writer: writer.document_command(command, list(full_name)))
+
+    def clear(self):
+        """Forget documents memoized in process."""
+        self._memo.clear()
+
+    def _get(self, full_name, fingerprint, element, document):
+        """Get pre-rendered or cached document or render a new one."""
+        terminal = Terminal.detect()
+        for help_files in self.help_files.get(full_name[0], ()):
+            text = help_files.lookup(full_name, terminal.cols)
+            if text is not None:
+                return text
+        key = (FORMAT_VERSION, terminal.cols, full_name, fingerprint(element))
+        text = self._memo.get(key)
+        if text is not None:
+            return text
+        text = self._load(key)
+        if text is None:
+            from comandante.inner.output.help_writer import HelpWriter
+            text = document(HelpWriter(terminal=terminal))
+            self._store(key, text)
+        if len(self._memo) >= self.MAX_ENTRIES:
+            self._memo.clear()
+        self._memo[key] = text
+        return text
+
+    def _path(self, key):
+        """Get on-disk cache file path."""
+        import hashlib
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + '.txt')
+
+    def _load(self, key):
+        """Load document from on-disk cache (if enabled)."""
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), 'rb') as file:
+                return file.read().decode('utf-8')
+        except (IOError, OSError):
+            return None
+
+    def _store(self, key, text):
+        """Store document in on-disk cache (if enabled)."""
+        if not self.directory:
+            return
+        path = self._path(key)
+        temporary = "{path}.{pid}.tmp".format(path=path, pid=os.getpid())
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            with open(temporary, 'wb') as file:
+                file.write(text.encode('utf-8'))
+            _replace(temporary, path)
+        except (IOError, OSError):
+            # the cache is just an optimization
+            pass
+
+
+# Process-wide help cache
+help_cache = HelpCache(directory=os.environ.get(CACHE_DIR_VARIABLE))
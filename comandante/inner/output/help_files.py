@@ -0,0 +1,174 @@
+"""Pre-rendered help files.
+
+Description:
+-----------
+
+This module provides a build step rendering documentation
+of the whole handler tree into static files, and a reader
+which serves help from those files at runtime.
+
+Help files directory layout:
+
+    manifest.txt         - program name, version and width the files were built for
+    ansi/<path>.txt      - help as printed to the terminal
+    text/<path>.txt      - plain text help
+    man/<path>.1         - roff man pages
+
+where <path> is the full command path (starting with the program
+name) as nested directories (e.g. git/remote/add), so that distinct
+command paths never share a file.
+"""
+
+import os
+
+from comandante.inner.output.help_cache import FORMAT_VERSION
+from comandante.inner.output.terminal import Terminal
+
+MANIFEST = 'manifest.txt'
+
+
+def file_name(full_name):
+    """Get relative base file path for the full command path.
+
+    :raise ValueError: if a name can't be used as a path component
+    """
+    for name in full_name:
+        if name in ('', os.curdir, os.pardir) or os.sep in name or (os.altsep and os.altsep in name):
+            raise ValueError("Invalid command name for help files: '{name}'".format(name=name))
+    return os.path.join(*full_name)
+
+
+def _read(path):
+    with open(path, 'rb') as file:
+        return file.read().decode('utf-8')
+
+
+def _write(path, text):
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    with open(path, 'wb') as file:
+        file.write(text.encode('utf-8'))
+
+
+class HelpFiles(object):
+    """Help pre-rendered by `build_help_files`.
+
+    Files serve only the command paths of the program they were
+    built for (the first name of the path is the program name).
+    """
+
+    def __init__(self, directory, version, name=None):
+        """Initialize instance.
+
+        :param directory: help files directory
+        :param version: application version (files built for other versions are ignored)
+        :param name: program (root handler) name (files built for other programs
+                     are ignored), None to serve the program named by the manifest
+        """
+        self.directory = directory
+        self.version = str(version)
+        self._name = name
+        self._width = None
+
+    @property
+    def name(self):
+        """Get name of the program the files serve."""
+        if self._name is None:
+            self._name = self._manifest().get('name', '')
+        return self._name
+
+    @property
+    def width(self):
+        """Get width the files were rendered for (0 if files are unusable)."""
+        if self._width is None:
+            self._width = self._read_manifest()
+        return self._width
+
+    def _manifest(self):
+        """Get manifest values (empty if there is no manifest)."""
+        try:
+            manifest = _read(os.path.join(self.directory, MANIFEST))
+        except (IOError, OSError):
+            return {}
+        return dict(line.split('=', 1) for line in manifest.splitlines() if '=' in line)
+
+    def _read_manifest(self):
+        """Get rendered help width if the manifest matches program, version and format."""
+        values = self._manifest()
+        if values.get('format') != str(FORMAT_VERSION) or values.get('version') != self.version:
+            return 0
+        if values.get('name') != self.name:
+            return 0
+        try:
+            return int(values.get('width', 0))
+        except ValueError:
+            return 0
+
+    def lookup(self, full_name, width):
+        """Get pre-rendered help for the command path.
+
+        :param full_name: full command path (starting with the program name)
+        :param width: current terminal width
+        :return: help text or None if there is no suitable file
+        """
+        if self.width != width or full_name[0] != self.name:
+            return None
+        try:
+            return _read(os.path.join(self.directory, 'ansi', file_name(full_name) + '.txt'))
+        except (IOError, OSError, ValueError):
+            return None
+
+
+def walk(handler, full_name):
+    """Iterate over (command path, element, is handler) triples of the handler tree."""
+    yield full_name, handler, True
+    for name in sorted(handler.declared_commands.keys()):
+        element = handler.declared_commands[name]
+        element_name = full_name + [name]
+        if element.declared_commands:
+            for entry in walk(element, element_name):
+                yield entry
+        else:
+            yield element_name, element, False
+
+
+def build_help_files(handler, directory, version, width=Terminal.DEFAULT_MAX_COLS):
+    """Render help of the whole handler tree into files.
+
+    Lazily declared commands are imported to be documented.
+
+    :param handler: root cli-handler
+    :param directory: output directory
+    :param version: application version
+    :param width: width of the rendered help
+    :return: list of written file paths
+    """
+    from comandante.inner.output.help_writer import HelpWriter
+    from comandante.inner.output.man_writer import ManWriter
+    from comandante.inner.output.markup import PlainMarkup
+
+    terminal = Terminal(cols=width)
+    writers = (
+        ('ansi', '.txt', HelpWriter(terminal=terminal)),
+        ('text', '.txt', HelpWriter(markup=PlainMarkup, terminal=terminal)),
+        ('man', '.1', ManWriter(version=str(version))),
+    )
+    written = []
+    for full_name, element, is_handler in walk(handler, [handler.name]):
+        for kind, extension, writer in writers:
+            if is_handler:
+                text = writer.document_handler(element, full_name)
+            else:
+                text = writer.document_command(element, full_name)
+            path = os.path.join(directory, kind, file_name(full_name) + extension)
+            _write(path, text)
+            written.append(path)
+
+    # manifest is written last, so incomplete builds are never served
+    manifest = "format={format}\nname={name}\nversion={version}\nwidth={width}\n".format(
+        format=FORMAT_VERSION, name=handler.name, version=version, width=width)
+    path = os.path.join(directory, MANIFEST)
+    _write(path, manifest)
+    written.append(path)
+    return written
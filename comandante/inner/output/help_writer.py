@@ -2,8 +2,9 @@ import textwrap
 from itertools import chain
 
 from comandante.inner.helpers import getname
-from comandante.inner.output.markup import Markup, Ansi
+from comandante.inner.output.markup import Markup
 from comandante.inner.output.terminal import Terminal
+from comandante.types import Stream
 
 
 class Paragraph:
@@ -37,8 +38,8 @@ class Paragraph:
 class HelpWriter:
     """Documentation composer for handlers and commands."""
 
-    def __init__(self, markup=Markup, indent=' ' * 4):
-        self._terminal = Terminal.detect()
+    def __init__(self, markup=Markup, indent=' ' * 4, terminal=None):
+        self._terminal = terminal or Terminal.detect()
         self._markup = markup
         self._indent_unit = indent
 
@@ -144,7 +145,7 @@ class HelpWriter:
         return self.section(heading="options", paragraphs=chain(*summarized_options))
 
     def section(self, heading, paragraphs, delimiter='\n\n'):
-        heading = Ansi.bold(heading.upper())
+        heading = self._markup.bold(heading.upper())
 
         body = list()
         for paragraph in paragraphs:
@@ -180,6 +181,8 @@ class HelpWriter:
     @staticmethod
     def argument_pattern(argument):
         """Get argument pattern."""
+        if isinstance(argument.type, Stream):
+            return "[{name} ... ]"
         if argument.is_required():
             return "<{name}>"
         return "[{name}]"
@@ -0,0 +1,163 @@
+"""Man page generation.
+
+Description:
+-----------
+
+This module provides components to render
+documentation of handlers and commands as
+roff man pages.
+"""
+
+from comandante.inner.output.help_writer import HelpWriter
+from comandante.inner.output.markup import Markup
+
+
+def escape(text):
+    """Escape roff control characters in plain text."""
+    return text.replace('\\', '\\e')
+
+
+def protect(line):
+    """Protect a text line which would be taken for a control line."""
+    if line[:1] in ('.', "'"):
+        return '\\&' + line
+    return line
+
+
+def escape_name(text):
+    """Escape roff control characters in command and option names."""
+    return escape(text).replace('-', '\\-')
+
+
+def bold(text):
+    """Make roff text bold."""
+    return "\\fB{text}\\fR".format(text=text)
+
+
+class RoffMarkup(Markup):
+    """Docstring markup processor producing roff text."""
+
+    bold = staticmethod(bold)
+    escape = staticmethod(escape)
+
+
+class ManWriter:
+    """Man page composer for handlers and commands."""
+
+    def __init__(self, markup=RoffMarkup, section='1', version=''):
+        self._markup = markup
+        self._section = section
+        self._version = version
+
+    def document_handler(self, handler, full_name=None):
+        full_name = full_name or [handler.name]
+        lines = list()
+        lines.extend(self.title(full_name))
+        lines.extend(self.name_section(handler, full_name))
+        lines.extend(self.commands_section(handler, full_name))
+        lines.extend(self.description_section(handler))
+        lines.extend(self.options_section(handler))
+        return self.compose(lines)
+
+    def document_command(self, command, full_name=None):
+        full_name = full_name or [command.name]
+        lines = list()
+        lines.extend(self.title(full_name))
+        lines.extend(self.name_section(command, full_name))
+        lines.extend(self.synopsis_section(command, full_name))
+        lines.extend(self.description_section(command))
+        lines.extend(self.options_section(command))
+        return self.compose(lines)
+
+    def title(self, full_name):
+        """Get title macro."""
+        title = escape_name('-'.join(full_name).upper())
+        source = escape_name("{name} {version}".format(name=full_name[0], version=self._version).strip())
+        manual = escape_name(' '.join(full_name))
+        yield '.TH "{title}" "{section}" "" "{source}" "{manual}"'.format(
+            title=title, section=self._section, source=source, manual=manual)
+
+    def name_section(self, element, full_name):
+        """Get name section."""
+        yield '.SH NAME'
+        name = escape_name('-'.join(full_name))
+        if element.brief:
+            yield "{name} \\- {brief}".format(name=name, brief=escape(element.brief))
+        else:
+            yield name
+
+    def synopsis_section(self, command, full_name):
+        """Get command synopsis section."""
+        synopsis = list()
+        synopsis.append(bold(escape_name(' '.join(full_name))))
+        if command.declared_options:
+            synopsis.append("[OPTIONS]")
+        for argument in command.signature.arguments:
+            pattern = HelpWriter.argument_pattern(argument)
+            synopsis.append(escape(pattern.format(name=argument.name)))
+        if command.signature.vararg is not None:
+            synopsis.append(escape("[{name} ... ]".format(name=command.signature.vararg.name)))
+        yield '.SH SYNOPSIS'
+        yield ' '.join(synopsis)
+
+    def commands_section(self, handler, full_name):
+        """Get summary for all defined commands."""
+        if not handler.declared_commands:
+            return
+        yield '.SH COMMANDS'
+        for name in sorted(handler.declared_commands.keys()):
+            command = handler.declared_commands[name]
+            yield '.TP'
+            yield bold(escape_name(command.name))
+            if command.brief:
+                yield protect(escape(command.brief))
+
+    def description_section(self, element):
+        """Get description section."""
+        if not element.descr:
+            return
+        yield '.SH DESCRIPTION'
+        for paragraph in self._paragraphs(element.descr):
+            yield '.PP'
+            yield paragraph
+
+    def options_section(self, element):
+        """Get options summary section."""
+        if not element.declared_options:
+            return
+        yield '.SH OPTIONS'
+        for name in sorted(element.declared_options.keys()):
+            option = element.declared_options[name]
+            yield '.TP'
+            yield self.option_synopsis(option)
+            paragraphs = self._paragraphs(HelpWriter.dedent(option.descr))
+            for index, paragraph in enumerate(paragraphs):
+                if index > 0:
+                    yield '.IP'
+                yield paragraph
+
+    def _paragraphs(self, text):
+        """Iterate over formatted non-empty paragraphs."""
+        for paragraph in self._markup.paragraphs(text):
+            paragraph = paragraph.strip()
+            if paragraph:
+                yield self.paragraph(paragraph)
+
+    @staticmethod
+    def option_synopsis(option):
+        """Get option synopsis."""
+        short, long = bold(escape_name('-' + option.short)), bold(escape_name('--' + option.name))
+        if option.type is bool:
+            return "{short}, {long}".format(short=short, long=long)
+        value_type = "\\fI<{type}>\\fR".format(type=escape(getattr(option.type, '__name__', str(option.type))))
+        return "{short} {type}, {long}={type}".format(short=short, long=long, type=value_type)
+
+    @staticmethod
+    def paragraph(text):
+        """Get paragraph lines keeping explicit line breaks."""
+        return '\n.br\n'.join(map(protect, text.split('\n')))
+
+    @staticmethod
+    def compose(lines):
+        """Compose man page from lines."""
+        return '\n'.join(lines) + '\n'
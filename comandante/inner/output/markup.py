@@ -18,34 +18,108 @@ def const(value):
     return lambda _: value
 
 
+def _paragraph_start(text):
+    """Get text which starts the next paragraph."""
+    return '|' if text.endswith('\\|') else ''
+
+
+_bold_escape = re.compile(r'\\([\\*])')
+
+
+def _bold_text(text):
+    """Get bold text content (escaped characters are the only markup inside)."""
+    text = text[1:-1]
+    if '\\' in text:
+        text = _bold_escape.sub(r'\1', text)
+    return text
+
+
 class Markup:
-    """Docstring markup processor."""
-
-    paragraph_break = re.compile(r'\n\s*?\n\s*', re.MULTILINE)
-
-    paragraph_format = TokenProcessor(
-        escaped_backslash=(r'\\\\', const('\\')),
-        escaped_asterisk=(r'\\\*', const('*')),
-        leading_pipe=(r'\n\|', const('\n')),
-        escaped_leading_pipe=(r'^\\\|', const('|')),
-        trailing_spaces=(r'\s+$', const('')),
-        new_line=(r'\n(?=[^|])', const(' ')),
-        bold_text=(
-            r'\*(?:[^*\\\n]|\\.)+\*',
-            lambda text: Ansi.bold(Markup.bold_format.process(text[1:-1]))
-        ),
-    )
+    """Docstring markup processor.
+
+    The whole docstring is processed in a single pass:
+    paragraph breaks are just another kind of token.
+    Trailing spaces are stripped from the text preceding
+    line ends (all line ends are tokens), so that no token
+    has to start at a space.
+
+    Subclasses may override `bold` and `escape` to target
+    other output formats.
+    """
+
+    PARAGRAPH_BREAK = 'paragraph_break'
+    BOLD_TEXT = 'bold_text'
+
+    # Make text bold
+    bold = staticmethod(Ansi.bold)
 
-    bold_format = TokenProcessor(
-        escaped_backslash=(r'\\\\', const('\\')),
-        escaped_asterisk=(r'\\\*', const('*')),
+    # Escape plain text (None to leave it as is)
+    escape = None
+
+    format = TokenProcessor(
+        ('escaped_backslash', r'\\\\', const('\\')),
+        ('escaped_asterisk', r'\\\*', const('*')),
+        (PARAGRAPH_BREAK, r'\n\s*?\n\s*(?:\\\|)?', _paragraph_start),
+        ('leading_pipe', r'\n\|', const('\n')),
+        ('escaped_leading_pipe', r'\n\\\|', const(' |')),
+        ('trailing_spaces', r'\n[^\S\n]*\Z', const('')),
+        ('new_line', r'\n(?=[^|])', const(' ')),
+        (BOLD_TEXT, r'\*(?:[^*\\\n]|\\.)+\*', _bold_text),
     )
 
-    @staticmethod
-    def paragraphs(text):
-        paragraphs = Markup.paragraph_break.split(text)
-        return map(Markup.paragraph_format.process, paragraphs)
+    # Tokens (and the end of text) preceded by the end of line
+    line_ends = frozenset((PARAGRAPH_BREAK, 'leading_pipe', 'escaped_leading_pipe',
+                           'trailing_spaces', 'new_line', None))
 
-    @staticmethod
-    def process(text, delimiter='\n\n'):
-        return delimiter.join(Markup.paragraphs(text))
+    @classmethod
+    def _tokens(cls, text):
+        """Iterate over (preceding text, token name, transformed token) triples."""
+        if text.startswith('\\|'):
+            yield '', 'escaped_leading_pipe', '|'
+            text = text[2:]
+        line_ends, bold, escape = cls.line_ends, cls.bold, cls.escape
+        for preceding, name, transformed in cls.format.tokens(text):
+            if name in line_ends:
+                preceding = preceding.rstrip()
+            if escape is not None:
+                preceding, transformed = escape(preceding), escape(transformed)
+            if name == cls.BOLD_TEXT:
+                transformed = bold(transformed)
+            yield preceding, name, transformed
+
+    @classmethod
+    def paragraphs(cls, text):
+        """Iterate over formatted paragraphs."""
+        paragraph = []
+        for preceding, name, transformed in cls._tokens(text):
+            paragraph.append(preceding)
+            if name == cls.PARAGRAPH_BREAK:
+                yield ''.join(paragraph)
+                paragraph = [transformed]
+            else:
+                paragraph.append(transformed)
+        yield ''.join(paragraph)
+
+    @classmethod
+    def process(cls, text, delimiter='\n\n'):
+        return delimiter.join(cls.paragraphs(text))
+
+    @classmethod
+    def write(cls, text, sink, delimiter='\n\n'):
+        """Write formatted text to the file-like sink (see `TokenProcessor.write`)."""
+        write = sink.write
+        for preceding, name, transformed in cls._tokens(text):
+            write(preceding)
+            if name == cls.PARAGRAPH_BREAK:
+                write(delimiter)
+            write(transformed)
+
+
+def _plain(text):
+    return text
+
+
+class PlainMarkup(Markup):
+    """Docstring markup processor producing plain text."""
+
+    bold = staticmethod(_plain)
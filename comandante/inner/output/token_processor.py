@@ -12,43 +12,59 @@ import re
 
 
 class TokenProcessor:
-    """Simple pattern-based text transformer."""
+    """Simple pattern-based text transformer.
 
-    def __init__(self, **tokens):
+    All token patterns are compiled into a single alternation,
+    so the text is transformed in one pass. Each alternative
+    is followed by an empty group named after the token, which
+    is how a match is dispatched to its rule (`lastgroup`).
+    Patterns starting with a literal character let the regex
+    engine skip plain text without trying every alternative.
+
+    Token patterns are tried in the declaration order: positional
+    (name, pattern, rule) triples first, then keyword tokens.
+    """
+
+    def __init__(self, *ordered_tokens, **tokens):
         self._rules = {}
         token_patterns = []
-        for name, definition in tokens.items():
-            pattern, rule = definition
-            token_patterns.append("(?P<{name}>{pattern})".format(name=name, pattern=pattern))
+        definitions = list(ordered_tokens)
+        definitions.extend((name, pattern, rule) for name, (pattern, rule) in tokens.items())
+        for name, pattern, rule in definitions:
+            token_patterns.append("(?:{pattern})(?P<{name}>)".format(name=name, pattern=pattern))
             self._rules[name] = rule
         self._pattern = re.compile('|'.join(token_patterns), re.MULTILINE)
 
-    @staticmethod
-    def _unpack(token):
-        """Get rule name and matched text."""
-        for name, matched_text in token.groupdict().items():
-            if matched_text is not None:
-                return name, matched_text
-        raise ValueError("Invalid token.")
-
     def _process_token(self, token):
         """Get token text transformed according the rules."""
-        name, matched_text = self._unpack(token)
-        if name not in self._rules:
-            raise RuntimeError("Undefined rule: {name}".format(name=name))
-        rule = self._rules[name]
-        return rule(matched_text)
+        return self._rules[token.lastgroup](token.group())
 
     def process(self, text):
         """Apply rules to the given text."""
+        return self._pattern.sub(self._process_token, text)
+
+    def tokens(self, text):
+        """Iterate over (preceding text, token name, transformed token) triples.
+
+        The last triple holds the text after the last token, its
+        token name is None and transformed token is empty.
+        """
+        rules = self._rules
         last_end = 0
-        chunks = []
         for token in self._pattern.finditer(text):
-            interval = text[last_end:token.start()]
-            chunk = self._process_token(token)
-            chunks.append(interval)
-            chunks.append(chunk)
+            name = token.lastgroup
+            yield text[last_end:token.start()], name, rules[name](token.group())
             last_end = token.end()
-        ending = text[last_end:]
-        chunks.append(ending)
-        return ''.join(chunks)
+        yield text[last_end:], None, ''
+
+    def write(self, text, sink):
+        """Apply rules to the given text writing result to the file-like sink.
+
+        Pieces are written as they are produced by the rules, so on
+        python 2 the sink must accept native strings (like files and
+        `print` do).
+        """
+        write = sink.write
+        for preceding, _, transformed in self.tokens(text):
+            write(preceding)
+            write(transformed)
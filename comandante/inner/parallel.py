@@ -0,0 +1,218 @@
+"""Process pool fan-out.
+
+Description:
+-----------
+
+This module runs a command for each var-arg item in a pool of
+worker processes (see `comandante.decorators.parallel`).
+
+Standard output of each item (including the failed ones) is
+captured by the worker and printed by the invoking process in
+the input order. Large
+binary results are passed back through shared memory instead
+of being pickled into the result pipe.
+"""
+
+import array
+import multiprocessing
+import multiprocessing.pool
+import sys
+
+from comandante.inner.model import _is_awaitable
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+try:
+    from StringIO import StringIO  # python 2 (accepts both native and unicode strings)
+except ImportError:
+    from io import StringIO
+
+# Wrapper passing an error with the traceback of the worker (python 3 only)
+_with_traceback = getattr(multiprocessing.pool, 'ExceptionWithTraceback', None)
+
+
+class SharedResult(object):
+    """Handle of a result stored in a shared memory block."""
+
+    __slots__ = ('name', 'size', 'kind', 'meta')
+
+    def __init__(self, name, size, kind, meta):
+        self.name = name
+        self.size = size
+        self.kind = kind
+        self.meta = meta
+
+    def __getstate__(self):
+        return self.name, self.size, self.kind, self.meta
+
+    def __setstate__(self, state):
+        self.name, self.size, self.kind, self.meta = state
+
+
+def _numpy_array(value):
+    numpy = sys.modules.get('numpy')
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+
+def share(value, threshold):
+    """Move large binary value into shared memory.
+
+    Supports bytes, bytearray, array.array and numpy arrays.
+
+    :return: `SharedResult` handle or the value itself if it is small or not binary
+    """
+    if shared_memory is None or threshold is None:
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        kind, meta, data = type(value).__name__, None, memoryview(value)
+    elif isinstance(value, array.array):
+        kind, meta, data = 'array', value.typecode, memoryview(value).cast('B')
+    elif _numpy_array(value) and value.flags.c_contiguous:
+        kind, meta, data = 'ndarray', (value.dtype.str, value.shape), memoryview(value).cast('B')
+    else:
+        return value
+    if data.nbytes < max(threshold, 1):
+        return value
+    block = shared_memory.SharedMemory(create=True, size=data.nbytes)
+    try:
+        block.buf[:data.nbytes] = data
+        return SharedResult(block.name, data.nbytes, kind, meta)
+    finally:
+        block.close()
+
+
+def restore(value):
+    """Get value back from shared memory (the block is released)."""
+    if not isinstance(value, SharedResult):
+        return value
+    block = shared_memory.SharedMemory(name=value.name)
+    try:
+        data = block.buf[:value.size]
+        if value.kind == 'bytes':
+            return bytes(data)
+        if value.kind == 'bytearray':
+            return bytearray(data)
+        if value.kind == 'array':
+            result = array.array(value.meta)
+            result.frombytes(data)
+            return result
+        import numpy
+        dtype, shape = value.meta
+        return numpy.frombuffer(data, dtype=dtype).reshape(shape).copy()
+    finally:
+        data.release()
+        block.close()
+        block.unlink()
+
+
+class Job(object):
+    """Command invocation for a single var-arg item (executed by workers)."""
+
+    def __init__(self, command, handler, fixed, options, threshold):
+        self.command = command
+        self.handler = handler
+        self.fixed = fixed
+        self.options = options
+        self.threshold = threshold
+
+    def __call__(self, item):
+        """Invoke command, get (result, captured output, error) tuple."""
+        stdout, output = sys.stdout, StringIO()
+        sys.stdout = output
+        try:
+            result = self.command._do_invoke(self.handler, self.fixed + (item,), self.options)
+            if _is_awaitable(result):
+                from comandante.inner.asynchronous import run
+                result = run(result)
+        except Exception as e:
+            # the error is returned with the output, keeping the worker traceback the way the pool does
+            error = e if _with_traceback is None else _with_traceback(e, e.__traceback__)
+            return None, output.getvalue(), error
+        finally:
+            sys.stdout = stdout
+        return share(result, self.threshold), output.getvalue(), None
+
+
+# Job of the current worker process and the event cancelling it
+_job = []
+
+
+def _initialize(job, cancelled):
+    _job.extend((job, cancelled))
+
+
+def _work(item):
+    job, cancelled = _job
+    if cancelled.is_set():
+        return None
+    return job(item)
+
+
+def _discard(outcome):
+    """Release shared memory of the outcome of an item which is not reported."""
+    if outcome is not None:
+        restore(outcome[0])
+
+
+def _context():
+    """Get multiprocessing context (fork is preferred, so that handlers are not pickled)."""
+    if not hasattr(multiprocessing, 'get_all_start_methods'):  # python 2 always forks on POSIX
+        return multiprocessing
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+def run(job, items, workers, chunksize, fail_fast):
+    """Run job for each item in a pool of worker processes.
+
+    Results are collected in the input order, captured output
+    is printed as soon as all the preceding items are done.
+    On `fail_fast` the remaining items are cancelled and the results
+    already produced are discarded (see `_discard`), so that none of
+    the shared memory blocks is left behind.
+
+    :param job: `Job` to run
+    :param items: iterable of items
+    :param workers: number of processes (None for the number of CPUs)
+    :param chunksize: number of items sent to a worker at once
+    :param fail_fast: stop on the first error, otherwise run all items and raise the first error
+    :return: list of results
+    """
+    results, error = [], None
+    if shared_memory is not None and job.threshold is not None:
+        # workers have to share the tracker of the shared memory blocks released by this process
+        from multiprocessing import resource_tracker
+        resource_tracker.ensure_running()
+    context = _context()
+    cancelled = context.Event()
+    pool = context.Pool(workers, initializer=_initialize, initargs=(job, cancelled))
+    try:
+        outcomes = pool.imap(_work, items, chunksize)
+        while True:
+            try:
+                outcome = next(outcomes)
+            except StopIteration:
+                break
+            except Exception as e:  # the outcome cannot be passed back
+                outcome = None, '', e
+            if cancelled.is_set():
+                _discard(outcome)
+                continue
+            result, output, failure = outcome
+            sys.stdout.write(output)
+            if failure is None:
+                results.append(restore(result))
+                continue
+            error = error or failure
+            if fail_fast:
+                cancelled.set()
+    finally:
+        pool.terminate()
+        pool.join()
+    if error is not None:
+        raise error
+    return results
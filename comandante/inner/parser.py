@@ -8,15 +8,19 @@ for reading and interpreting command-line arguments according
 to the command line description in terms of domain model.
 """
 
-import sys
-from collections import deque
+import itertools
+import operator
 
 import comandante.errors as error
+from comandante.inner.helpers import _map, _zip, getname
+from comandante.types import Stream
 
-if sys.version_info > (3, 0):
-    from itertools import zip_longest
-else:
-    from itertools import izip_longest as zip_longest
+
+def _remember(values, last):
+    """Iterate over values keeping the last one in the `last` list."""
+    for value in values:
+        last[0] = value
+        yield value
 
 
 class Parser:
@@ -25,6 +29,11 @@ class Parser:
     The sole responsibility of the `Parser` is to take a command
     domain model in terms of options and arguments and then
     interpret command-line arguments accordingly.
+
+    Parser is a compiled parse plan: value converters and the
+    option lookup table are resolved once at construction time,
+    so the same instance may be reused to parse any number of
+    command lines as long as the command model doesn't change.
     """
 
     def __init__(self, signature, declared_options):
@@ -34,10 +43,35 @@ class Parser:
         :param declared_options: declared options
         """
         self._signature = signature
-        self._long_options, self._short_options = {}, {}
+        self._options = {}
         for option in declared_options:
-            self._long_options[option.name] = option
-            self._short_options[option.short] = option
+            entry = (option, self._get_option_parser(option))
+            self._options['--' + option.name] = entry
+            self._options['-' + option.short] = entry
+        arguments = tuple(signature.arguments)
+        self._stream = None
+        if arguments and isinstance(arguments[-1].type, Stream):
+            arguments, self._stream = arguments[:-1], arguments[-1]
+        self._arguments = tuple((argument, self._get_argument_parser(argument)) for argument in arguments)
+        self._vararg = self._vararg_bulk = None
+        if signature.vararg is not None:
+            self._vararg = self._get_argument_parser(signature.vararg)
+            self._vararg_bulk = getattr(signature.vararg.type, 'bulk', None)
+
+    def instrument(self, wrap):
+        """Wrap all value converters of the parser (in place).
+
+        Used by profiling (on a copy of the parser) to account
+        the time spent on type conversion.
+
+        :param wrap: function taking a converter and returning its replacement
+        """
+        self._options = dict((key, (option, parser and wrap(parser))) for key, (option, parser) in self._options.items())
+        self._arguments = tuple((argument, wrap(parse)) for argument, parse in self._arguments)
+        if self._vararg is not None:
+            self._vararg = wrap(self._vararg)
+        if self._vararg_bulk is not None:
+            self._vararg_bulk = wrap(self._vararg_bulk)
 
     @staticmethod
     def more_options(cli_arguments):
@@ -47,97 +81,243 @@ class Parser:
     def parse(self, cli_arguments):
         """Parse command line arguments.
 
+        Command line arguments may be given as a list, a tuple or
+        any other iterable. In the latter case only the options and
+        the leading positional arguments are read up front, the tail
+        is consumed incrementally (lazily in case of a stream argument).
+
         :param cli_arguments: raw command line arguments sequence
 
         :return: (options, arguments) tuple
         """
-        cli_arguments = self._make_deque(cli_arguments)
-        options = self._parse_options(cli_arguments)
-        arguments = self._parse_arguments(cli_arguments)
+        tail = ()
+        if not isinstance(cli_arguments, (list, tuple)):
+            cli_arguments, tail = self._read_head(iter(cli_arguments))
+        options, cli_arguments, position = self._parse_options(cli_arguments)
+        arguments = self._parse_arguments(cli_arguments, position, tail)
         return options, arguments
 
+    def diagnose(self, cli_arguments, position=0):
+        """Find all syntax errors of the command line.
+
+        Unlike `parse`, doesn't stop at the first error: unknown
+        options are skipped, invalid values are reported and the
+        rest of the command line is checked (including stream values).
+
+        :param cli_arguments: raw command line arguments sequence
+        :param position: position of the first argument in the whole command line
+        :return: list of `comandante.errors.Diagnostic`
+        """
+        found = []
+        tokens = list(cli_arguments)
+        positions = list(range(position, position + len(tokens)))
+        end = position + len(tokens)
+        specified = set()
+        index = 0
+        while index < len(tokens) and tokens[index].startswith('-'):
+            token, at = tokens[index], positions[index]
+            index += 1
+            key, value = token, None
+            if token.startswith('--'):
+                key, value = self._parse_long_option(token)
+            if key not in self._options:
+                found.append(error.Diagnostic(error.UnknownOption(token), at, token, self._option_names()))
+                continue
+            option, parser = self._options[key]
+            if option.name in specified:
+                found.append(error.Diagnostic(error.DuplicateOption(option.name), at, token))
+            specified.add(option.name)
+            if parser is None:
+                if value is not None:
+                    # inline value of a bool option is interpreted as the next cli-argument
+                    tokens.insert(index, value)
+                    positions.insert(index, at)
+                continue
+            if value is None:
+                if index == len(tokens):
+                    found.append(error.Diagnostic(error.MissingOptionValue(option), end, None, getname(option.type)))
+                    continue
+                value, at = tokens[index], positions[index]
+                index += 1
+            self._check(found, parser, option, value, at)
+        for argument, parse in self._arguments:
+            if index < len(tokens):
+                self._check(found, parse, argument, tokens[index], positions[index])
+                index += 1
+            elif argument.is_required():
+                missing = error.ArgumentMissing(argument)
+                found.append(error.Diagnostic(missing, end, None, '<{name}>'.format(name=argument.name)))
+        rest = zip(tokens[index:], positions[index:])
+        if self._stream is not None:
+            stream = self._stream
+            for value, at in rest:
+                try:
+                    stream.type.value_type(value)
+                except ValueError:
+                    invalid = error.InvalidArgumentValue(stream, value, at)
+                    found.append(error.Diagnostic(invalid, at, value, getname(stream.type.value_type)))
+        elif self._vararg_bulk is not None:
+            rest = list(rest)
+            try:
+                self._vararg_bulk([value for value, _ in rest])
+            except ValueError:
+                vararg = self._signature.vararg
+                for value, at in rest:
+                    try:
+                        self._vararg_bulk([value])
+                    except ValueError:
+                        invalid = error.InvalidArgumentValue(vararg, value, at)
+                        found.append(error.Diagnostic(invalid, at, value, getname(vararg.type)))
+        elif self._vararg is not None:
+            for value, at in rest:
+                self._check(found, self._vararg, self._signature.vararg, value, at)
+        elif index < len(tokens):
+            found.append(error.Diagnostic(error.TooManyArguments(), positions[index], tokens[index]))
+        return found
+
     @staticmethod
-    def _make_deque(cli_arguments):
-        if not isinstance(cli_arguments, deque):
-            return deque(cli_arguments)
-        return cli_arguments
+    def _check(found, parse, parameter, value, position):
+        """Convert option or argument value, collect diagnostic if the value is invalid."""
+        try:
+            parse(value)
+        except error.CliSyntaxException as e:
+            found.append(error.Diagnostic(e, position, value, getname(parameter.type)))
+
+    def _option_names(self):
+        """Get description of the accepted options."""
+        return '|'.join(sorted(set('--' + option.name for option, _ in self._options.values())))
+
+    def _read_head(self, tokens):
+        """Read options and leading positional arguments from the iterator.
+
+        :param tokens: iterator over raw command-line arguments
+        :return: (head list, remaining tokens iterator) tuple
+        """
+        head = []
+        needed = len(self._arguments)
+        token = next(tokens, None)
+        while token is not None and token.startswith('-'):
+            head.append(token)
+            key, value = token, None
+            if token.startswith('--'):
+                key, value = self._parse_long_option(token)
+            option, parser = self._options.get(key, (None, None))
+            if option is not None and parser is not None and value is None:
+                value = next(tokens, None)
+                if value is not None:
+                    head.append(value)
+            elif option is not None and parser is None and value is not None:
+                needed -= 1
+            token = next(tokens, None)
+        while token is not None and needed > 0:
+            head.append(token)
+            needed -= 1
+            token = next(tokens, None)
+        if token is not None:
+            tokens = itertools.chain((token,), tokens)
+        return head, tokens
 
     @staticmethod
     def _parse_long_option(equation):
         if '=' not in equation:
-            return equation[2:], None
-        return equation[2:].split('=', 1)
+            return equation, None
+        return equation.split('=', 1)
 
     def _parse_options(self, cli_arguments):
         """Parse options.
 
-        :param cli_arguments: a list containing raw command-line arguments
-        :return: a dict containing option values and remaining command-line arguments
+        :param cli_arguments: a sequence containing raw command-line arguments
+        :return: (option values, cli-arguments, position of the first argument) tuple
         """
         options = {}
-        while self.more_options(cli_arguments):
-            name, value = self._parse_option(cli_arguments)
-            if name in options:
-                raise error.DuplicateOption(name)
-            options[name] = value
-
-        return options
-
-    def _parse_option(self, cli_arguments):
-        """Parse a single option from the remaining raw command-line arguments"""
-        option = self._get_option(cli_arguments)
-        parser = self._get_option_parser(option)
-        value = parser(cli_arguments)
-        return option.name, value
-
-    def _get_option(self, cli_arguments):
-        """Get option given the remaining cli-arguments."""
-        if not cli_arguments:
-            raise RuntimeError('Empty CLI arguments')
-        if not self.more_options(cli_arguments):
-            raise RuntimeError("CLI arguments doesn't contain options")
-
-        first = cli_arguments.popleft()
-        if first.startswith('--'):
-            name, value = self._parse_long_option(first)
-            if name not in self._long_options:
-                raise error.UnknownOption(first)
-            if value is not None:
-                cli_arguments.appendleft(value)
-            return self._long_options[name]
-        elif first.startswith('-'):
-            name = first[1:]
-            if name not in self._short_options:
-                raise error.UnknownOption(first)
-            return self._short_options[name]
-        else:
-            RuntimeError("Expected CLI-option name")
-
-    def _parse_arguments(self, cli_arguments):
-        """Parse raw command-line argument values."""
-
+        position, count = 0, len(cli_arguments)
+        while position < count and cli_arguments[position].startswith('-'):
+            token = cli_arguments[position]
+            position += 1
+            key, value = token, None
+            if token.startswith('--'):
+                key, value = self._parse_long_option(token)
+            if key not in self._options:
+                raise error.UnknownOption(token)
+            option, parser = self._options[key]
+            if option.name in options:
+                raise error.DuplicateOption(option.name)
+            if parser is None:
+                options[option.name] = True
+                if value is not None:
+                    # inline value of a bool option is interpreted as the next cli-argument
+                    cli_arguments = [value] + list(cli_arguments[position:])
+                    position, count = 0, len(cli_arguments)
+                continue
+            if value is None:
+                if position == count:
+                    raise error.MissingOptionValue(option)
+                value = cli_arguments[position]
+                position += 1
+            options[option.name] = parser(value)
+        return options, cli_arguments, position
+
+    def _parse_arguments(self, cli_arguments, position=0, tail=()):
+        """Parse raw command-line argument values starting from the given position.
+
+        :param cli_arguments: a sequence containing raw command-line arguments
+        :param position: position of the first argument in the sequence
+        :param tail: iterable over the arguments following the sequence
+        :return: a list of argument values
+        """
         values = []
-        for argument, value in zip_longest(self._signature.arguments, cli_arguments):
-            argument = argument or self._signature.vararg
-            if argument is None:
-                raise error.TooManyArguments()
-            if argument.is_required() and value is None:
+        count = len(cli_arguments)
+        for argument, parse in self._arguments:
+            if position < count:
+                values.append(parse(cli_arguments[position]))
+                position += 1
+            elif argument.is_required():
                 raise error.ArgumentMissing(argument)
-            if not argument.is_required() and value is None:
+            else:
                 values.append(argument.default)
-                continue
-            parse = self._get_argument_parser(argument)
+        if self._stream is not None:
+            remaining = itertools.chain(itertools.islice(cli_arguments, position, None), tail)
+            values.append(ArgumentStream(self._stream, remaining, position))
+            return values
+        parse = self._vararg
+        if parse is None:
+            if position < count or next(iter(tail), None) is not None:
+                raise error.TooManyArguments()
+            return values
+        if self._vararg_bulk is not None:
+            values.append(self._convert_bulk(cli_arguments, position, tail))
+            return values
+        for index in range(position, count):
+            values.append(parse(cli_arguments[index]))
+        for value in tail:
             values.append(parse(value))
         return values
 
+    def _convert_bulk(self, cli_arguments, position, tail):
+        """Convert all the var-arg values at once into a single array.
+
+        Values are fed to the array without collecting them first,
+        the position of an invalid value is tracked by a counter.
+        """
+        last = [None]
+        counter = itertools.count(position)
+        values = itertools.chain(itertools.islice(cli_arguments, position, None), _remember(tail, last))
+        try:
+            return self._vararg_bulk(_map(operator.itemgetter(1), _zip(counter, values)))
+        except ValueError:
+            index = next(counter) - 1
+            value = cli_arguments[index] if index < len(cli_arguments) else last[0]
+            raise error.InvalidArgumentValue(self._signature.vararg, value, index)
+
     @staticmethod
     def _make_generic_argument_parser(argument):
         """Generic argument parser factory."""
+        argument_type = argument.type
 
         def parser(value):
             """Generic argument parser."""
             try:
-                return argument.type(value)
+                return argument_type(value)
             except ValueError:
                 raise error.InvalidArgumentValue(argument, value)
 
@@ -146,14 +326,16 @@ class Parser:
     @staticmethod
     def _make_bool_argument_parser(argument):
         """Bool argument parser factory."""
+        name = argument.name
 
         def parser(value):
             """Bool argument parser."""
-            if value == argument.name:
+            if value == name:
                 return True
-            if value.lower() == 'true':
+            lower = value.lower()
+            if lower == 'true':
                 return True
-            if value.lower() == 'false':
+            if lower == 'false':
                 return False
             raise error.InvalidArgumentValue(argument, value)
 
@@ -166,22 +348,15 @@ class Parser:
             return Parser._make_bool_argument_parser(argument)
         return Parser._make_generic_argument_parser(argument)
 
-    @staticmethod
-    def _bool_option_parser(_):
-        """Bool option parser factory."""
-        return True
-
     @staticmethod
     def _make_generic_option_parser(option):
         """Generic option parser factory."""
+        option_type = option.type
 
-        def parser(cli_arguments):
+        def parser(raw_value):
             """Generic option parser."""
-            if not cli_arguments:
-                raise error.MissingOptionValue(option)
-            raw_value = cli_arguments.popleft()
             try:
-                return option.type(raw_value)
+                return option_type(raw_value)
             except ValueError:
                 raise error.InvalidOptionValue(option, raw_value)
 
@@ -189,7 +364,43 @@ class Parser:
 
     @staticmethod
     def _get_option_parser(option):
-        """Get option value parser."""
+        """Get option value parser (None for bool options which don't take values)."""
         if option.type is bool:
-            return Parser._bool_option_parser
+            return None
         return Parser._make_generic_option_parser(option)
+
+
+class ArgumentStream(object):
+    """Lazy iterator over the remaining command-line arguments.
+
+    Each value is converted only when consumed. Invalid values
+    are reported at that moment along with their position
+    among the command-line arguments.
+    """
+
+    def __init__(self, argument, cli_arguments, position):
+        """Initialize instance.
+
+        :param argument: stream argument descriptor
+        :param cli_arguments: iterator over the remaining raw command-line arguments
+        :param position: position of the first stream value
+        """
+        self._argument = argument
+        self._convert = argument.type.value_type
+        self._cli_arguments = cli_arguments
+        self._position = position
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        """Get the next converted value."""
+        value = next(self._cli_arguments)
+        position = self._position
+        self._position = position + 1
+        try:
+            return self._convert(value)
+        except ValueError:
+            raise error.InvalidArgumentValue(self._argument, value, position)
+
+    next = __next__
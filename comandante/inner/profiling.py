@@ -0,0 +1,501 @@
+"""Invocation profiling.
+
+Description:
+-----------
+
+This module profiles invocations of a cli-handler phase by phase
+(see `Handler.enable_profiling`):
+
+ * resolve - looking up the command (including lazy imports)
+ * parse   - parsing options and arguments
+ * convert - converting values by argument and option types
+ * help    - rendering help
+ * command - running the command body
+
+Phases are exclusive: time spent in a nested phase (e.g. type
+conversion while parsing) is not accounted in the outer one.
+
+Memory profiling (tracemalloc) records peak traced memory of each
+phase and the top allocation sites of each outer phase (allocations
+made by type conversion are attributed to parsing).
+
+The profiled invocation looks up the command the same way as
+`Handler.invoke` does (see `comandante.handler.resolve`) and times
+the phases around it, so that handlers which don't use profiling
+pay nothing for it.
+"""
+
+from __future__ import print_function
+
+import copy
+import fnmatch
+import itertools
+import json
+import sys
+import time
+
+from comandante.errors import CliSyntaxException
+from comandante.handler import Handler, overrides_invoke, resolve
+from comandante.inner.bind import BoundCommand
+from comandante.inner.helpers import has_help_files
+
+# Monotonic clock
+_clock = getattr(time, 'perf_counter', time.time)
+
+# Profiled phases in the order of reporting
+PHASES = ('import', 'construct', 'resolve', 'parse', 'convert', 'help', 'command')
+
+# Number of allocation sites per phase in the text report
+TEXT_SITES = 3
+
+
+class Probe(object):
+    """Measurement taken by a profile.
+
+    Probe is notified whenever the current phase changes: `switch`
+    gets the phase which has just been interrupted or finished
+    (None before the first phase), `enter` gets the phase which
+    is current from now on.
+    """
+
+    # Key of the probe measurements in the report
+    name = None
+
+    def start(self):
+        """Start measuring."""
+
+    def switch(self, phase):
+        """Account measurements since the previous switch to the phase."""
+
+    def enter(self, phase):
+        """Phase becomes current."""
+
+    def stop(self):
+        """Stop measuring."""
+
+    def report(self, phases):
+        """Get JSON-serializable measurements of the given phases."""
+
+
+class TimeProbe(Probe):
+    """Accounts wall-clock time of each phase (in seconds)."""
+
+    name = 'time'
+
+    def __init__(self):
+        self.times = {}
+        self._last = None
+
+    def start(self):
+        self._last = _clock()
+
+    def switch(self, phase):
+        now = _clock()
+        self.times[phase] = self.times.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def report(self, phases):
+        return dict((phase, self.times.get(phase, 0.0)) for phase in phases)
+
+
+class CProfileProbe(Probe):
+    """Profiles the command body with cProfile and dumps the statistics."""
+
+    name = 'cprofile'
+
+    def __init__(self, path, phase='command'):
+        import cProfile
+        self.path = path
+        self.phase = phase
+        self._profiler = cProfile.Profile()
+
+    def switch(self, phase):
+        self._profiler.disable()
+
+    def enter(self, phase):
+        if phase == self.phase:
+            self._profiler.enable()
+
+    def stop(self):
+        self._profiler.disable()
+        self._profiler.dump_stats(self.path)
+
+    def report(self, phases):
+        return self.path
+
+
+class MemoryProbe(Probe):
+    """Traces memory allocations with tracemalloc.
+
+    For each phase reports peak traced memory (in bytes) and the top
+    sites which allocated memory still in use when the phase ended.
+    Snapshots taken at the end of each phase may be dumped to files
+    `<path>.<phase>.snapshot` to be compared between runs (see
+    `tracemalloc.Snapshot.load` and `Snapshot.compare_to`).
+    """
+
+    name = 'memory'
+
+    # Phases whose allocation sites are attributed to the enclosing phase
+    nested = ('convert',)
+
+    def __init__(self, top=10, snapshot_path=None):
+        import tracemalloc
+        self._tracemalloc = tracemalloc
+        self._filters = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+        self.top = top
+        self.snapshot_path = snapshot_path
+        self.peaks = {}
+        self.sites = {}
+        self.snapshots = {}
+        self._snapshot = None
+        self._left = None
+        self._started = False
+
+    def start(self):
+        self._started = not self._tracemalloc.is_tracing()
+        if self._started:
+            self._tracemalloc.start()
+        for trace_filter in self._filters:
+            # compile the patterns now, so that they don't show up in the first phase
+            fnmatch.fnmatch(trace_filter.filename_pattern, trace_filter.filename_pattern)
+        self._snapshot = self._take_snapshot()
+        self._reset_peak()
+
+    def switch(self, phase):
+        if phase is None:
+            return
+        peak = self._tracemalloc.get_traced_memory()[1]
+        self.peaks[phase] = max(self.peaks.get(phase, 0), peak)
+        self._left = phase
+        self._reset_peak()
+
+    def enter(self, phase):
+        if phase not in self.nested and self._left not in self.nested:
+            self._account()
+
+    def stop(self):
+        self._account()
+        if self._started:
+            self._tracemalloc.stop()
+
+    def _reset_peak(self):
+        reset_peak = getattr(self._tracemalloc, 'reset_peak', None)  # Python 3.9+
+        if reset_peak is not None:
+            reset_peak()
+
+    def _take_snapshot(self):
+        return self._tracemalloc.take_snapshot().filter_traces(self._filters)
+
+    def _account(self):
+        """Attribute allocations since the previous snapshot to the phase left."""
+        phase, self._left = self._left, None
+        if phase is None:
+            return
+        snapshot = self._take_snapshot()
+        sites = self.sites.setdefault(phase, {})
+        for statistic in snapshot.compare_to(self._snapshot, 'lineno'):
+            if statistic.size_diff > 0:
+                frame = statistic.traceback[0]
+                site = '{file}:{line}'.format(file=frame.filename, line=frame.lineno)
+                size, count = sites.get(site, (0, 0))
+                sites[site] = (size + statistic.size_diff, count + max(statistic.count_diff, 0))
+        if self.snapshot_path is not None:
+            path = '{base}.{phase}.snapshot'.format(base=self.snapshot_path[:-len('.snapshot')], phase=phase)
+            snapshot.dump(path)
+            self.snapshots[phase] = path
+        self._snapshot = snapshot
+
+    def report(self, phases):
+        report = {}
+        for phase in phases:
+            sites = sorted(self.sites.get(phase, {}).items(), key=lambda item: -item[1][0])[:self.top]
+            report[phase] = {
+                'peak': self.peaks.get(phase, 0),
+                'sites': [{'site': site, 'size': size, 'count': count} for site, (size, count) in sites],
+            }
+            if phase in self.snapshots:
+                report[phase]['snapshot'] = self.snapshots[phase]
+        return report
+
+
+class Profile(object):
+    """Stack of nested phases reporting phase switches to probes."""
+
+    def __init__(self, probes):
+        self.probes = list(probes)
+        self.phases = []
+        self.command = ()
+        self.total = 0.0
+        self._stack = []
+        self._start = None
+
+    def start(self):
+        self._start = _clock()
+        for probe in self.probes:
+            probe.start()
+
+    def stop(self):
+        self.total = _clock() - self._start
+        for probe in self.probes:
+            probe.stop()
+
+    def enter(self, phase):
+        """Enter a (possibly nested) phase."""
+        if self._stack:
+            self._switch(self._stack[-1])
+        else:
+            self._switch(None)
+        self._stack.append(phase)
+        if phase not in self.phases:
+            self.phases.append(phase)
+        self._enter(phase)
+
+    def exit(self):
+        """Exit the current phase."""
+        self._switch(self._stack.pop())
+        if self._stack:
+            self._enter(self._stack[-1])
+
+    def _switch(self, phase):
+        for probe in self.probes:
+            probe.switch(phase)
+
+    def _enter(self, phase):
+        for probe in self.probes:
+            probe.enter(phase)
+
+    def phase(self, name):
+        """Get context manager profiling the phase."""
+        return _Phase(self, name)
+
+    def wrap(self, name):
+        """Get decorator profiling each call of the function as the phase."""
+
+        def decorator(func):
+            def wrapper(*args, **kwargs):
+                self.enter(name)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.exit()
+
+            return wrapper
+
+        return decorator
+
+    def report(self):
+        """Get report as a JSON-serializable dict."""
+        phases = sorted(self.phases, key=lambda phase: PHASES.index(phase) if phase in PHASES else len(PHASES))
+        report = {'command': list(self.command), 'total': self.total, 'phases': phases}
+        for probe in self.probes:
+            report[probe.name] = probe.report(phases)
+        return report
+
+
+class _Phase(object):
+    """Context manager profiling a phase."""
+
+    __slots__ = ('_profile', '_name')
+
+    def __init__(self, profile, name):
+        self._profile = profile
+        self._name = name
+
+    def __enter__(self):
+        self._profile.enter(self._name)
+
+    def __exit__(self, *exc_info):
+        self._profile.exit()
+
+
+def format_report(report):
+    """Format report as a human-readable text."""
+    lines = ["Profile of '{command}':".format(command=' '.join(report['command']))]
+    total = report['total'] or 1e-12
+    times = report.get('time', {})
+    for phase in report['phases']:
+        seconds = times.get(phase, 0.0)
+        lines.append("  {phase:<10} {time:10.3f} ms {share:6.1f}%".format(
+            phase=phase, time=seconds * 1000.0, share=100.0 * seconds / total))
+    lines.append("  {phase:<10} {time:10.3f} ms".format(phase='total', time=report['total'] * 1000.0))
+    memory = report.get('memory')
+    if memory is not None:
+        lines.append("  memory:")
+        for phase in report['phases']:
+            lines.append("  {phase:<10} {peak:10.1f} KiB peak".format(phase=phase, peak=memory[phase]['peak'] / 1024.0))
+            for site in memory[phase]['sites'][:TEXT_SITES]:
+                lines.append("    {size:10.1f} KiB {count:7} blocks  {site}".format(
+                    size=site['size'] / 1024.0, count=site['count'], site=site['site']))
+    if 'cprofile' in report:
+        lines.append("  command body statistics: {path}".format(path=report['cprofile']))
+    return '\n'.join(lines)
+
+
+class Settings(object):
+    """Profiling settings parsed from the profile option value.
+
+    The value is a comma-separated list of:
+
+     * `text` - print human-readable report to stderr (the default)
+     * `json` - print JSON report to stderr
+     * `<path>.json` - write JSON report to the file
+     * `<path>.pstats` - profile the command body with cProfile
+       and dump the statistics to the file
+     * `memory` - trace memory allocations with tracemalloc
+     * `<path>.snapshot` - trace memory allocations and dump the
+       snapshot taken at the end of each phase to `<path>.<phase>.snapshot`
+    """
+
+    def __init__(self, value=None):
+        self.json = False
+        self.json_path = None
+        self.pstats_path = None
+        self.text = False
+        self.memory = False
+        self.snapshot_path = None
+        for item in (value or '').split(','):
+            if item == 'json':
+                self.json = True
+            elif item.endswith('.json'):
+                self.json_path = item
+            elif item.endswith('.pstats'):
+                self.pstats_path = item
+            elif item == 'memory':
+                self.memory = True
+            elif item.endswith('.snapshot'):
+                self.memory = True
+                self.snapshot_path = item
+            elif item in ('', 'text'):
+                self.text = True
+            else:
+                raise CliSyntaxException("Invalid profile option value: '{value}'".format(value=item))
+        if not self.json and not self.json_path:
+            self.text = True
+
+    def probes(self):
+        """Create probes requested by the settings."""
+        probes = [TimeProbe()]
+        if self.pstats_path is not None:
+            probes.append(CProfileProbe(self.pstats_path))
+        if self.memory:
+            probes.append(MemoryProbe(snapshot_path=self.snapshot_path))
+        return probes
+
+    def emit(self, report, stream=None):
+        """Emit report as requested by the settings."""
+        stream = stream or sys.stderr
+        if self.text:
+            print(format_report(report), file=stream)
+        if self.json:
+            print(json.dumps(report, sort_keys=True), file=stream)
+        if self.json_path is not None:
+            with open(self.json_path, 'w') as file:
+                json.dump(report, file, sort_keys=True, indent=2)
+
+
+def invoke(handler, argv, profile, context=(), convert=True):
+    """Invoke handler the same way as `Handler.invoke` does, profiling each phase.
+
+    :param handler: cli-handler
+    :param argv: raw command-line arguments
+    :param profile: started profile
+    :param context: command context
+    :param convert: account type conversion separately (instruments a copy of the parser)
+    """
+    if overrides_invoke(type(handler)):
+        # the handler dispatches on its own: profile it as a whole
+        with profile.phase('command'):
+            return type(handler).invoke(handler, argv, context)
+    is_root = not context
+    with profile.phase('resolve'):
+        element, argv, context, error = resolve(handler, argv, context)
+    profile.command = context
+    if error is not None:
+        print(error)
+        with profile.phase('help'):
+            element.help()
+        raise error
+    if argv is None:
+        with profile.phase('help'):
+            return element.help()
+    if not isinstance(element, BoundCommand):
+        # nested handler with its own invoke (or unknown kind of element): profile it as a whole
+        with profile.phase('command'):
+            return element.invoke(argv, context)
+    with profile.phase('parse'):
+        try:
+            parser = None
+            if convert:
+                parser = copy.copy(element.parser)
+                parser.instrument(profile.wrap('convert'))
+            execute = element.command._prepare(element, element.handler, argv, parser)
+        except CliSyntaxException as e:
+            print(e)
+            with profile.phase('help'):
+                if is_root and has_help_files(handler.name):
+                    context = (handler.name,) + context
+                print(element.full_doc(full_name=context))
+            raise
+    with profile.phase('command'):
+        return execute()
+
+
+def profiled(handler, argv, settings, context=(), profile=None):
+    """Invoke handler profiling each phase, emit report.
+
+    :param handler: cli-handler
+    :param argv: raw command-line arguments
+    :param settings: profiling `Settings`
+    :param context: command context
+    :param profile: already started profile (e.g. with import and construction phases)
+    """
+    if profile is None:
+        profile = Profile(settings.probes())
+        profile.start()
+    try:
+        return invoke(handler, argv, profile, context)
+    finally:
+        profile.stop()
+        settings.emit(profile.report())
+
+
+class ProfilingInvoke(object):
+    """Replacement of `Handler.invoke` used by profiling and recording.
+
+    When the first command-line argument is the profile option
+    (`--profile` or `--profile=<value>`), the invocation is profiled
+    and the report is emitted according to the option value (see
+    `Settings`). Otherwise the invocation is recorded if recording
+    is enabled (see `comandante.inner.recording`) or the handler is
+    invoked as usual.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.option = self.prefix = None
+        self.recorder = None
+
+    @classmethod
+    def of(cls, handler):
+        """Get the invoke replacement of the handler (installed on the first call)."""
+        invoke = vars(handler).get('invoke')
+        if not isinstance(invoke, cls):
+            invoke = handler.invoke = cls(handler)
+        return invoke
+
+    def enable_option(self, option):
+        """Recognize the profile option with the given name."""
+        self.option = '--' + option
+        self.prefix = self.option + '='
+
+    def __call__(self, argv, context=()):
+        first, rest = Handler._split_command(argv)
+        if first is not None and self.option is not None and (first == self.option or first.startswith(self.prefix)):
+            settings = Settings(first[len(self.prefix):] if first.startswith(self.prefix) else None)
+            return profiled(self.handler, rest, settings, context)
+        if first is not None and not isinstance(argv, (list, tuple)):
+            argv = itertools.chain((first,), rest)
+        if self.recorder is not None:
+            return self.recorder.invoke(self.handler, argv, context)
+        return type(self.handler).invoke(self.handler, argv, context)
@@ -6,23 +6,11 @@ Description:
 This module provides a generic python
 object proxy class.
 """
-from comandante.inner.helpers import getname
 
 
 class Proxy(object):
     """Generic python object proxy."""
 
-    def _unsupport(self, *names):
-        for name in names:
-            pattern = "'{type}' does not support method '{name}'"
-            message = pattern.format(type=getname(type(self)), name=name)
-
-            def stub(*_args, **_kwargs):
-                raise TypeError(message)
-
-            stub.__name__ = name
-            self._set(name, stub)
-
     def _set(self, name, value):
         """Set attribute on the proxy itself."""
         object.__setattr__(self, name, value)
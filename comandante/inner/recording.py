@@ -0,0 +1,297 @@
+"""Invocation recording and replay.
+
+Description:
+-----------
+
+Recorder appends each invocation of a handler to a log file (see
+`Handler.enable_recording`), one JSON object per line:
+
+    {"argv": [...], "tail": 0, "time": {"resolve": 1.2e-05, ...}, "error": null}
+
+where `time` holds seconds spent in each phase of the invocation
+(see `comandante.inner.profiling`, type conversion is accounted as
+parsing) and `error` is the name of the exception raised by the
+invocation (including `SystemExit` and `KeyboardInterrupt`), if any.
+Only the first `RECORDED_ARGUMENTS` arguments are recorded, `tail`
+is the number of the following arguments consumed by the invocation
+(lazy arguments are counted as they are consumed, not collected).
+
+Replay pushes the recorded command lines through command lookup
+and parsing (without running commands or rendering help) and
+reports throughput and latency percentiles, so that parser changes
+may be evaluated against real workloads.
+"""
+
+from __future__ import print_function
+
+import itertools
+import json
+import math
+import operator
+import re
+
+from comandante.errors import CliSyntaxException
+from comandante.inner.bind import BoundCommand
+from comandante.inner.lazy import LazyElement
+from comandante.inner.helpers import _map, _zip
+from comandante.inner.parser import ArgumentStream
+from comandante.handler import resolve
+from comandante.inner.profiling import Profile, TimeProbe, _clock, invoke
+from comandante.types import Stream
+
+# Maximal number of recorded arguments of an invocation
+RECORDED_ARGUMENTS = 1000
+
+# Reported latency percentiles
+PERCENTILES = (0.5, 0.9, 0.99, 0.999)
+
+# Phases of the recorded invocations measured by replay
+REPLAYED_PHASES = ('resolve', 'parse', 'convert')
+
+# Words kept in masked numbers (exponent, infinity and not-a-number)
+_NUMBER_WORDS = ('e', 'inf', 'infinity', 'nan')
+
+_WORD = re.compile(r'[A-Za-z]+')
+
+
+def _choices(value_type):
+    """Get choice values of the argument type (including stream types)."""
+    choices = getattr(value_type, 'choices', None)
+    if choices is None:
+        choices = getattr(getattr(value_type, 'value_type', None), 'choices', ())
+    return choices
+
+
+def _mask(value):
+    """Mask letters and digits keeping the length and punctuation."""
+    return ''.join('1' if char.isdigit() else 'X' if char.isupper() else 'x' if char.isalpha() else char
+                   for char in value)
+
+
+def _mask_word(match):
+    word = match.group()
+    return word if word.lower() in _NUMBER_WORDS else 'x' * len(word)
+
+
+def _mask_number(value):
+    """Mask digits of a number so that it is parsed the same way.
+
+    Non-zero digits are replaced by ones (so the magnitude of the
+    number never grows), signs, exponents, `inf` and `nan` are kept,
+    other letters are masked (an invalid number stays invalid).
+    """
+    return _WORD.sub(_mask_word, ''.join('1' if char.isdigit() and char != '0' else char for char in value))
+
+
+def _mask_value(value, value_type):
+    """Mask value of an argument or option of the given type (None if unknown)."""
+    if value in _choices(value_type) or value.lower() in ('true', 'false'):
+        return value
+    if getattr(value_type, 'value_type', value_type) in (int, float):  # including streams and arrays
+        return _mask_number(value)
+    return _mask(value)
+
+
+def anonymize(element, argv):
+    """Mask values of the command-line arguments of the element.
+
+    Option names, command names, choice values and bool literals
+    are kept, everything else is masked according to the declared
+    type of the value (see `_mask_number` and `_mask`), so that the
+    masked command line is parsed the same way as the original one
+    (except for numbers out of the range of an array type).
+
+    :param element: invoked handler element
+    :param argv: command-line arguments of the element
+    """
+    commands = getattr(element, 'declared_commands', ())
+    options = {}
+    for option in element.declared_options.values():
+        options['--' + option.name] = options['-' + option.short] = option
+    signature = getattr(element, 'signature', None)
+    types, rest, flags = [], None, set()
+    if signature is not None:
+        types = [argument.type for argument in signature.arguments]
+        if types and isinstance(types[-1], Stream):
+            rest = types[-1]
+        elif signature.vararg is not None:
+            rest = signature.vararg.type
+        flags.update(argument.name for argument in signature.arguments if argument.type is bool)
+
+    def positional(token):
+        value_type = types[len(arguments)] if len(arguments) < len(types) else rest
+        arguments.append(token)
+        return token if token in flags or token in commands else _mask_value(token, value_type)
+
+    result, arguments, expected = [], [], None
+    for token in argv:
+        if expected is not None:  # value of the preceding option
+            result.append(_mask_value(token, expected.type))
+            expected = None
+        elif arguments or not token.startswith('-'):
+            result.append(positional(token))
+        else:
+            key, value = token, None
+            if token.startswith('--') and '=' in token:
+                key, value = token.split('=', 1)
+            option = options.get(key)
+            if option is None:
+                result.append(_mask(key) + ('' if value is None else '=' + _mask(value)))
+            elif value is None:
+                expected = None if option.type is bool else option
+                result.append(key)
+            elif option.type is bool:
+                # inline value of a bool option is interpreted as the next cli-argument
+                result.append(key + '=' + positional(value))
+            else:
+                result.append(key + '=' + _mask_value(value, option.type))
+    return result
+
+
+def _element(handler, names):
+    """Get handler element by command names."""
+    element = handler
+    for name in names:
+        element = element.declared_commands[name]
+        if isinstance(element, LazyElement):
+            element = element.target
+    return element
+
+
+class Recorder(object):
+    """Records invocations of a handler to a log file."""
+
+    def __init__(self, path, anonymize=True):
+        """Initialize instance.
+
+        :param path: log file path (records are appended)
+        :param anonymize: mask argument and option values
+        """
+        self.path = path
+        self.anonymize = anonymize
+
+    def invoke(self, handler, argv, context=()):
+        """Invoke handler the same way as `Handler.invoke` does, record the invocation."""
+        if isinstance(argv, (list, tuple)):
+            head, counter = list(argv[:RECORDED_ARGUMENTS]), itertools.count(len(argv) - RECORDED_ARGUMENTS)
+        else:
+            argv = iter(argv)
+            head, counter = list(itertools.islice(argv, RECORDED_ARGUMENTS)), itertools.count()
+            # count the rest of arguments as they are consumed
+            argv = itertools.chain(head, _map(operator.itemgetter(0), _zip(argv, counter)))
+        profile = Profile([TimeProbe()])
+        profile.start()
+        error = None
+        try:
+            return invoke(handler, argv, profile, context, convert=False)
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            profile.stop()
+            self.record(handler, head, max(next(counter), 0), context, profile, error)
+
+    def record(self, handler, argv, tail, context, profile, error):
+        """Append the invocation record to the log.
+
+        :param argv: recorded (leading) arguments
+        :param tail: number of the following arguments
+        """
+        names = list(profile.command[len(context):])
+        rest = argv[len(names):]
+        if self.anonymize:
+            rest = anonymize(_element(handler, names), rest)
+        times = profile.report()['time']
+        record = {
+            'argv': names + rest,
+            'tail': tail,
+            'time': dict((phase, round(seconds, 7)) for phase, seconds in times.items()),
+            'error': error,
+        }
+        line = json.dumps(record, sort_keys=True, separators=(',', ':')) + '\n'
+        # single write of a file opened for appending, so that concurrent processes don't mix records
+        with open(self.path, 'a') as file:
+            file.write(line)
+
+
+def read_log(path):
+    """Iterate over the records of the log file."""
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def percentiles(values):
+    """Get nearest-rank percentiles (and the maximum) of the values."""
+    values = sorted(values)
+    if not values:
+        return {}
+    result = dict(('p{0:g}'.format(fraction * 100), values[int(math.ceil(fraction * len(values))) - 1])
+                  for fraction in PERCENTILES)
+    result['max'] = values[-1]
+    return result
+
+
+def replay(handler, records, repeat=1):
+    """Push recorded command lines through command lookup and parsing.
+
+    Commands are not run and help is not rendered: lines which resolve
+    to a handler rather than a command are counted as skipped. Only the
+    recorded arguments of long command lines are replayed (not the tail).
+
+    :param handler: cli-handler
+    :param records: recorded invocations (see `read_log`)
+    :param repeat: number of times to replay the records
+    :return: JSON-serializable report
+    """
+    records = list(records)
+    latencies, errors, skipped = [], {}, 0
+    start = _clock()
+    for _ in range(repeat):
+        for record in records:
+            began = _clock()
+            try:
+                element, argv, context, error = resolve(handler, record['argv'])
+                if error is not None:
+                    raise error
+                if argv is None or not isinstance(element, BoundCommand):
+                    skipped += 1
+                    continue
+                options, arguments = element.parser.parse(argv)
+                for value in arguments:
+                    if isinstance(value, ArgumentStream):
+                        list(value)
+            except CliSyntaxException as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            latencies.append(_clock() - began)
+    elapsed = _clock() - start
+    recorded = [sum(record['time'].get(phase, 0.0) for phase in REPLAYED_PHASES)
+                for record in records if 'parse' in record['time']]
+    return {
+        'records': len(records),
+        'replayed': len(latencies),
+        'skipped': skipped,
+        'errors': errors,
+        'seconds': elapsed,
+        'throughput': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'latency': percentiles(latencies),
+        'recorded': percentiles(recorded),
+    }
+
+
+def format_replay(report):
+    """Format replay report as a human-readable text."""
+    lines = [
+        "{replayed} lines replayed in {seconds:.3f} s ({throughput:,.0f} lines/s), {skipped} skipped".format(**report),
+    ]
+    for name, count in sorted(report['errors'].items()):
+        lines.append("  {name:<24} {count:>8} errors".format(name=name, count=count))
+    lines.append("  {what:<10}{recorded:>14}{replayed:>14}".format(what='latency', recorded='recorded us',
+                                                                    replayed='replayed us'))
+    for key in sorted(report['latency'], key=lambda key: (key == 'max', float(key[1:]) if key != 'max' else 0)):
+        recorded = report['recorded'].get(key)
+        lines.append("  {key:<10}{recorded:>14}{replayed:>14.1f}".format(
+            key=key, recorded='' if recorded is None else '{0:.1f}'.format(recorded * 1e6),
+            replayed=report['latency'][key] * 1e6))
+    return '\n'.join(lines)
@@ -0,0 +1,345 @@
+"""Persistent server mode.
+
+Description:
+-----------
+
+This module defines a `Server` which keeps a fully built cli-handler
+warm in a long-running process listening on a Unix socket. Each
+invocation is forwarded by a thin client (see `comandante.client`)
+and executed by a worker forked from the server, so invocations are
+isolated from each other and skip interpreter startup, imports and
+handler construction.
+
+The server restarts itself (keeping the socket) when any of the
+loaded python source files changes.
+
+Server mode requires Python 3 on a POSIX system.
+"""
+
+from __future__ import print_function
+
+import array
+import gc
+import io
+import os
+import signal
+import socket
+import struct
+import sys
+import time
+import traceback
+
+from comandante.client import HEADER, STATUS, STDIO_FDS
+from comandante.errors import CliSyntaxException
+from comandante.inner.lazy import LazyElement
+
+# Environment variable passing listening socket over restarts
+SOCKET_FD_VARIABLE = 'COMANDANTE_SERVER_FD'
+
+# Exit status of the worker on unhandled exceptions
+ERROR_STATUS = 1
+
+# Permissions of the socket file (the server runs commands as its own user)
+SOCKET_MODE = 0o600
+
+# Peer credentials of a Unix socket connection (pid, uid, gid)
+PEER_CREDENTIALS = struct.Struct('3i')
+
+
+def decode_request(data):
+    """Decode invocation request (see `comandante.client.encode_request`).
+
+    :return: (argv, cwd, environ) tuple
+    """
+    fields = [os.fsdecode(field) for field in data.split(b'\0')]
+    cwd, count = fields[0], int(fields[1])
+    argv = fields[2:2 + count]
+    environ = dict(item.split('=', 1) for item in fields[2 + count:] if '=' in item)
+    return argv, cwd, environ
+
+
+def warm_up(handler):
+    """Resolve lazy commands and compile parsers of the whole handler tree."""
+    for element in handler.declared_commands.values():
+        if isinstance(element, LazyElement):
+            element = element.target
+        if element.declared_commands:
+            warm_up(element)
+        else:
+            element.parser
+
+
+def source_files():
+    """Get source files of all loaded modules."""
+    files = set()
+    for module in list(sys.modules.values()):
+        file_name = getattr(module, '__file__', None)
+        if file_name and file_name.endswith('.py'):
+            files.add(file_name)
+    return files
+
+
+def _mtime(file_name):
+    try:
+        return os.stat(file_name).st_mtime
+    except OSError:
+        return None
+
+
+class Server(object):
+    """Unix socket server invoking a warm cli-handler in forked workers.
+
+    The handler is built and warmed up (lazy commands imported, parsers
+    compiled) once. Garbage collector is disabled while the server loads
+    the handler, then the loaded heap is frozen (`gc.freeze`) and the
+    collector is enabled again. The heap is frozen again right before
+    each fork, so that workers don't touch the shared memory pages by
+    the garbage collection and start fast.
+
+    The socket is accessible by the owner only and, where the platform
+    reports peer credentials, connections of other users are rejected.
+    """
+
+    def __init__(self, load, path, restart_argv=None, interval=1.0):
+        """Initialize instance.
+
+        :param load: callable building the handler
+        :param path: socket path
+        :param restart_argv: command restarting the server (the current command by default)
+        :param interval: source files polling interval in seconds
+        """
+        self._load = load
+        self.path = path
+        self.restart_argv = list(restart_argv or [sys.executable] + sys.argv)
+        self.interval = interval
+        self.handler = None
+        self._socket = None
+        self._mtimes = {}
+
+    def serve(self):
+        """Load the handler and serve invocations until terminated."""
+        if not hasattr(socket, 'AF_UNIX') or not hasattr(socket.socket, 'recvmsg'):
+            raise RuntimeError("Server mode requires Python 3 on a POSIX system")
+        gc.disable()
+        self._socket = self._listen()
+        restart = False
+        previous = signal.signal(signal.SIGTERM, self._terminate)
+        try:
+            self.handler = self._load()
+            warm_up(self.handler)
+            self._mtimes = dict((name, _mtime(name)) for name in source_files())
+            if hasattr(gc, 'freeze'):  # Python 3.7+
+                gc.freeze()
+            gc.enable()
+            restart = self._loop()
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+            if not restart:
+                self._socket.close()
+                self._unlink()
+        self._restart()
+
+    def _listen(self):
+        """Get listening socket (inherited from the previous server process if restarted)."""
+        inherited = os.environ.pop(SOCKET_FD_VARIABLE, None)
+        if inherited is not None:
+            return socket.socket(fileno=int(inherited))
+        self._check_path()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # the socket file is created with the umask permissions, don't expose it even for a moment
+        umask = os.umask(0o777 & ~SOCKET_MODE)
+        try:
+            server.bind(self.path)
+        finally:
+            os.umask(umask)
+        os.chmod(self.path, SOCKET_MODE)
+        server.listen(128)
+        return server
+
+    def _check_path(self):
+        """Remove stale socket, fail if another server is listening."""
+        if not os.path.exists(self.path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except socket.error:
+            os.unlink(self.path)
+            return
+        finally:
+            probe.close()
+        raise RuntimeError("Server is already running: {path}".format(path=self.path))
+
+    def _unlink(self):
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _terminate(signum, frame):
+        raise SystemExit(0)
+
+    def _loop(self):
+        """Accept connections until source files change (returns True) or terminated."""
+        self._socket.settimeout(self.interval)
+        checked = time.time()
+        while True:
+            try:
+                connection, _ = self._socket.accept()
+            except socket.timeout:
+                connection = None
+            if connection is not None:
+                if self._authorized(connection):
+                    self._fork(connection)
+                else:
+                    connection.close()
+            self._reap()
+            if time.time() - checked >= self.interval:
+                checked = time.time()
+                if self._changed():
+                    return True
+
+    @staticmethod
+    def _authorized(connection):
+        """Check that the peer runs as the server user (if the platform reports peer credentials)."""
+        if not hasattr(socket, 'SO_PEERCRED'):  # reported on Linux only
+            return True
+        credentials = connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, PEER_CREDENTIALS.size)
+        _, uid, _ = PEER_CREDENTIALS.unpack(credentials)
+        if uid == os.getuid():
+            return True
+        print("Rejected connection of user {uid}".format(uid=uid), file=sys.stderr)
+        return False
+
+    def _fork(self, connection):
+        """Fork worker serving the connection."""
+        sys.stdout.flush()
+        sys.stderr.flush()
+        if hasattr(gc, 'freeze'):  # Python 3.7+
+            gc.freeze()
+        pid = os.fork()
+        if pid == 0:
+            status = ERROR_STATUS
+            try:
+                self._socket.close()
+                status = self._work(connection)
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                os._exit(status)
+        connection.close()
+
+    @staticmethod
+    def _reap():
+        """Collect finished workers (including those forked before restart)."""
+        while True:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except OSError:  # no more workers
+                return
+            if pid == 0:
+                return
+
+    def _changed(self):
+        """Check whether source files have changed and can be reloaded."""
+        changed = [name for name, mtime in self._mtimes.items() if _mtime(name) != mtime]
+        if not changed:
+            return False
+        for name in changed:
+            self._mtimes[name] = _mtime(name)
+            try:
+                with io.open(name, 'rb') as file:
+                    compile(file.read(), name, 'exec')
+            except (SyntaxError, ValueError, IOError):
+                print("Not restarting, cannot compile {name}:".format(name=name), file=sys.stderr)
+                traceback.print_exc()
+                return False
+        print("Restarting, changed: {files}".format(files=', '.join(sorted(changed))), file=sys.stderr)
+        return True
+
+    def _restart(self):
+        """Replace the server process keeping the listening socket."""
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.set_inheritable(self._socket.fileno(), True)
+        os.environ[SOCKET_FD_VARIABLE] = str(self._socket.fileno())
+        os.execv(self.restart_argv[0], self.restart_argv)
+
+    def _work(self, connection):
+        """Serve invocation in the worker process, get exit status."""
+        gc.enable()
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        connection.setblocking(True)
+        argv, cwd, environ = self._receive(connection)
+        connection.sendall(STATUS.pack(os.getpid()))
+        os.chdir(cwd)
+        os.environ.clear()
+        os.environ.update(environ)
+        sys.stdin = io.open(0, 'r', closefd=False)
+        sys.stdout = io.open(1, 'w', buffering=1 if os.isatty(1) else -1, closefd=False)
+        sys.stderr = io.open(2, 'w', buffering=1, closefd=False)
+        sys.argv = [self.handler.name] + argv
+        status = invoke(self.handler, argv)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        connection.sendall(STATUS.pack(status))
+        return status
+
+    @staticmethod
+    def _receive(connection):
+        """Receive invocation request and install forwarded standard streams."""
+        fds = array.array('i')
+        size = socket.CMSG_SPACE(len(STDIO_FDS) * fds.itemsize)
+        data, ancillary, _, _ = connection.recvmsg(65536, size)
+        for level, kind, payload in ancillary:
+            if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                fds.frombytes(payload[:len(payload) - len(payload) % fds.itemsize])
+        while len(data) < HEADER.size or len(data) < HEADER.size + HEADER.unpack(data[:HEADER.size])[0]:
+            chunk = connection.recv(65536)
+            if not chunk:
+                raise EOFError("Incomplete request")
+            data += chunk
+        if len(fds) != len(STDIO_FDS):
+            raise EOFError("Standard streams are not forwarded")
+        for source, target in zip(fds, STDIO_FDS):
+            os.dup2(source, target)
+            os.close(source)
+        return decode_request(data[HEADER.size:])
+
+
+def invoke(handler, argv):
+    """Invoke handler the way a script would do, get exit status."""
+    try:
+        handler.invoke(argv)
+        return 0
+    except SystemExit as exit:
+        if exit.code is None or isinstance(exit.code, int):
+            return exit.code or 0
+        print(exit.code, file=sys.stderr)
+        return ERROR_STATUS
+    except CliSyntaxException:
+        return ERROR_STATUS
+    except KeyboardInterrupt:
+        return 128 + signal.SIGINT
+    except Exception:
+        traceback.print_exc()
+        return ERROR_STATUS
+
+
+def serve(handler, path, restart_argv=None, interval=1.0):
+    """Serve cli-handler invocations on a Unix socket.
+
+    Invocations are forwarded by the `comandante.client`:
+
+        python -m comandante.client <path> [arguments...]
+
+    :param handler: handler or a callable building the handler
+    :param path: socket path
+    :param restart_argv: command restarting the server when sources change
+        (the current command by default)
+    :param interval: source files polling interval in seconds
+    """
+    load = handler if callable(handler) else (lambda: handler)
+    Server(load, path, restart_argv, interval).serve()
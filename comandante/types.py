@@ -6,7 +6,7 @@ Description:
 This module defines additional command-line
 argument types (i.e. string-value parsers).
 """
-from comandante.inner.helpers import getname
+from comandante.inner.helpers import _map, getname
 
 
 def choice(*options):
@@ -18,6 +18,7 @@ def choice(*options):
         raise ValueError("Invalid value: {value}".format(value=str(value)))
 
     result.__name__ = '|'.join(options)
+    result.choices = options
     return result
 
 
@@ -29,3 +30,163 @@ def listof(value_type):
 
     result_type.__name__ = "listof({type})".format(type=getname(value_type))
     return result_type
+
+
+class Stream(object):
+    """Lazily converted stream of values.
+
+    See `stream` for details.
+    """
+
+    def __init__(self, value_type):
+        self.value_type = value_type
+        self.__name__ = "stream({type})".format(type=getname(value_type))
+
+    def __call__(self, value):
+        return self.value_type(value)
+
+
+def stream(value_type):
+    """Stream of values consuming all the remaining arguments.
+
+    May be assigned to the last positional parameter of a command.
+    The parameter will receive a lazy iterator over all remaining
+    command-line arguments, each of them converted by `value_type`
+    on demand. Invalid values are reported when consumed.
+    """
+    return Stream(value_type)
+
+
+class Completed(object):
+    """Value type with dynamically completed values.
+
+    See `completed` for details.
+    """
+
+    def __init__(self, value_type, provider, ttl):
+        self.value_type = value_type
+        self.provider = provider
+        self.ttl = ttl
+        self.__name__ = getname(value_type)
+
+    def __call__(self, value):
+        return self.value_type(value)
+
+
+def completed(value_type, provider, ttl=300):
+    """Values completed by a provider callable.
+
+    Shell completion scripts (see `python -m comandante completion`)
+    offer values returned by the provider, which is called without
+    arguments and must return an iterable of strings. The values are
+    cached on disk for `ttl` seconds. Stale values are served while
+    the cache is refreshed in the background, so a slow provider
+    never blocks completion.
+
+    Values are parsed by `value_type`.
+    """
+    return Completed(value_type, provider, ttl)
+
+
+class NumericArray(object):
+    """Compact numeric array type.
+
+    See `intarray` and `floatarray` for details.
+    """
+
+    # Array type codes by value kind
+    _typecodes = {
+        'i': 'bhilq',
+        'u': 'BHILQ',
+        'f': 'fd',
+    }
+
+    def __init__(self, kind, width, ndarray=None):
+        """Initialize instance.
+
+        :param kind: value kind: 'i' (signed int), 'u' (unsigned int) or 'f' (float)
+        :param width: value width in bits
+        :param ndarray: produce numpy arrays (None to use numpy whenever it is installed)
+        """
+        if width % 8 != 0:
+            raise ValueError("Invalid numeric width: {width}".format(width=width))
+        self.value_type = float if kind == 'f' else int
+        self.typecode = self._typecode(kind, width // 8)
+        self.dtype = "{kind}{size}".format(kind=kind, size=width // 8)
+        self.ndarray = ndarray
+        self.__name__ = "{kind}array({width})".format(kind={'i': 'int', 'u': 'uint', 'f': 'float'}[kind], width=width)
+
+    @staticmethod
+    def _typecode(kind, itemsize):
+        """Find array type code of the given kind and item size."""
+        import array
+        for typecode in NumericArray._typecodes[kind]:
+            try:
+                if array.array(typecode).itemsize == itemsize:
+                    return typecode
+            except ValueError:  # type code is not supported by this python version
+                continue
+        raise ValueError("Unsupported numeric width: {width}".format(width=itemsize * 8))
+
+    def __call__(self, value):
+        """Parse comma- or whitespace-separated values."""
+        return self.bulk(value.replace(',', ' ').split())
+
+    def bulk(self, values):
+        """Convert an iterable of strings into array (without collecting the strings).
+
+        Values are parsed one by one (by `int` or `float`) as they are
+        consumed and stored straight into the array, so that the caller
+        may tell the invalid value by counting the consumed ones.
+        """
+        import array
+        numpy = _numpy() if self.ndarray is not False else None
+        if self.ndarray and numpy is None:
+            raise RuntimeError("numpy is required by {name}".format(name=self.__name__))
+        try:
+            if numpy is not None:
+                return numpy.fromiter(_map(self.value_type, values), dtype=self.dtype)
+            return array.array(self.typecode, _map(self.value_type, values))
+        except (OverflowError, TypeError) as e:
+            raise ValueError(str(e))
+
+
+def intarray(width=64, signed=True, ndarray=None):
+    """Array of integers.
+
+    Parses comma- or whitespace-separated integers directly into
+    a compact `array.array` (or `numpy.ndarray` if numpy is installed).
+    When used as a var-arg type all the values are stored into a single
+    array (without collecting the strings first) and the command receives
+    it as the only var-arg item: `(values,)`.
+
+    :param width: integer width in bits (8, 16, 32 or 64)
+    :param signed: indicates whether integers are signed
+    :param ndarray: True to require numpy, False to never use it
+    """
+    return NumericArray('i' if signed else 'u', width, ndarray)
+
+
+def floatarray(width=64, ndarray=None):
+    """Array of floating point numbers.
+
+    Same as `intarray` but for floats.
+
+    :param width: float width in bits (32 or 64)
+    :param ndarray: True to require numpy, False to never use it
+    """
+    return NumericArray('f', width, ndarray)
+
+
+_numpy_module = []
+
+
+def _numpy():
+    """Get numpy module if it is installed (imported on the first use)."""
+    if not _numpy_module:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy_module.append(numpy)
+    return _numpy_module[0]
@@ -1,3 +1,4 @@
+import array
 import unittest
 
 import comandante as cli
@@ -30,6 +31,31 @@ class App(cli.Handler):
         return required, optional, vararg
 
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class BulkApp(cli.Handler):
+    @cli.signature(values=cli.intarray(width=8, ndarray=False))
+    @cli.command()
+    def test_bulk(self, *values):
+        return values
+
+    @cli.signature(values=cli.floatarray(width=32, ndarray=True))
+    @cli.command()
+    def test_ndarray(self, *values):
+        return values
+
+
+class StreamApp(cli.Handler):
+    @cli.signature(files=cli.stream(int))
+    @cli.command()
+    def test_stream(self, first, files):
+        return files
+
+
 class ArgumentTests(unittest.TestCase):
     """Integration tests for cli-argument passing."""
 
@@ -91,3 +117,65 @@ class ArgumentTests(unittest.TestCase):
                 App().test_int.invoke('invalid'.split())
         except error.InvalidArgumentValue as e:
             self.assertIn(App().test_int.full_doc(), out.getvalue())
+
+    def test_stream_lazy_values(self):
+        files = StreamApp().invoke('test_stream required 1 2 3'.split())
+        self.assertNotIsInstance(files, (list, tuple))
+        self.assertEqual(next(files), 1)
+        self.assertEqual(list(files), [2, 3])
+
+    def test_stream_empty(self):
+        files = StreamApp().invoke('test_stream required'.split())
+        self.assertEqual(list(files), [])
+
+    def test_stream_invalid_value_on_consumption(self):
+        files = StreamApp().invoke('test_stream required 1 invalid'.split())
+        self.assertEqual(next(files), 1)
+        try:
+            next(files)
+            self.fail("InvalidArgumentValue expected")
+        except error.InvalidArgumentValue as e:
+            self.assertEqual(e.value, 'invalid')
+            self.assertEqual(e.position, 2)
+
+    def test_stream_must_be_last(self):
+        command = StreamApp.test_stream.copy()
+        self.assertRaises(ValueError, command.set_types, {'first': cli.stream(int)})
+        self.assertIs(command.signature.required[0].type, str)
+
+    def test_stream_synopsis(self):
+        self.assertIn('[files ... ]', StreamApp().test_stream.full_doc())
+
+    def test_bulk_vararg(self):
+        result = BulkApp().invoke('test_bulk 1 2 3'.split())
+        self.assertEqual(len(result), 1)
+        self.assertIsInstance(result[0], array.array)
+        self.assertEqual(result[0].typecode, 'b')
+        self.assertEqual(list(result[0]), [1, 2, 3])
+
+    def test_bulk_vararg_lazy(self):
+        result = BulkApp().invoke(iter('test_bulk 1 2 3'.split()))
+        self.assertEqual(list(result[0]), [1, 2, 3])
+        try:
+            with suppress_output():
+                BulkApp().invoke(iter('test_bulk 1 2 x 4'.split()))
+            self.fail("InvalidArgumentValue expected")
+        except error.InvalidArgumentValue as e:
+            self.assertEqual((e.value, e.position), ('x', 2))
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_bulk_vararg_ndarray(self):
+        result = BulkApp().invoke('test_ndarray 1 2.5'.split())
+        self.assertEqual(len(result), 1)
+        self.assertIsInstance(result[0], numpy.ndarray)
+        self.assertEqual(result[0].dtype, numpy.float32)
+        self.assertEqual(result[0].tolist(), [1.0, 2.5])
+
+    def test_bulk_vararg_invalid_value(self):
+        try:
+            with suppress_output():
+                BulkApp().invoke('test_bulk 1 300 3'.split())
+            self.fail("InvalidArgumentValue expected")
+        except error.InvalidArgumentValue as e:
+            self.assertEqual(e.value, '300')
+            self.assertEqual(e.position, 1)
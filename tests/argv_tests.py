@@ -0,0 +1,87 @@
+import itertools
+import os
+import shutil
+import tempfile
+import unittest
+from io import BytesIO, StringIO
+
+import comandante as cli
+import comandante.argv as argv
+from comandante.inner.test import capture_output
+
+
+class App(cli.Handler):
+    @cli.signature(numbers=cli.stream(int))
+    @cli.option('scale', 's', int, 1)
+    @cli.command()
+    def total(self, label, numbers, **options):
+        return label, sum(numbers) * options.get('scale', 1)
+
+    @cli.command()
+    def collect(self, *values):
+        return values
+
+
+class ArgvSourceTests(unittest.TestCase):
+    """Lazy command-line argument source tests."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def make_file(self, content):
+        path = os.path.join(self.directory, 'args')
+        with open(path, 'wb') as file:
+            file.write(content)
+        return path
+
+    def test_response_file_lines(self):
+        path = self.make_file(b'first\nsecond value\r\nthird\n')
+        self.assertEqual(list(argv.response_file(path)), ['first', 'second value', 'third'])
+
+    def test_response_file_null_delimited(self):
+        path = self.make_file(b'first\0multi\nline\0third')
+        self.assertEqual(list(argv.response_file(path)), ['first', 'multi\nline', 'third'])
+
+    def test_empty_response_file(self):
+        path = self.make_file(b'')
+        self.assertEqual(list(argv.response_file(path)), [])
+
+    def test_expand(self):
+        path = self.make_file(b'2\n3\n')
+        expanded = argv.expand(['1', '@' + path, '4', '@'])
+        self.assertEqual(list(expanded), ['1', '2', '3', '4', '@'])
+
+    def test_null_delimited(self):
+        stream = BytesIO(b'first\0second\0third')
+        self.assertEqual(list(argv.null_delimited(stream, chunk_size=3)), ['first', 'second', 'third'])
+
+    def test_null_delimited_trailing_delimiter(self):
+        stream = BytesIO(b'first\0second\0')
+        self.assertEqual(list(argv.null_delimited(stream)), ['first', 'second'])
+
+    def test_null_delimited_long_argument(self):
+        stream = BytesIO(b'x' * 1000 + b'\0\0y')
+        self.assertEqual(list(argv.null_delimited(stream, chunk_size=7)), ['x' * 1000, '', 'y'])
+
+    def test_null_delimited_text_stream(self):
+        stream = StringIO(u'first\0second\0third')
+        self.assertEqual(list(argv.null_delimited(stream, chunk_size=4)), ['first', 'second', 'third'])
+
+    def test_invoke_with_response_file(self):
+        path = self.make_file(b'\n'.join(str(i).encode() for i in range(1000)))
+        result = App().invoke(argv.expand(['total', '-s', '2', 'label', '@' + path]))
+        self.assertEqual(result, ('label', 2 * sum(range(1000))))
+
+    def test_invoke_with_stdin(self):
+        stream = BytesIO(b'a\0b\0c')
+        result = App().invoke(itertools.chain(['collect'], argv.null_delimited(stream)))
+        self.assertEqual(result, ('a', 'b', 'c'))
+
+    def test_invoke_empty_iterator(self):
+        app = App()
+        with capture_output() as (out, err):
+            app.invoke(iter([]))
+        self.assertEqual(out.getvalue().rstrip(), app.full_doc().rstrip())
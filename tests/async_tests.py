@@ -0,0 +1,44 @@
+import sys
+import time
+import unittest
+
+if sys.version_info >= (3, 7):
+    import asyncio
+    from tests.coroutines.fixtures import Fetcher, declare_missing_vararg, invoke_concurrently
+
+
+@unittest.skipIf(sys.version_info < (3, 7), "coroutine commands require python 3.7+")
+class AsyncCommandTests(unittest.TestCase):
+    """Coroutine commands tests."""
+
+    def test_invoke(self):
+        self.assertEqual(Fetcher().invoke(['single', 'x']), 'X')
+
+    def test_invoke_async(self):
+        self.assertEqual(asyncio.run(invoke_concurrently()), ['A', 'b', 'C', 'D'])
+
+    def test_concurrent(self):
+        fetcher = Fetcher()
+        start = time.time()
+        results = fetcher.invoke(['fetch', '--delay=0.1', '>'] + ['item{0}'.format(index) for index in range(9)])
+        elapsed = time.time() - start
+        self.assertEqual(results, ['>ITEM{0}'.format(index) for index in range(9)])
+        self.assertEqual(fetcher.max_in_flight, 3)
+        self.assertLess(elapsed, 0.1 * 9 / 2)
+
+    def test_limit_option(self):
+        fetcher = Fetcher()
+        self.assertEqual(fetcher.invoke(['limited', 'a', 'b', 'c', 'd']), ['A', 'B', 'C', 'D'])
+        self.assertEqual(fetcher.max_in_flight, 2)
+        fetcher = Fetcher()
+        fetcher.invoke(['limited', '-j', '4', 'a', 'b', 'c', 'd'])
+        self.assertEqual(fetcher.max_in_flight, 4)
+
+    def test_first_error(self):
+        fetcher = Fetcher()
+        items = ['a', 'bad', 'b', 'c', 'd', 'e', 'f']
+        self.assertRaises(ValueError, fetcher.invoke, ['fetch', '-d', '0.01', '>'] + items)
+        self.assertLess(len(fetcher.started), len(items))
+
+    def test_missing_vararg(self):
+        self.assertRaises(RuntimeError, declare_missing_vararg)
@@ -2,6 +2,7 @@ import unittest
 
 import comandante as cli
 import comandante.errors as error
+from comandante.handler import resolve
 from comandante.inner.test import suppress_output, capture_output
 
 
@@ -11,6 +12,22 @@ class SubCommand(cli.Handler):
         return specified_options
 
 
+class Tracked(cli.Handler):
+    """Handler with its own invoke."""
+
+    def __init__(self):
+        super(Tracked, self).__init__()
+        self.invoked = False
+
+    def invoke(self, argv, context=()):
+        self.invoked = True
+        return super(Tracked, self).invoke(argv, context)
+
+    @cli.command()
+    def go(self):
+        return 'went'
+
+
 class App(cli.Handler):
     def __init__(self):
         super(App, self).__init__()
@@ -39,6 +56,17 @@ class BasicTests(unittest.TestCase):
         with suppress_output():
             self.assertRaises(error.UnknownCommand, App().invoke, ['unknown'])
 
+    def test_nested_invoke_override(self):
+        app = App()
+        tracked = Tracked()
+        app.declare_command('tracked', tracked)
+        self.assertEqual(app.invoke(['tracked', 'go']), 'went')
+        self.assertTrue(tracked.invoked)
+        element, argv, context, _ = resolve(app, ['tracked', 'go'])
+        self.assertEqual((element, argv, context), (tracked, ['go'], ('tracked',)))
+        element, argv, context, _ = resolve(app, ['subcommand'])
+        self.assertEqual((element, argv, context), (app.subcommand, None, ('subcommand',)))
+
     def test_help_subcommand(self):
         app = App()
         with capture_output() as (out, err):
@@ -100,3 +128,165 @@ class BasicTests(unittest.TestCase):
 
     def test_duplicate_local_option_short_name(self):
         self.assertRaises(RuntimeError, App().command.declare_option, 'unique', 'l', int, 0)
+
+    def test_frozen_invoke(self):
+        table = App().freeze()
+        self.assertEqual(table.invoke('subcommand command -g'.split()), {'global': True})
+        self.assertEqual(table.invoke('command -l 42'.split()), {'local': 42})
+        self.assertEqual(table.invoke(iter('command -g'.split())), {'global': True})
+
+    def test_frozen_unknown_command(self):
+        table = App().freeze()
+        with suppress_output():
+            self.assertRaises(error.UnknownCommand, table.invoke, 'subcommand unknown'.split())
+
+    def test_frozen_help(self):
+        app = App()
+        table = app.freeze()
+        with capture_output() as (out, err):
+            table.invoke('subcommand'.split())
+        self.assertEqual(out.getvalue().rstrip(), app.subcommand.full_doc().rstrip())
+
+    def test_frozen_table_is_immutable(self):
+        table = App().freeze()
+        self.assertIn(('subcommand', 'command'), table.commands)
+        self.assertIn(('subcommand',), table.handlers)
+
+        def assign():
+            table.commands[('new',)] = None
+
+        self.assertRaises(TypeError, assign)
+
+    def test_frozen_table_is_a_snapshot(self):
+        app = App()
+        table = app.freeze()
+        app.declare_option('later', 'L', int, 0)
+        app.declare_command('later', SubCommand())
+        app.command.declare_option('own', 'o', int, 0)
+        with suppress_output():
+            self.assertRaises(error.UnknownOption, table.invoke, 'subcommand command -L 3'.split())
+            self.assertRaises(error.UnknownOption, table.invoke, 'command -o 3'.split())
+            self.assertRaises(error.UnknownCommand, table.invoke, 'later command'.split())
+        self.assertEqual(table.invoke('command -l 42'.split()), {'local': 42})
+        self.assertEqual(app.freeze().invoke('subcommand command -L 3'.split()), {'later': 3})
+
+    def test_frozen_commands_are_not_modified(self):
+        table = App().freeze()
+        command = table.commands[('command',)]
+        parser = command.parser
+        self.assertRaises(TypeError, command.declare_option, 'other', 'O', int, 0)
+        self.assertRaises(TypeError, command.set_types, {})
+        self.assertIs(command.parser, parser)
+
+    def test_frozen_nested_invoke_override(self):
+        app, tracked = App(), Tracked()
+        app.declare_command('tracked', tracked)
+        self.assertEqual(app.freeze().invoke(['tracked', 'go']), 'went')
+        self.assertTrue(tracked.invoked)
+
+    def test_declared_views_are_not_reallocated(self):
+        app = App()
+        self.assertIs(app.declared_options, app.declared_options)
+        self.assertIs(app.declared_commands, app.declared_commands)
+        self.assertIs(app.command.declared_options, app.command.declared_options)
+
+    def test_global_options_are_shared(self):
+        app = App()
+        self.assertIs(app.command.declared_options['global'], app.declared_options['global'])
+
+    def test_declared_views_are_read_only(self):
+        app = App()
+
+        def assign():
+            app.command.declared_options['new'] = None
+
+        self.assertRaises(TypeError, assign)
+
+
+class Base(cli.Handler):
+    @cli.command()
+    def inherited(self):
+        return 'base'
+
+    @cli.command()
+    def overridden(self):
+        return 'base'
+
+    @cli.command()
+    def hidden(self):
+        return 'base'
+
+
+class Derived(Base):
+    hidden = None
+
+    @cli.command()
+    def overridden(self):
+        return 'derived'
+
+    @property
+    def broken(self):
+        raise AssertionError("Properties must not be accessed during command discovery")
+
+
+class DiscoveryTests(unittest.TestCase):
+    """Command discovery tests."""
+
+    def test_inherited_command(self):
+        self.assertEqual(Derived().invoke(['inherited']), 'base')
+
+    def test_overridden_command(self):
+        self.assertEqual(Derived().invoke(['overridden']), 'derived')
+        self.assertEqual(Base().invoke(['overridden']), 'base')
+
+    def test_command_hidden_by_attribute(self):
+        self.assertNotIn('hidden', Derived().declared_commands)
+        self.assertIn('hidden', Base().declared_commands)
+
+    def test_command_assigned_after_class_creation(self):
+        class Extended(Base):
+            pass
+
+        def added(self):
+            return 'added'
+
+        Base.added = cli.command()(added)
+        try:
+            self.assertEqual(Extended().invoke(['added']), 'added')
+        finally:
+            del Base.added
+        self.assertNotIn('added', Extended().declared_commands)
+
+
+class SharingTests(unittest.TestCase):
+    """Sharing commands between handler instances."""
+
+    def test_commands_are_shared(self):
+        self.assertIs(App().command.command, App().command.command)
+
+    def test_global_options_dont_copy_commands(self):
+        app = App()
+        app.declare_option('another', 'a', int, 0)
+        self.assertIs(app.command.command, App.command)
+        self.assertIn('another', app.command.declared_options)
+        self.assertEqual(app.invoke('command -a 1'.split()), {'another': 1})
+
+    def test_declare_option_copies_command(self):
+        app, other = App(), App()
+        app.command.declare_option('another', 'a', int, 0)
+        self.assertIsNot(app.command.command, App.command)
+        self.assertIn('another', app.command.declared_options)
+        self.assertNotIn('another', other.command.declared_options)
+        self.assertNotIn('another', App.command.declared_options)
+
+    def test_set_types_copies_command(self):
+        app, other = App(), App()
+        app.subcommand.command.set_types({})
+        self.assertIsNot(app.subcommand.command.command, other.subcommand.command.command)
+
+    def test_local_option_clashing_with_global(self):
+        self.assertRaises(RuntimeError, App().command.declare_option, 'global', 'unique', int, 0)
+        self.assertRaises(RuntimeError, App().command.declare_option, 'unique', 'g', int, 0)
+
+    def test_global_option_clashing_with_local(self):
+        self.assertRaises(RuntimeError, App().declare_option, 'local', 'unique', int, 0)
@@ -0,0 +1,178 @@
+import sys
+import threading
+import time
+import unittest
+
+import comandante as cli
+from comandante.errors import InvalidArgumentValue, UnknownCommand, ArgumentMissing, InvalidOptionValue, \
+    UnknownOption, TooManyArguments, MissingOptionValue
+from comandante.inner.test import capture_output
+from tests.basic_tests import Tracked
+
+# Coroutine commands are supported (see tests.coroutines)
+COROUTINES = sys.version_info >= (3, 7)
+
+
+class Remote(cli.Handler):
+    """Manage remotes."""
+
+    @cli.command()
+    def add(self, name, url):
+        """Add remote"""
+        return name, url
+
+
+class App(cli.Handler):
+    """Batch application."""
+
+    def __init__(self):
+        super(App, self).__init__()
+        self.declare_option('verbose', 'v', bool, False)
+        self.declare_command('remote', Remote())
+        self.declare_lazy_command('reports', 'tests.lazy_target:Reports')
+        if COROUTINES:
+            self.declare_lazy_command('later', 'tests.coroutines.fixtures:later')
+        self.threads = set()
+
+    @cli.signature(a=int, b=int)
+    @cli.command()
+    def sum(self, a, b, **options):
+        """Sum numbers"""
+        return a + b, options
+
+    @cli.signature(delay=float)
+    @cli.command()
+    def sleep(self, delay):
+        """Sleep for a while"""
+        self.threads.add(threading.current_thread().ident)
+        time.sleep(delay)
+        return delay
+
+    @cli.option('count', 'c', int, 1)
+    @cli.signature(values=cli.stream(int))
+    @cli.command()
+    def total(self, values, **options):
+        """Sum stream"""
+        return sum(values)
+
+    @cli.command()
+    def fail(self, message):
+        """Raise error"""
+        raise ValueError(message)
+
+
+class InvokeManyTests(unittest.TestCase):
+    """Batch invocation tests."""
+
+    def test_results(self):
+        lines = [['sum', '1', '2'], ['sum', '-v', '3', '4'], ['remote', 'add', 'origin', 'url'],
+                 ['reports', 'show', 'name']]
+        results = [(3, {}), (7, {'verbose': True}), ('origin', 'url'), ('name', {})]
+        if COROUTINES:
+            lines.append(['later', 'x'])
+            results.append('x')
+        invocations = App().invoke_many(lines, workers=2)
+        self.assertEqual([invocation.argv for invocation in invocations], lines)
+        self.assertTrue(all(invocation.succeeded for invocation in invocations))
+        self.assertEqual([invocation.result for invocation in invocations], results)
+
+    def test_errors(self):
+        lines = [['sum', '1', 'x'], ['unknown'], ['remote', 'add'], ['fail', 'message'], ['sum', '1', '1']]
+        with capture_output() as (out, err):
+            invocations = App().invoke_many(lines)
+        self.assertEqual(out.getvalue(), '')
+        errors = [type(invocation.error) for invocation in invocations]
+        self.assertEqual(errors, [InvalidArgumentValue, UnknownCommand, ArgumentMissing, ValueError, type(None)])
+        self.assertEqual(invocations[-1].result, (2, {}))
+
+    def test_help(self):
+        with capture_output() as (out, err):
+            invocations = App().invoke_many([[], ['remote']])
+        self.assertTrue(all(invocation.succeeded for invocation in invocations))
+        self.assertIn('Batch application.', out.getvalue())
+        self.assertIn('Manage remotes.', out.getvalue())
+
+    def test_nested_invoke_override(self):
+        app, tracked = App(), Tracked()
+        app.declare_command('tracked', tracked)
+        invocation, = app.invoke_many([['tracked', 'go']])
+        self.assertEqual(invocation.result, 'went')
+        self.assertTrue(tracked.invoked)
+
+    def test_concurrency(self):
+        app = App()
+        start = time.time()
+        invocations = app.invoke_many([['sleep', '0.1']] * 8, workers=8)
+        self.assertLess(time.time() - start, 0.4)
+        self.assertGreater(len(app.threads), 1)
+        self.assertTrue(all(invocation.run_time >= 0.1 for invocation in invocations))
+
+    def test_sequential(self):
+        app = App()
+        app.invoke_many([['sleep', '0'], ['sleep', '0']], workers=1)
+        self.assertEqual(app.threads, {threading.current_thread().ident})
+
+
+class DiagnosticsTests(unittest.TestCase):
+    """Structured syntax error reporting tests."""
+
+    @staticmethod
+    def describe(diagnostics):
+        return [(type(diagnostic.error), diagnostic.position, diagnostic.token, diagnostic.expected)
+                for diagnostic in diagnostics]
+
+    def test_first_error(self):
+        lines = [['sum', '--count=2', 'x'], ['remote', 'push'], ['sum', '1', 'x'], ['sum', '1', '2']]
+        with capture_output() as (out, err):
+            invocations = App().invoke_many(lines)
+        self.assertEqual((out.getvalue(), err.getvalue()), ('', ''))
+        self.assertEqual([self.describe(invocation.diagnostics) for invocation in invocations], [
+            [(UnknownOption, 1, '--count=2', '--verbose')],
+            [(UnknownCommand, 1, 'push', 'add|help')],
+            [(InvalidArgumentValue, 2, 'x', 'int')],
+            [],
+        ])
+
+    def test_all_errors(self):
+        argv = ['total', '--unknown', '-c', 'x', '-v', '1', 'y', '3', 'z']
+        invocation = App().try_invoke(argv, all_errors=True)
+        self.assertIsInstance(invocation.error, UnknownOption)
+        self.assertEqual(self.describe(invocation.diagnostics), [
+            (UnknownOption, 1, '--unknown', '--count|--verbose'),
+            (InvalidOptionValue, 3, 'x', 'int'),
+            (InvalidArgumentValue, 6, 'y', 'int'),
+            (InvalidArgumentValue, 8, 'z', 'int'),
+        ])
+
+    def test_stream_error(self):
+        invocation = App().try_invoke(['total', '1', 'x', '2', 'y'])
+        self.assertIsInstance(invocation.error, InvalidArgumentValue)
+        self.assertEqual(self.describe(invocation.diagnostics), [(InvalidArgumentValue, 2, 'x', 'int')])
+
+    def test_validate(self):
+        app = App()
+        self.assertEqual(app.validate(['sum', '1', '2']), [])
+        self.assertEqual(app.validate([]), [])
+        self.assertEqual(app.validate(['remote']), [])
+        self.assertEqual(self.describe(app.validate(['reports', 'show', 'a', 'b'])),
+                         [(TooManyArguments, 3, 'b', None)])
+        self.assertEqual(self.describe(app.validate(['reports', 'unknown'])),
+                         [(UnknownCommand, 1, 'unknown', 'help|show')])
+        self.assertEqual(self.describe(app.validate(['sum', '-v', '1', '2', '3'])),
+                         [(TooManyArguments, 4, '3', None)])
+        self.assertEqual(self.describe(app.validate(['remote', 'add', 'origin'])),
+                         [(ArgumentMissing, 3, None, '<url>')])
+        self.assertEqual(self.describe(app.validate(['total', '-c'])), [(MissingOptionValue, 2, None, 'int')])
+        diagnostic, = app.validate(['sum', '1', 'x'])
+        self.assertEqual(diagnostic.as_dict(), {
+            'kind': 'InvalidArgumentValue', 'message': str(diagnostic.error), 'position': 2, 'token': 'x',
+            'expected': 'int'})
+
+    def test_try_invoke(self):
+        with capture_output() as (out, err):
+            invocation = App().try_invoke(['sum', '1', '2'])
+            failed = App().try_invoke(['unknown'])
+        self.assertEqual((out.getvalue(), err.getvalue()), ('', ''))
+        self.assertEqual(invocation.result, (3, {}))
+        self.assertEqual(invocation.diagnostics, [])
+        self.assertIsInstance(failed.error, UnknownCommand)
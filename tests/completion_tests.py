@@ -0,0 +1,284 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+try:
+    from shutil import which
+except ImportError:  # python 2
+    from distutils.spawn import find_executable as which
+
+import comandante as cli
+from comandante.inner.completion_cache import LOCK_SUFFIX, LOCK_TIMEOUT, CompletionCache, entry_key
+from comandante.inner.output.completion import PosixScript, completion_script
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def jobs():
+    """Completion provider logging its calls."""
+    with open(os.environ['COMANDANTE_TEST_PROVIDER_LOG'], 'a') as log:
+        log.write('called\n')
+    return ['job-1', 'job-2']
+
+
+class Remote(cli.Handler):
+    """Manage remotes."""
+
+    @cli.signature(protocol=cli.choice('ssh', 'https'))
+    @cli.command()
+    def add(self, name, protocol):
+        """Add remote"""
+
+
+class Git(cli.Handler):
+    """The content tracker."""
+
+    def __init__(self):
+        super(Git, self).__init__(name='git')
+        self.declare_command('remote', Remote())
+
+    @cli.option('message', 'm', str, '', descr='Commit message.')
+    @cli.option('force', 'f', bool, False)
+    @cli.command()
+    def commit(self, *paths):
+        """Record changes"""
+
+    @cli.signature(branch=cli.choice('main', 'my branch'))
+    @cli.command()
+    def checkout(self, branch):
+        """Switch branches"""
+
+    @cli.option('mode', 'M', cli.choice('fast', 'slow'), 'fast')
+    @cli.signature(kind=cli.choice('tag', 'branch'), names=cli.choice('x', 'y'))
+    @cli.command()
+    def push(self, kind, *names):
+        """Push changes"""
+
+
+class Ci(cli.Handler):
+    """Continuous integration."""
+
+    @cli.option('job', 'j', cli.completed(str, jobs), '')
+    @cli.signature(names=cli.completed(str, jobs, ttl=60))
+    @cli.command()
+    def cancel(self, *names):
+        """Cancel jobs"""
+
+
+def wait_for(condition, timeout=10.0):
+    """Wait until the condition is satisfied."""
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.05)
+    return condition()
+
+
+class CompletionCacheTests(unittest.TestCase):
+    """Dynamic completion values cache tests."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = CompletionCache(os.path.join(self.directory, 'app'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_store(self):
+        self.assertIsNone(self.cache.read('key'))
+        self.cache.store('key', ['a', 'b c'], ttl=60)
+        expires, values = self.cache.read('key')
+        self.assertEqual(values, ['a', 'b c'])
+        self.assertAlmostEqual(expires, time.time() + 60, delta=5)
+
+    def test_eviction(self):
+        self.cache.max_size = 100
+        for index in range(5):
+            self.cache.store('key{index}'.format(index=index), ['x' * 20], ttl=60)
+            os.utime(os.path.join(self.cache.directory, 'key{index}'.format(index=index)), (index, index))
+        self.cache.store('last', ['x' * 20], ttl=60)
+        self.assertEqual(sorted(os.listdir(self.cache.directory)), ['key3', 'key4', 'last'])
+
+    def test_entry_key(self):
+        self.assertEqual(entry_key(['ci', 'cancel'], 'names'), 'ci-cancel.names')
+        keys = [entry_key(['a-b'], 'c'), entry_key(['a', 'b'], 'c'), entry_key(['a.b'], 'c'), entry_key(['a'], 'b.c'),
+                entry_key(['a%2Db'], 'c'), entry_key(['a/b'], 'c')]
+        self.assertEqual(len(set(keys)), len(keys))
+        self.assertTrue(all('/' not in key for key in keys))
+
+    def test_lock(self):
+        self.assertTrue(self.cache.lock('key'))
+        self.assertFalse(self.cache.lock('key'))
+        self.cache.refresh('key', lambda: ['a'], ttl=60)
+        self.assertTrue(self.cache.lock('key'))
+
+    def test_stale_lock(self):
+        self.assertTrue(self.cache.lock('key'))
+        lock = os.path.join(self.cache.directory, 'key' + LOCK_SUFFIX)
+        os.utime(lock, (time.time() - LOCK_TIMEOUT + 10,) * 2)
+        self.assertFalse(self.cache.lock('key'))
+        os.utime(lock, (time.time() - LOCK_TIMEOUT - 10,) * 2)
+        self.assertTrue(self.cache.lock('key'))
+        self.assertFalse(self.cache.lock('key'))
+        self.assertEqual(os.listdir(self.cache.directory), ['key' + LOCK_SUFFIX])
+
+
+class CompletionScriptTests(unittest.TestCase):
+    """Completion scripts generation tests."""
+
+    def test_abstract_script(self):
+        self.assertRaises(TypeError, PosixScript, 'git', [])
+
+    def test_unsupported_shell(self):
+        self.assertRaises(ValueError, completion_script, Git(), 'tcsh')
+
+    def test_zsh(self):
+        script = completion_script(Git(), 'zsh', name='my-git')
+        self.assertTrue(script.startswith('#compdef my-git\n'))
+        self.assertIn("'my-git remote') reply=('add' 'help'); return 0 ;;", script)
+        self.assertIn("'my-git push --mode'|'my-git push -M') reply=('fast' 'slow'); return 0 ;;", script)
+        self.assertIn("compdef _comandante_my_git 'my-git'", script)
+
+    def test_fish(self):
+        script = completion_script(Git(), 'fish')
+        self.assertIn("complete -c 'git' -f -n '__comandante_git_at \\'git remote\\'' -a 'add'", script)
+        self.assertIn("-l 'mode' -s 'M' -x -a 'fast slow'", script)
+        self.assertIn("-l 'message' -s 'm' -r", script)
+        self.assertIn("complete -c 'git' -f -n '__comandante_git_at \\'git push\\' 1' -a 'x y'", script)
+
+    def test_dynamic(self):
+        script = completion_script(Ci(), 'zsh', refresh=['python', '-m', 'comandante'])
+        self.assertIn("'ci cancel') [ \"$2\" -ge 0 ] && _comandante_ci_dynamic 'ci cancel' 'names' 'ci-cancel.names'",
+                      script)
+        self.assertIn("( 'python' '-m' 'comandante' \"$1\" \"$2\" </dev/null >/dev/null 2>&1 & )", script)
+        script = completion_script(Ci(), 'fish')
+        self.assertIn("-l 'job' -s 'j' -x -a '(__comandante_ci_dynamic \\'ci cancel\\' \\'job\\' "
+                      "\\'ci-cancel.job\\')'", script)
+
+
+@unittest.skipIf(which('bash') is None, "bash is not installed")
+class BashCompletionTests(unittest.TestCase):
+    """Generated bash completion script tests."""
+
+    def setUp(self):
+        self.script = tempfile.NamedTemporaryFile(mode='w', suffix='.bash')
+        self.script.write(completion_script(Git(), 'bash'))
+        self.script.flush()
+
+    def tearDown(self):
+        self.script.close()
+
+    def run_bash(self, commands):
+        program = "source {script}\n{commands}".format(script=self.script.name, commands=commands)
+        output = subprocess.check_output(['bash', '--norc', '--noprofile', '-c', program])
+        return output.decode('utf-8').splitlines()
+
+    @staticmethod
+    def completion(line):
+        words = ' '.join("'{word}'".format(word=word) for word in line.split(' '))
+        return ('COMP_WORDS=({words}); COMP_CWORD=$((${{#COMP_WORDS[@]}} - 1)); '
+                'COMPREPLY=(); _comandante_git; echo "${{COMPREPLY[*]}}"').format(words=words)
+
+    def complete(self, *lines):
+        return self.run_bash('\n'.join(map(self.completion, lines)))
+
+    def test_completions(self):
+        expected = [
+            ('git ', 'checkout commit help push remote'),
+            ('git re', 'remote'),
+            ('git checkout m', 'main my\\ branch'),
+            ('git checkout my', 'my\\ branch'),
+            ('git remote ', 'add help'),
+            ('git remote add origin ', 'ssh https'),
+            ('git commit -', '--force -f --message -m'),
+            ('git commit --m', '--message'),
+            ('git commit -m ', ''),
+            ('git push ', 'tag branch'),
+            ('git push -M ', 'fast slow'),
+            ('git push --mode = s', 'slow'),
+            ('git push -M fast tag ', 'x y'),
+            ('git push tag -', ''),
+        ]
+        results = self.complete(*[line for line, _ in expected])
+        self.assertEqual(results, [completions for _, completions in expected])
+
+    def test_latency(self):
+        count = 200
+        completions = "for i in $(seq {count}); do {completion} >/dev/null; done".format(
+            count=count, completion=self.completion('git remote add origin '))
+        start = time.time()
+        self.run_bash('true')
+        baseline = time.time() - start
+        start = time.time()
+        self.run_bash(completions)
+        latency = (time.time() - start - baseline) / count
+        # a python interpreter start alone takes tens of milliseconds
+        self.assertLess(latency, 0.01)
+
+
+@unittest.skipIf(which('bash') is None, "bash is not installed")
+class BashDynamicCompletionTests(unittest.TestCase):
+    """Dynamic values completion by the generated bash script."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.log = os.path.join(self.directory, 'provider.log')
+        self.script = os.path.join(self.directory, 'ci.bash')
+        refresh = [sys.executable, '-m', 'comandante', 'refresh-completion', 'tests.completion_tests:Ci']
+        with open(self.script, 'w') as file:
+            file.write(completion_script(Ci(), 'bash', refresh=refresh))
+        self.entry = os.path.join(self.directory, 'cache', 'ci', 'ci-cancel.names')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def complete(self):
+        environment = dict(os.environ)
+        environment['COMANDANTE_COMPLETION_CACHE'] = os.path.join(self.directory, 'cache')
+        environment['COMANDANTE_TEST_PROVIDER_LOG'] = self.log
+        program = ("source {script}; COMP_WORDS=(ci cancel job-1 ''); COMP_CWORD=3; "
+                   "_comandante_ci; echo \"${{COMPREPLY[*]}}\"").format(script=self.script)
+        output = subprocess.check_output(['bash', '--norc', '--noprofile', '-c', program], cwd=ROOT, env=environment)
+        return output.decode('utf-8').strip()
+
+    def calls(self):
+        if not os.path.exists(self.log):
+            return 0
+        with open(self.log) as log:
+            return len(log.readlines())
+
+    def test_refresh(self):
+        # nothing is cached yet: complete immediately, refresh in the background
+        self.assertEqual(self.complete(), '')
+        self.assertTrue(wait_for(lambda: os.path.exists(self.entry) and not os.path.exists(self.entry + '.lock')))
+        self.assertEqual(self.complete(), 'job-1 job-2')
+        self.assertEqual(self.complete(), 'job-1 job-2')
+        self.assertEqual(self.calls(), 1)
+
+        # stale values are served while refreshing
+        with open(self.entry, 'w') as file:
+            file.write('0\nstale\n')
+        self.assertEqual(self.complete(), 'stale')
+        self.assertTrue(wait_for(lambda: self.calls() == 2))
+
+    def test_values_with_spaces(self):
+        os.makedirs(os.path.dirname(self.entry))
+        with open(self.entry, 'w') as file:
+            file.write('{expires}\nmy job\njob-2\n'.format(expires=int(time.time()) + 3600))
+        self.assertEqual(self.complete(), 'my\\ job job-2')
+        self.assertEqual(self.calls(), 0)
+
+    def test_stale_lock(self):
+        # the refresh which has taken the lock died long ago
+        os.makedirs(self.entry + '.lock')
+        os.utime(self.entry + '.lock', (time.time() - LOCK_TIMEOUT - 60,) * 2)
+        self.assertEqual(self.complete(), '')
+        self.assertTrue(wait_for(lambda: os.path.exists(self.entry) and not os.path.exists(self.entry + '.lock')))
+        self.assertEqual(self.complete(), 'job-1 job-2')
+
+
+if __name__ == '__main__':
+    unittest.main()
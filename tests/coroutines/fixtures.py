@@ -0,0 +1,79 @@
+"""Coroutine fixtures of async_tests and batch_tests.
+
+Coroutine syntax is not supported by python 2 and older
+python 3 versions, so this module is imported only by newer
+ones. The directory is not a regular package, so that the
+setuptools test loader doesn't import it on its own.
+"""
+import asyncio
+
+import comandante as cli
+
+
+class Fetcher(cli.Handler):
+    """Fetches things concurrently."""
+
+    def __init__(self):
+        super(Fetcher, self).__init__()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started = []
+
+    async def _fetch(self, item, delay):
+        self.started.append(item)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.in_flight -= 1
+        if item == 'bad':
+            raise ValueError(item)
+        return item.upper()
+
+    @cli.command()
+    async def single(self, item):
+        """Fetch single item"""
+        return await self._fetch(item, 0)
+
+    @cli.command()
+    def plain(self, item):
+        """Not a coroutine"""
+        return item
+
+    @cli.concurrent(over='items', limit=3)
+    @cli.option('delay', 'd', float, 0.05, descr='Fetch delay.')
+    @cli.command()
+    async def fetch(self, prefix, *items, **options):
+        """Fetch items concurrently"""
+        options = self.fetch.options(options)
+        return prefix + await self._fetch(items[0], options.delay)
+
+    @cli.concurrent(over='items', limit='jobs')
+    @cli.option('jobs', 'j', int, 2, descr='Concurrency limit.')
+    @cli.command()
+    async def limited(self, *items, **options):
+        """Fetch items with configurable concurrency"""
+        return await self._fetch(items[0], 0.01)
+
+
+async def later(value):
+    """Coroutine command"""
+    return value
+
+
+async def invoke_concurrently():
+    """Invoke coroutine commands from a running event loop in all supported ways."""
+    fetcher = Fetcher()
+    results = await asyncio.gather(fetcher.invoke_async(['single', 'a']), fetcher.invoke_async(['plain', 'b']))
+    frozen = await fetcher.freeze().invoke_async(['single', 'c'])
+    bound = await fetcher.single.invoke_async(['d'])
+    return results + [frozen, bound]
+
+
+def declare_missing_vararg():
+    """Declare concurrent command over a var-arg it doesn't have."""
+    @cli.concurrent(over='names')
+    @cli.command()
+    async def command(self, *items):
+        pass
@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import comandante as cli
+from comandante.inner.output.help_cache import HelpCache
+
+
+class App(cli.Handler):
+    """Test application."""
+
+    @cli.option('force', 'f', bool, False, descr='Force it.')
+    @cli.command()
+    def run(self, target):
+        """Run target."""
+        return target
+
+
+class Other(cli.Handler):
+    """Other handler."""
+
+
+class HelpCacheTests(unittest.TestCase):
+    """Rendered help cache tests."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_memoized(self):
+        cache = HelpCache()
+        app = App()
+        first = cache.document_handler(app)
+        self.assertIn('Test application', first)
+        self.assertIs(cache.document_handler(app), first)
+
+    def test_same_as_uncached(self):
+        app = App()
+        self.assertEqual(HelpCache().document_command(app.run, ['app', 'run']), app.run.full_doc(['app', 'run']))
+
+    def test_invalidated_by_options(self):
+        cache = HelpCache()
+        app = App()
+        before = cache.document_command(app.run)
+        app.declare_option('verbose', 'v', bool, False, descr='Be verbose.')
+        after = cache.document_command(app.run)
+        self.assertNotIn('verbose', before)
+        self.assertIn('verbose', after)
+
+    def test_invalidated_by_commands(self):
+        cache = HelpCache()
+        app = App()
+        cache.document_handler(app)
+        app.declare_command('other', Other())
+        self.assertIn('Other handler.', cache.document_handler(app))
+
+    def test_path_in_key(self):
+        cache = HelpCache()
+        app = App()
+        self.assertIn('first run', cache.document_command(app.run, ['first', 'run']))
+        self.assertIn('second run', cache.document_command(app.run, ['second', 'run']))
+
+    def test_on_disk(self):
+        app = App()
+        text = HelpCache(self.directory).document_command(app.run)
+        files = os.listdir(self.directory)
+        self.assertEqual(len(files), 1)
+        with open(os.path.join(self.directory, files[0]), 'w') as file:
+            file.write('cached')
+        self.assertEqual(HelpCache(self.directory).document_command(app.run), 'cached')
+        self.assertNotEqual(text, 'cached')
+
+    def test_on_disk_unavailable(self):
+        path = os.path.join(self.directory, 'file')
+        with open(path, 'w') as file:
+            file.write('')
+        cache = HelpCache(os.path.join(path, 'cache'))
+        self.assertIn('Run target', cache.document_command(App().run))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import comandante as cli
+from comandante.__main__ import Comandante
+from comandante.errors import UnknownOption
+from comandante.inner.output.help_cache import HelpCache, help_cache
+from comandante.inner.output.help_files import HelpFiles, build_help_files
+from comandante.inner.output.markup import Ansi
+from comandante.inner.output.terminal import Terminal
+from comandante.inner.test import capture_output
+
+
+class Remote(cli.Handler):
+    """Manage remotes."""
+
+    @cli.command()
+    def add(self, name, url):
+        """Add remote
+
+        Adds a *remote* named <name>.
+        .dotted line
+        """
+
+
+class Git(cli.Handler):
+    """The content tracker."""
+
+    def __init__(self):
+        super(Git, self).__init__(name='git')
+        self.declare_command('remote', Remote())
+
+    @cli.option('message', 'm', str, '', descr='Commit *message*.')
+    @cli.command()
+    def commit(self, *paths):
+        """Record changes"""
+
+
+class HelpFilesTests(unittest.TestCase):
+    """Pre-rendered help files tests."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.width = Terminal.detect().cols
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read(self, *path):
+        with open(os.path.join(self.directory, *path)) as file:
+            return file.read()
+
+    def test_build(self):
+        app = Git()
+        build_help_files(app, self.directory, '1.0', width=self.width)
+        for name in ('git', 'git/commit', 'git/help', 'git/remote', 'git/remote/add', 'git/remote/help'):
+            self.assertTrue(os.path.isfile(os.path.join(self.directory, 'man', name + '.1')), name)
+        self.assertEqual(self.read('ansi', 'git', 'commit.txt'), app.commit.full_doc(['git', 'commit']))
+        self.assertEqual(self.read('text', 'git', 'commit.txt'),
+                         app.commit.full_doc(['git', 'commit']).replace(Ansi.BOLD, '').replace(Ansi.NORMAL, ''))
+
+    def test_man_page(self):
+        build_help_files(Git(), self.directory, '1.0', width=self.width)
+        page = self.read('man', 'git', 'remote', 'add.1')
+        self.assertTrue(page.startswith('.TH "GIT\\-REMOTE\\-ADD" "1" "" "git 1.0" "git remote add"\n'))
+        self.assertIn('\\fBgit remote add\\fR <name> <url>', page)
+        self.assertIn('Adds a \\fBremote\\fR named <name>. .dotted line', page)
+        page = self.read('man', 'git', 'commit.1')
+        self.assertIn('\\fB\\-m\\fR \\fI<str>\\fR, \\fB\\-\\-message\\fR=\\fI<str>\\fR\nCommit \\fBmessage\\fR.', page)
+
+    def test_lookup(self):
+        build_help_files(Git(), self.directory, '1.0', width=self.width)
+        self.assertEqual(HelpFiles(self.directory, '1.0').lookup(['git', 'remote'], self.width),
+                         self.read('ansi', 'git', 'remote.txt'))
+        self.assertIsNone(HelpFiles(self.directory, '1.0').lookup(['git', 'missing'], self.width))
+        self.assertIsNone(HelpFiles(self.directory, '1.0').lookup(['git'], self.width + 1))
+        self.assertIsNone(HelpFiles(self.directory, '2.0').lookup(['git'], self.width))
+        self.assertIsNone(HelpFiles(os.path.join(self.directory, 'missing'), '1.0').lookup(['git'], self.width))
+        self.assertIsNone(HelpFiles(self.directory, '1.0').lookup(['svn'], self.width))
+        self.assertIsNone(HelpFiles(self.directory, '1.0', 'svn').lookup(['svn'], self.width))
+        self.assertIsNone(HelpFiles(self.directory, '1.0').lookup(['git', '..', 'git'], self.width))
+
+    def test_distinct_paths(self):
+        app = Git()
+        app.declare_command('remote-add', Remote())
+        build_help_files(app, self.directory, '1.0', width=self.width)
+        self.assertIn('git remote add <name> <url>', self.read('ansi', 'git', 'remote', 'add.txt'))
+        self.assertIn('git remote-add', self.read('ansi', 'git', 'remote-add.txt'))
+
+    def test_served(self):
+        build_help_files(Git(), self.directory, '1.0', width=self.width)
+        with open(os.path.join(self.directory, 'ansi', 'git', 'remote.txt'), 'w') as file:
+            file.write('prebuilt')
+        cache = HelpCache()
+        cache.add_help_files(HelpFiles(self.directory, '2.0'))
+        self.assertNotEqual(cache.document_handler(Git().remote, ['git', 'remote']), 'prebuilt')
+        cache.add_help_files(HelpFiles(self.directory, '1.0'))
+        self.assertEqual(cache.document_handler(Git().remote, ['git', 'remote']), 'prebuilt')
+
+    def test_use_help_files(self):
+        build_help_files(Git(), self.directory, '1.0', width=self.width)
+        for path in (('git.txt',), ('git', 'commit.txt')):
+            with open(os.path.join(self.directory, 'ansi', *path), 'w') as file:
+                file.write('prebuilt\n')
+        app = Git()
+        app.use_help_files(self.directory, '1.0')
+        try:
+            self.assertEqual(app.full_doc(), 'prebuilt\n')
+            # help printed on syntax errors is looked up by the full name too
+            with capture_output() as (out, err):
+                self.assertRaises(UnknownOption, app.invoke, ['commit', '--unknown'])
+            self.assertEqual(out.getvalue(), "Unknown option: '--unknown'\nprebuilt\n\n")
+        finally:
+            help_cache.help_files['git'].pop()
+
+    def test_error_help_without_help_files(self):
+        # commands invoked from the root are documented by their own name as usual
+        app = Git()
+        for invoke in (app.invoke, app.freeze().invoke):
+            with capture_output() as (out, err):
+                self.assertRaises(UnknownOption, invoke, ['commit', '--unknown'])
+            self.assertEqual(out.getvalue(), "Unknown option: '--unknown'\n" + app.commit.full_doc() + '\n')
+
+    def test_command_line(self):
+        argv = ['build-help', '-o', self.directory, '-w', str(self.width), 'tests.help_files_tests:Git', '1.0']
+        with capture_output():
+            written = Comandante().invoke(argv)
+        self.assertIn(os.path.join(self.directory, 'manifest.txt'), written)
+        self.assertIn('version=1.0', self.read('manifest.txt'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Modules that must not be loaded by plain `import comandante`
+HEAVY_MODULES = (
+    'inspect',
+    're',
+    'textwrap',
+    'array',
+    'importlib',
+    'comandante.inner.output.help_cache',
+    'comandante.inner.output.help_writer',
+    'comandante.inner.output.markup',
+    'comandante.inner.output.token_processor',
+    'comandante.inner.dispatch',
+    'comandante.inner.lazy',
+    'comandante.inner.fanout',
+    'comandante.inner.asynchronous',
+    'comandante.inner.batch',
+    'comandante.inner.parallel',
+    'comandante.inner.profiling',
+    'comandante.inner.recording',
+    'multiprocessing',
+    'asyncio',
+)
+
+SCRIPT = """
+import sys
+before = set(sys.modules)
+import comandante
+print('\\n'.join(sorted(set(sys.modules) - before)))
+"""
+
+
+class ImportTests(unittest.TestCase):
+    """Import cost tests."""
+
+    def imported_modules(self):
+        """Get modules loaded by `import comandante` in a fresh interpreter."""
+        output = subprocess.check_output([sys.executable, '-S', '-c', SCRIPT], cwd=ROOT, universal_newlines=True)
+        return set(output.split())
+
+    def test_no_heavy_imports(self):
+        imported = self.imported_modules()
+        self.assertIn('comandante', imported)
+        self.assertEqual(imported.intersection(HEAVY_MODULES), set())
@@ -0,0 +1,18 @@
+"""Targets of lazy commands used by lazy_tests."""
+import comandante as cli
+
+
+class Reports(cli.Handler):
+    """Reports
+
+    Reports long description.
+    """
+
+    @cli.command()
+    def show(self, name, **options):
+        return name, options
+
+
+def version(**options):
+    """Show version"""
+    return '1.0', options
@@ -0,0 +1,59 @@
+import sys
+import unittest
+
+import comandante as cli
+from comandante.inner.test import capture_output
+
+TARGET = 'tests.lazy_target'
+
+
+class App(cli.Handler):
+    def __init__(self):
+        super(App, self).__init__()
+        self.declare_option('verbose', 'v', bool, False)
+        self.declare_lazy_command('reports', TARGET + ':Reports', brief='Lazy reports')
+        self.declare_lazy_command('version', TARGET + ':version', brief='Lazy version')
+        self.declare_lazy_command('missing', TARGET + ':missing', brief='Missing target')
+
+
+class LazyCommandTests(unittest.TestCase):
+    """Lazily imported commands tests."""
+
+    def setUp(self):
+        sys.modules.pop(TARGET, None)
+
+    def test_help_doesnt_import(self):
+        app = App()
+        with capture_output() as (out, err):
+            app.invoke([])
+        self.assertIn('Lazy reports', out.getvalue())
+        self.assertNotIn(TARGET, sys.modules)
+
+    def test_invoke_lazy_handler(self):
+        app = App()
+        self.assertEqual(app.invoke('reports show -v name'.split()), ('name', {'verbose': True}))
+        self.assertTrue(app.reports.is_resolved)
+        self.assertFalse(app.version.is_resolved)
+
+    def test_invoke_lazy_function(self):
+        self.assertEqual(App().invoke('version -v'.split()), ('1.0', {'verbose': True}))
+
+    def test_options_declared_after_import(self):
+        app = App()
+        app.invoke('reports show name'.split())
+        app.declare_option('quiet', 'q', bool, False)
+        self.assertEqual(app.invoke('reports show -q name'.split()), ('name', {'quiet': True}))
+
+    def test_full_help_imports(self):
+        app = App()
+        with capture_output() as (out, err):
+            app.invoke('help reports'.split())
+        self.assertIn('Reports long description.', out.getvalue())
+
+    def test_frozen_dispatch(self):
+        table = App().freeze()
+        self.assertNotIn(TARGET, sys.modules)
+        self.assertEqual(table.invoke('reports show name'.split()), ('name', {}))
+
+    def test_missing_target(self):
+        self.assertRaises(ImportError, App().invoke, ['missing'])
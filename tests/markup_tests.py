@@ -1,6 +1,8 @@
 import unittest
 
 from comandante.inner.output.markup import Ansi, Markup
+from comandante.inner.output.token_processor import TokenProcessor
+from comandante.inner.test import StringIO
 
 
 class DocstringMarkupTests(unittest.TestCase):
@@ -77,3 +79,46 @@ class DocstringMarkupTests(unittest.TestCase):
     def test_escaped_leading_pipe(self):
         self.assert_process("first\n\\|second",
                             "first |second")
+
+    def test_escaped_leading_pipe_in_paragraph(self):
+        self.assert_process("first\n\n\\|second",
+                            "first\n\n|second")
+
+    def test_trailing_spaces_before_break(self):
+        self.assert_process("first \t\n \n  second  \n",
+                            "first\n\nsecond")
+
+    def test_trailing_spaces_after_bold(self):
+        self.assert_process("a *bold*  \nword",
+                            "a {bold} word".format(bold=Ansi.bold("bold")))
+
+    def test_paragraphs(self):
+        self.assertEqual(list(Markup.paragraphs("first *one*\n\nsecond\none")),
+                         ["first {one}".format(one=Ansi.bold("one")), "second one"])
+
+    def test_write(self):
+        text = "first *one*\n\n\\*second\\*\none  "
+        sink = StringIO()
+        Markup.write(text, sink, delimiter='\n')
+        self.assertEqual(sink.getvalue(), Markup.process(text, delimiter='\n'))
+
+
+class TokenProcessorTests(unittest.TestCase):
+    def setUp(self):
+        self.processor = TokenProcessor(
+            ('double', r'aa', lambda text: 'D'),
+            ('single', r'a', lambda text: 's'),
+            ('number', r'[0-9]+|x', lambda text: '<{text}>'.format(text=text)),
+        )
+
+    def test_process(self):
+        self.assertEqual(self.processor.process("aaa b 12x"), "Ds b <12><x>")
+
+    def test_tokens(self):
+        self.assertEqual(list(self.processor.tokens("b aa c")),
+                         [("b ", 'double', 'D'), (" c", None, '')])
+
+    def test_write(self):
+        sink = StringIO()
+        self.processor.write(u"aaa b 12", sink)
+        self.assertEqual(sink.getvalue(), u"Ds b <12>")
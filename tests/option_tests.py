@@ -83,6 +83,46 @@ class OptionTests(unittest.TestCase):
         default = App.test_merge.default_options()
         self.assertEqual(default, {'flag': False, 'some': 0})
 
+    def test_options_copy(self):
+        options = App().invoke('test_merge --some=42'.split())
+        copy = options.copy()
+        self.assertEqual(type(copy), dict)
+        self.assertEqual(copy, {'some': 42, 'flag': False})
+        copy['some'] = 0
+        self.assertEqual(options.some, 42)
+
+    def test_options_importable_from_model(self):
+        from comandante.inner.model import Options
+        self.assertIsInstance(App.test.options({}), Options)
+
+    def test_options_record(self):
+        options = App().invoke('test_merge --some=42'.split())
+        self.assertFalse(hasattr(options, '__dict__'))
+        self.assertEqual(options['some'], 42)
+        self.assertEqual(options.get('flag'), False)
+        self.assertEqual(options.get('unknown', 'default'), 'default')
+        self.assertEqual(sorted(options), ['flag', 'some'])
+        self.assertEqual(sorted(options.items()), [('flag', False), ('some', 42)])
+        self.assertIn('some', options)
+        self.assertEqual(len(options), 2)
+        self.assertRaises(KeyError, lambda: options['unknown'])
+        self.assertRaises(AttributeError, lambda: options.unknown)
+        with self.assertRaises(TypeError):
+            options['some'] = 1
+
+    def test_options_class_cached(self):
+        app = App()
+        self.assertIs(type(app.test_merge.options({})), type(app.test_merge.options({'some': 1})))
+        app.test_merge.declare_option('extra', 'e', int, 7)
+        self.assertEqual(app.test_merge.default_options().extra, 7)
+        self.assertFalse(hasattr(App.test_merge.default_options(), 'extra'))
+
+    def test_options_name_clash(self):
+        command = cli.option('keys', 'k', int, 1)(cli.command()(lambda **options: options))
+        options = command.options({})
+        self.assertEqual(options['keys'], 1)
+        self.assertEqual(options.keys(), ['keys'])
+
     def test_unknown_long_option(self):
         with suppress_output():
             self.assertRaises(error.UnknownOption, App().test_merge.invoke, ['--unknown'])
@@ -0,0 +1,127 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import comandante as cli
+from comandante.inner.parallel import SharedResult, restore, share, shared_memory
+from comandante.inner.test import capture_output
+
+
+class Files(cli.Handler):
+    """Processes files in parallel."""
+
+    @cli.parallel(over='names', workers=3)
+    @cli.command()
+    def pids(self, *names):
+        """Get worker process ids"""
+        return os.getpid()
+
+    @cli.parallel(over='names', workers='jobs', chunksize=2)
+    @cli.option('jobs', 'j', int, 2, descr='Number of processes.')
+    @cli.command()
+    def shout(self, suffix, *names, **options):
+        """Print names in upper case"""
+        name, = names
+        time.sleep(0.01 * (len(names[0]) % 3))
+        print(name.upper() + suffix)
+        return name.upper()
+
+    @cli.parallel(over='sizes', workers=2, shared_memory=1024)
+    @cli.signature(sizes=int)
+    @cli.command()
+    def blob(self, *sizes):
+        """Generate binary data"""
+        return bytes(bytearray(range(256))) * sizes[0]
+
+    @cli.parallel(over='sizes', workers=2, fail_fast=True, shared_memory=1)
+    @cli.signature(sizes=int)
+    @cli.command()
+    def blob_fast(self, *sizes):
+        """Generate binary data, stop on the first error"""
+        if sizes[0] == 0:
+            time.sleep(0.05)
+            raise ValueError('empty blob')
+        return b'x' * sizes[0]
+
+    @cli.parallel(over='names', workers=1)
+    @cli.command()
+    def touch(self, directory, *names):
+        """Create files"""
+        open(os.path.join(directory, names[0]), 'w').close()
+        print(names[0])
+        if names[0] == 'bad':
+            raise ValueError('bad name')
+        time.sleep(0.05)
+
+    @cli.parallel(over='names', workers=1, fail_fast=True)
+    @cli.command()
+    def touch_fast(self, directory, *names):
+        """Create files, stop on the first error"""
+        self.touch.func(self, directory, *names)
+
+
+@unittest.skipIf(shared_memory is None, "shared memory is not supported")
+class SharedMemoryTests(unittest.TestCase):
+    """Results passed through shared memory tests."""
+
+    def test_share(self):
+        import array
+        for value in [b'x' * 100, bytearray(b'y' * 100), array.array('d', range(20))]:
+            shared = share(value, 10)
+            self.assertIsInstance(shared, SharedResult)
+            self.assertEqual(restore(shared), value)
+            self.assertEqual(type(restore(share(value, 10))), type(value))
+
+    def test_small_values(self):
+        self.assertEqual(share(b'x', 10), b'x')
+        self.assertEqual(share(b'x' * 100, None), b'x' * 100)
+        self.assertEqual(share(['x'] * 100, 10), ['x'] * 100)
+
+
+class ParallelCommandTests(unittest.TestCase):
+    """Process pool fan-out tests."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_worker_processes(self):
+        pids = Files().invoke(['pids'] + ['name'] * 9)
+        self.assertEqual(len(pids), 9)
+        self.assertNotIn(os.getpid(), pids)
+
+    def test_input_order(self):
+        names = ['n' * length for length in range(1, 12)]
+        with capture_output() as (out, err):
+            results = Files().invoke(['shout', '-j', '3', '!'] + names)
+        self.assertEqual(results, [name.upper() for name in names])
+        self.assertEqual(out.getvalue(), ''.join(name.upper() + '!\n' for name in names))
+
+    def test_shared_memory(self):
+        results = Files().invoke(['blob', '1', '100', '2'])
+        self.assertEqual([len(result) for result in results], [256, 25600, 512])
+        self.assertEqual(results[1], bytes(bytearray(range(256))) * 100)
+
+    def test_errors(self):
+        names = ['a', 'bad', 'b', 'c', 'd', 'e']
+        with capture_output() as (out, err):
+            self.assertRaises(ValueError, Files().invoke, ['touch', self.directory] + names)
+        self.assertEqual(sorted(os.listdir(self.directory)), sorted(names))
+        self.assertEqual(out.getvalue(), ''.join(name + '\n' for name in names))
+
+    def test_fail_fast(self):
+        names = ['a', 'bad', 'b', 'c', 'd', 'e', 'f', 'g']
+        with capture_output() as (out, err):
+            self.assertRaises(ValueError, Files().invoke, ['touch_fast', self.directory] + names)
+        self.assertLess(len(os.listdir(self.directory)), len(names))
+        self.assertEqual(out.getvalue(), 'a\nbad\n')
+
+    @unittest.skipIf(shared_memory is None or not os.path.isdir('/dev/shm'), "shared memory is not listed")
+    def test_fail_fast_releases_shared_memory(self):
+        blocks = set(os.listdir('/dev/shm'))
+        self.assertRaises(ValueError, Files().invoke, ['blob_fast', '0'] + ['100'] * 50)
+        self.assertEqual(set(os.listdir('/dev/shm')) - blocks, set())
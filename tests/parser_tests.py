@@ -0,0 +1,70 @@
+import unittest
+
+import comandante as cli
+import comandante.errors as error
+from comandante.inner.model import Command
+
+
+def target(first, second='default', *rest, **options):
+    return first, second, rest, options
+
+
+class ParserTests(unittest.TestCase):
+    """Command-line parser tests."""
+
+    def setUp(self):
+        self.command = Command.from_function(target, name='target', is_method=False)
+        self.command.declare_option('flag', 'f', bool, False)
+        self.command.declare_option('number', 'n', int, 0)
+
+    def test_parser_is_cached(self):
+        self.assertIs(self.command.parser, self.command.parser)
+
+    def test_declare_option_invalidates_parser(self):
+        parser = self.command.parser
+        self.command.declare_option('other', 'o', int, 0)
+        self.assertIsNot(self.command.parser, parser)
+        options, _ = self.command.parser.parse('-o 1 value'.split())
+        self.assertEqual(options, {'other': 1})
+
+    def test_set_types_invalidates_parser(self):
+        parser = self.command.parser
+        cli.signature(rest=int)(self.command)
+        self.assertIsNot(self.command.parser, parser)
+        _, arguments = self.command.parser.parse('a b 1 2'.split())
+        self.assertEqual(arguments, ['a', 'b', 1, 2])
+
+    def test_set_types_keeps_copies_independent(self):
+        copy = self.command.copy()
+        copy.set_types({'first': int})
+        _, arguments = self.command.parser.parse(['value'])
+        self.assertEqual(arguments, ['value', 'default'])
+        self.assertRaises(error.InvalidArgumentValue, copy.parser.parse, ['value'])
+
+    def test_parser_reuse(self):
+        parser = self.command.parser
+        self.assertEqual(parser.parse('-n 1 a'.split()), ({'number': 1}, ['a', 'default']))
+        self.assertEqual(parser.parse('--number=2 a b c'.split()), ({'number': 2}, ['a', 'b', 'c']))
+        self.assertEqual(parser.parse(('-f', 'a')), ({'flag': True}, ['a', 'default']))
+
+    def test_bool_option_inline_value(self):
+        options, arguments = self.command.parser.parse(['--flag=value'])
+        self.assertEqual(options, {'flag': True})
+        self.assertEqual(arguments, ['value', 'default'])
+
+    def test_parse_iterable(self):
+        options, arguments = self.command.parser.parse(iter('-n 3 a'.split()))
+        self.assertEqual(options, {'number': 3})
+        self.assertEqual(arguments, ['a', 'default'])
+
+    def test_diagnose(self):
+        cli.signature(first=int, rest=cli.intarray())(self.command)
+        diagnostics = self.command.parser.diagnose(['-n', 'x', '--flag=y', 'b', '1', 'z', '2', 'w'], position=1)
+        found = [(type(diagnostic.error), diagnostic.position, diagnostic.token) for diagnostic in diagnostics]
+        self.assertEqual(found, [
+            (error.InvalidOptionValue, 2, 'x'),
+            (error.InvalidArgumentValue, 3, 'y'),
+            (error.InvalidArgumentValue, 6, 'z'),
+            (error.InvalidArgumentValue, 8, 'w'),
+        ])
+        self.assertEqual(self.command.parser.diagnose(['1', 'b', '1', '2']), [])
@@ -0,0 +1,141 @@
+import json
+import os
+import pstats
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+try:
+    import tracemalloc
+except ImportError:  # python 2
+    tracemalloc = None
+
+import comandante as cli
+from comandante.__main__ import Comandante
+from comandante.errors import CliSyntaxException
+from comandante.inner.test import capture_output
+from tests.basic_tests import Tracked
+
+
+class App(cli.Handler):
+    """Profiled application."""
+
+    def __init__(self):
+        super(App, self).__init__()
+        self.enable_profiling()
+
+    @cli.signature(a=int, b=int)
+    @cli.command()
+    def sum(self, a, b):
+        """Sum numbers"""
+        return a + b
+
+    @cli.signature(delay=float)
+    @cli.command()
+    def sleep(self, delay):
+        """Sleep for a while"""
+        time.sleep(delay)
+        return delay
+
+    @cli.signature(size=int)
+    @cli.command()
+    def allocate(self, size):
+        """Allocate memory"""
+        return 'x' * size
+
+
+class ProfilingTests(unittest.TestCase):
+    """Invocation profiling tests."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def invoke(self, argv):
+        with capture_output() as (out, err):
+            result = App().invoke(argv)
+        return result, out.getvalue(), err.getvalue()
+
+    def test_disabled(self):
+        class Plain(cli.Handler):
+            pass
+
+        self.assertNotIn('invoke', vars(Plain()))
+        self.assertEqual(self.invoke(['sum', '1', '2']), (3, '', ''))
+
+    def test_text_report(self):
+        result, _, err = self.invoke(['--profile', 'sum', '1', '2'])
+        self.assertEqual(result, 3)
+        self.assertIn("Profile of 'sum':", err)
+        for phase in ('resolve', 'parse', 'convert', 'command', 'total'):
+            self.assertIn(phase, err)
+
+    def test_json_report(self):
+        result, _, err = self.invoke(['--profile=json', 'sleep', '0.05'])
+        report = json.loads(err)
+        self.assertEqual(report['command'], ['sleep'])
+        self.assertEqual(report['phases'], ['resolve', 'parse', 'convert', 'command'])
+        self.assertGreaterEqual(report['time']['command'], 0.05)
+        self.assertLess(report['time']['parse'], 0.05)
+        self.assertLessEqual(sum(report['time'].values()), report['total'] + 1e-6)
+
+    def test_files(self):
+        report_path = os.path.join(self.directory, 'report.json')
+        stats_path = os.path.join(self.directory, 'sum.pstats')
+        self.invoke(['--profile={report},{stats}'.format(report=report_path, stats=stats_path), 'sum', '1', '2'])
+        with open(report_path) as file:
+            self.assertEqual(json.load(file)['cprofile'], stats_path)
+        functions = [function for _, _, function in pstats.Stats(stats_path).stats]
+        self.assertIn('sum', functions)
+
+    @unittest.skipIf(tracemalloc is None, "memory profiling requires tracemalloc")
+    def test_memory(self):
+        self.assertFalse(tracemalloc.is_tracing())
+        result, _, err = self.invoke(['--profile=json,memory', 'allocate', '1000000'])
+        self.assertEqual(len(result), 1000000)
+        self.assertFalse(tracemalloc.is_tracing())
+        memory = json.loads(err)['memory']
+        self.assertEqual(sorted(memory), ['command', 'convert', 'parse', 'resolve'])
+        self.assertGreaterEqual(memory['command']['peak'], 1000000)
+        self.assertLess(memory['parse']['peak'], 1000000)
+        site = memory['command']['sites'][0]
+        self.assertTrue(site['site'].startswith(__file__.replace('.pyc', '.py') + ':'))
+        self.assertGreaterEqual(site['size'], 1000000)
+
+    @unittest.skipIf(tracemalloc is None, "memory profiling requires tracemalloc")
+    def test_snapshots(self):
+        path = os.path.join(self.directory, 'run.snapshot')
+        _, _, err = self.invoke(['--profile={path}'.format(path=path), 'allocate', '1000'])
+        self.assertIn('memory:', err)
+        first = tracemalloc.Snapshot.load(os.path.join(self.directory, 'run.command.snapshot'))
+        self.invoke(['--profile={path}'.format(path=path), 'allocate', '100000'])
+        second = tracemalloc.Snapshot.load(os.path.join(self.directory, 'run.command.snapshot'))
+        self.assertGreaterEqual(second.compare_to(first, 'lineno')[0].size_diff, 90000)
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         ['run.command.snapshot', 'run.parse.snapshot', 'run.resolve.snapshot'])
+
+    def test_help(self):
+        _, out, err = self.invoke(['--profile=json'])
+        self.assertIn('Profiled application.', out)
+        self.assertEqual(json.loads(err)['phases'], ['resolve', 'help'])
+        with capture_output() as (out, err):
+            self.assertRaises(CliSyntaxException, App().invoke, ['--profile=json', 'sum', '1', 'x'])
+        self.assertEqual(json.loads(err.getvalue())['phases'], ['resolve', 'parse', 'convert', 'help'])
+
+    def test_nested_invoke_override(self):
+        app, tracked = App(), Tracked()
+        app.declare_command('tracked', tracked)
+        with capture_output() as (out, err):
+            self.assertEqual(app.invoke(['--profile=json', 'tracked', 'go']), 'went')
+        self.assertTrue(tracked.invoked)
+        self.assertEqual(json.loads(err.getvalue())['command'], ['tracked'])
+
+    def test_profile_command(self):
+        with capture_output() as (out, err):
+            result = Comandante().invoke(['profile', '--report=json', 'tests.profiling_tests:App', 'sum', '2', '3'])
+        self.assertEqual(result, 5)
+        self.assertEqual(json.loads(err.getvalue())['phases'][:2], ['import', 'construct'])
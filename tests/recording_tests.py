@@ -0,0 +1,152 @@
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import comandante as cli
+from comandante.__main__ import Comandante
+from comandante.errors import InvalidArgumentValue, UnknownCommand
+from comandante.inner.recording import RECORDED_ARGUMENTS, anonymize, percentiles, read_log, replay
+from comandante.inner.test import capture_output
+
+
+class App(cli.Handler):
+    """Recorded application."""
+
+    def __init__(self, log=None):
+        super(App, self).__init__()
+        self.declare_option('verbose', 'v', bool, False)
+        self.calls = 0
+        if log is not None:
+            self.enable_recording(log)
+
+    @cli.option('mode', 'm', cli.choice('fast', 'slow'), 'fast')
+    @cli.signature(values=int)
+    @cli.command()
+    def build(self, name, *values, **options):
+        """Build"""
+        self.calls += 1
+        return name, sum(values), options
+
+    @cli.signature(values=cli.stream(int))
+    @cli.command()
+    def total(self, values):
+        """Sum stream"""
+        self.calls += 1
+        return sum(values)
+
+    @cli.option('factor', 'f', float, 1.0)
+    @cli.signature(values=float)
+    @cli.command()
+    def scale(self, *values, **options):
+        """Scale values"""
+        self.calls += 1
+        return [value * options['factor'] for value in values]
+
+    @cli.signature(code=int)
+    @cli.command()
+    def exit(self, code):
+        """Exit"""
+        raise SystemExit(code)
+
+
+class RecordingTests(unittest.TestCase):
+    """Invocation recording and replay tests."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.log = os.path.join(self.directory, 'invocations.log')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_anonymize(self):
+        command = App().build
+        argv = ['-v', '--mode=slow', '-m', 'fast', 'Secret-42', 'true', '7']
+        self.assertEqual(anonymize(command, argv), ['-v', '--mode=slow', '-m', 'fast', 'Xxxxxx-11', 'true', '1'])
+        self.assertEqual(anonymize(command, ['--secret=value']), ['--xxxxxx=xxxxx'])
+        self.assertEqual(anonymize(App(), ['build', 'other']), ['build', 'xxxxx'])
+
+    def test_anonymize_numbers(self):
+        argv = ['--factor', '1.5e3', 'inf', '-2.5E-3', 'NaN', '907', '1e5x']
+        self.assertEqual(anonymize(App().scale, argv), ['--factor', '1.1e1', 'inf', '-1.1E-1', 'NaN', '101', '1e1x'])
+        self.assertEqual(anonymize(App().build, ['--mode=fast', 'N4me', '-300', '0x1f']), [
+            '--mode=fast', 'X1xx', '-100', '0x1x'])
+
+    def test_replay_anonymized_numbers(self):
+        app = App(self.log)
+        app.invoke(['scale', '--factor=-1.5e3', 'inf', '2.5E-3', 'nan', '42'])
+        self.assertEqual(next(read_log(self.log))['argv'], ['scale', '--factor=-1.1e1', 'inf', '1.1E-1', 'nan', '11'])
+        report = replay(App(), read_log(self.log))
+        self.assertEqual((report['replayed'], report['errors']), (1, {}))
+
+    def test_record(self):
+        app = App(self.log)
+        self.assertEqual(app.invoke(['build', '--mode=slow', 'Name', '1', '2']), ('Name', 3, {'mode': 'slow'}))
+        self.assertEqual(app.invoke(iter(['total', '1', '2'])), 3)
+        with capture_output():
+            self.assertRaises(InvalidArgumentValue, app.invoke, ['build', 'name', 'x'])
+            self.assertRaises(UnknownCommand, app.invoke, ['unknown'])
+            app.invoke([])
+        records = list(read_log(self.log))
+        self.assertEqual([record['argv'] for record in records], [
+            ['build', '--mode=slow', 'Xxxx', '1', '1'], ['total', '1', '1'], ['build', 'xxxx', 'x'], ['xxxxxxx'], []])
+        self.assertEqual([record['error'] for record in records],
+                         [None, None, 'InvalidArgumentValue', 'UnknownCommand', None])
+        self.assertEqual(sorted(records[0]['time']), ['command', 'parse', 'resolve'])
+        self.assertEqual(sorted(records[4]['time']), ['help', 'resolve'])
+
+    def test_record_lazy_tail(self):
+        app = App(self.log)
+        values = (str(value) for value in range(RECORDED_ARGUMENTS + 10))
+        self.assertEqual(app.invoke(itertools.chain(['total'], values)), sum(range(RECORDED_ARGUMENTS + 10)))
+        self.assertEqual(app.invoke(['build', 'name'] + ['1'] * RECORDED_ARGUMENTS)[1], RECORDED_ARGUMENTS)
+        first, second = read_log(self.log)
+        self.assertEqual((len(first['argv']), first['tail']), (RECORDED_ARGUMENTS, 11))
+        self.assertEqual((len(second['argv']), second['tail']), (RECORDED_ARGUMENTS, 2))
+
+    def test_record_exit(self):
+        app = App(self.log)
+        self.assertRaises(SystemExit, app.invoke, ['exit', '3'])
+        self.assertEqual([record['error'] for record in read_log(self.log)], ['SystemExit'])
+
+    def test_record_raw(self):
+        app = App()
+        app.enable_recording(self.log, anonymize=False)
+        app.enable_profiling()
+        app.invoke(['build', 'Name', '1'])
+        with capture_output() as (out, err):
+            app.invoke(['--profile', 'build', 'Name', '1'])
+        self.assertIn("Profile of 'build'", err.getvalue())
+        self.assertEqual([record['argv'] for record in read_log(self.log)], [['build', 'Name', '1']])
+
+    def test_replay(self):
+        app = App(self.log)
+        app.invoke(['build', '-v', 'name', '1', '2'])
+        app.invoke(['total', '1', '2', '3'])
+        with capture_output():
+            self.assertRaises(InvalidArgumentValue, app.invoke, ['total', '1', 'x'])
+            app.invoke([])
+        calls = app.calls
+        report = replay(App(), read_log(self.log), repeat=3)
+        self.assertEqual(app.calls, calls)
+        self.assertEqual((report['records'], report['replayed'], report['skipped']), (4, 9, 3))
+        self.assertEqual(report['errors'], {'InvalidArgumentValue': 3})
+        self.assertEqual(sorted(report['latency']), ['max', 'p50', 'p90', 'p99', 'p99.9'])
+        self.assertEqual(sorted(report['recorded']), ['max', 'p50', 'p90', 'p99', 'p99.9'])
+
+    def test_percentiles(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentiles(values), {'p50': 50, 'p90': 90, 'p99': 99, 'p99.9': 100, 'max': 100})
+        self.assertEqual(percentiles([]), {})
+
+    def test_replay_command(self):
+        App(self.log).invoke(['build', 'name'])
+        with capture_output() as (out, err):
+            Comandante().invoke(['replay', '--json', 'tests.recording_tests:App', self.log])
+        self.assertEqual(json.loads(out.getvalue())['replayed'], 1)
+        with capture_output() as (out, err):
+            Comandante().invoke(['replay', 'tests.recording_tests:App', self.log])
+        self.assertIn('1 lines replayed', out.getvalue())
@@ -0,0 +1,127 @@
+import os
+import shutil
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from comandante.client import encode_request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGET = '''
+import os, sys, comandante as cli
+
+
+class App(cli.Handler):
+    """Served application."""
+
+    @cli.command()
+    def echo(self, *words):
+        """Print words"""
+        print('{prefix}', ' '.join(words), os.getcwd(), os.environ.get('SERVER_TEST'))
+
+    @cli.command()
+    def upper(self):
+        """Convert input to upper case"""
+        sys.stdout.write(sys.stdin.read().upper())
+
+    @cli.command()
+    def exit(self, status):
+        """Exit with the status"""
+        sys.exit(int(status))
+
+    @cli.command()
+    def fail(self):
+        """Raise exception"""
+        raise ValueError('failed')
+'''
+
+supported = hasattr(socket, 'AF_UNIX') and hasattr(socket.socket, 'recvmsg')
+
+
+class RequestTests(unittest.TestCase):
+    """Invocation request encoding tests."""
+
+    @unittest.skipIf(not supported, "server mode is not supported")
+    def test_round_trip(self):
+        from comandante.server import decode_request
+        request = encode_request(['a', '', 'b c'], '/tmp', {'A': 'x=y', 'B': ''})
+        self.assertEqual(decode_request(request), (['a', '', 'b c'], '/tmp', {'A': 'x=y', 'B': ''}))
+
+    @unittest.skipIf(not supported, "server mode is not supported")
+    def test_authorized(self):
+        from comandante.server import Server
+        server, client = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.assertTrue(Server._authorized(server))
+        finally:
+            server.close()
+            client.close()
+
+
+@unittest.skipIf(not supported, "server mode is not supported")
+class ServerTests(unittest.TestCase):
+    """Persistent server mode tests."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.socket = os.path.join(self.directory, 'app.sock')
+        self.write_target('first')
+        self.environment = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, self.directory]))
+        self.environment.pop('SERVER_TEST', None)
+        command = [sys.executable, '-m', 'comandante', 'serve', '--interval=0.1', self.socket, 'server_target:App']
+        self.server = subprocess.Popen(command, cwd=ROOT, env=self.environment, stderr=subprocess.PIPE)
+        deadline = time.time() + 10
+        while not os.path.exists(self.socket) and time.time() < deadline:
+            time.sleep(0.05)
+
+    def tearDown(self):
+        self.server.terminate()
+        self.server.communicate()
+        shutil.rmtree(self.directory)
+
+    def write_target(self, prefix):
+        with open(os.path.join(self.directory, 'server_target.py'), 'w') as file:
+            file.write(TARGET.format(prefix=prefix))
+
+    def invoke(self, *argv, **kwargs):
+        environment = dict(self.environment, **kwargs.pop('environment', {}))
+        process = subprocess.Popen([sys.executable, '-m', 'comandante.client', self.socket] + list(argv),
+                                   cwd=self.directory, env=environment, stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout, stderr = process.communicate(kwargs.pop('input', b''))
+        return process.returncode, stdout.decode('utf-8'), stderr.decode('utf-8')
+
+    def test_invoke(self):
+        status, stdout, _ = self.invoke('echo', 'a', 'b', environment={'SERVER_TEST': 'value'})
+        self.assertEqual(status, 0)
+        self.assertEqual(stdout, 'first a b {cwd} value\n'.format(cwd=os.path.realpath(self.directory)))
+
+    def test_stdin(self):
+        self.assertEqual(self.invoke('upper', input=b'text'), (0, 'TEXT', ''))
+
+    def test_exit_status(self):
+        self.assertEqual(self.invoke('exit', '3')[0], 3)
+        status, _, stderr = self.invoke('fail')
+        self.assertEqual(status, 1)
+        self.assertIn('ValueError: failed', stderr)
+        status, stdout, _ = self.invoke('unknown')
+        self.assertEqual(status, 1)
+        self.assertIn("Unknown command: 'unknown'", stdout)
+
+    def test_socket_mode(self):
+        self.assertEqual(stat.S_IMODE(os.stat(self.socket).st_mode), 0o600)
+
+    def test_restart(self):
+        self.assertTrue(self.invoke('echo')[1].startswith('first'))
+        self.write_target('second')
+        later = time.time() + 10
+        os.utime(os.path.join(self.directory, 'server_target.py'), (later, later))
+        deadline = time.time() + 10
+        while not self.invoke('echo')[1].startswith('second') and time.time() < deadline:
+            time.sleep(0.1)
+        self.assertTrue(self.invoke('echo')[1].startswith('second'))
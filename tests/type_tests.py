@@ -1,3 +1,4 @@
+import array
 import unittest
 
 import comandante as cli
@@ -33,3 +34,32 @@ class TypeTests(unittest.TestCase):
     def test_listof_name(self):
         list_of_int = cli.listof(int)
         self.assertEqual(getname(list_of_int), 'listof(int)')
+
+    def test_intarray_valid(self):
+        ints = cli.intarray(ndarray=False)
+        self.assertEqual(list(ints('0,1, 2 3\t4')), list(range(5)))
+
+    def test_intarray_compact(self):
+        ints = cli.intarray(width=16, ndarray=False)
+        self.assertIsInstance(ints('1,2'), array.array)
+        self.assertEqual(ints('1,2').itemsize, 2)
+
+    def test_intarray_invalid(self):
+        ints = cli.intarray(ndarray=False)
+        self.assertRaises(ValueError, ints, '1,a,3')
+
+    def test_intarray_overflow(self):
+        self.assertRaises(ValueError, cli.intarray(width=8, ndarray=False), '1,300')
+        self.assertRaises(ValueError, cli.intarray(width=8, signed=False, ndarray=False), '-1')
+
+    def test_intarray_unsupported_width(self):
+        self.assertRaises(ValueError, cli.intarray, 12)
+
+    def test_floatarray_valid(self):
+        floats = cli.floatarray(width=32, ndarray=False)
+        self.assertEqual(list(floats('0.5,1.5')), [0.5, 1.5])
+
+    def test_numeric_array_names(self):
+        self.assertEqual(getname(cli.intarray()), 'intarray(64)')
+        self.assertEqual(getname(cli.intarray(8, signed=False)), 'uintarray(8)')
+        self.assertEqual(getname(cli.floatarray(32)), 'floatarray(32)')